@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Fila persistente de alertas do monitoramento.
+Os alertas são gravados em um spool em disco e entregues aos webhooks por um
+remetente em segundo plano, com novas tentativas (backoff exponencial que
+respeita o Retry-After das respostas 429), limite de envio por webhook
+(token bucket) e agrupamento de rajadas de alertas em uma única mensagem.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import datetime
+from email.utils import parsedate_to_datetime
+
+from async_http import ConnectionPool, HTTPClientError
+
+SPOOL_DIR = "/var/spool/monitoramento/alertas"
+COALESCE_WINDOW = 5  # segundos aguardando outros alertas antes de enviar
+MAX_CONTENT = 2000  # limite de caracteres de uma mensagem do Discord
+SEND_TIMEOUT = 10  # segundos por tentativa de envio
+BACKOFF_BASE = 2  # segundos antes da primeira nova tentativa
+BACKOFF_MAX = 300  # espera máxima entre tentativas (exceto Retry-After)
+MAX_AGE = 24 * 3600  # alertas não entregues depois disso são descartados
+RATE = 0.5  # envios por segundo por webhook (30 por minuto, como o Discord)
+BURST = 5  # envios seguidos permitidos por webhook
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Limita os envios a `rate` por segundo, com rajadas de até `burst`."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """
+        Consome uma ficha, se houver.
+
+        Returns:
+            0 se a ficha foi consumida, senão os segundos até a próxima ficha
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self):
+        """Zera as fichas (o servidor informou que o limite foi atingido)."""
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+
+class AlertSpool:
+    """
+    Alertas pendentes, um arquivo JSON por alerta.
+
+    Os nomes começam pelo instante de criação em nanossegundos, de modo que
+    a ordem alfabética é a ordem de chegada; cada arquivo é gravado em um
+    temporário e renomeado, para que um processo interrompido nunca deixe
+    um alerta pela metade.
+    """
+
+    def __init__(self, directory=SPOOL_DIR):
+        self.directory = directory
+        self._sequence = 0
+
+    def put(self, webhook, message):
+        """
+        Grava um novo alerta.
+
+        Args:
+            webhook: URL do webhook de destino
+            message: Texto do alerta
+
+        Returns:
+            Dict do alerta gravado
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._sequence += 1
+        now = time.time()
+        entry = {
+            "id": f"{time.time_ns():020d}-{os.getpid()}-{self._sequence}",
+            "webhook": webhook,
+            "message": message,
+            "created": now,
+            "attempts": 0,
+            "next_attempt": now,
+            "last_error": None
+        }
+        self.update(entry)
+        return entry
+
+    def update(self, entry):
+        """Regrava um alerta (tentativas e próxima tentativa)."""
+        path = os.path.join(self.directory, f"{entry['id']}.json")
+        temp = os.path.join(self.directory, f".{entry['id']}.tmp")
+        with open(temp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(temp, path)
+
+    def remove(self, entry):
+        """Remove um alerta entregue ou descartado."""
+        try:
+            os.remove(os.path.join(self.directory, f"{entry['id']}.json"))
+        except FileNotFoundError:
+            pass
+
+    def pending(self):
+        """
+        Lê os alertas pendentes.
+
+        Returns:
+            Lista de alertas em ordem de chegada (arquivos corrompidos são descartados)
+        """
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'r') as f:
+                    entries.append(json.load(f))
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                logger.error(f"Alerta corrompido descartado ({name}): {e}")
+                os.remove(path)
+        return entries
+
+
+def parse_retry_after(headers, body=b""):
+    """
+    Segundos de espera pedidos por uma resposta 429/503.
+
+    Considera o cabeçalho Retry-After (segundos ou data HTTP), o
+    X-RateLimit-Reset-After e o campo retry_after do corpo JSON do Discord.
+
+    Returns:
+        Segundos (float) ou None se a resposta não informar
+    """
+    value = headers.get("retry-after") or headers.get("x-ratelimit-reset-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            moment = None
+        if moment is not None:
+            return max(0.0, moment.timestamp() - time.time())
+    try:
+        retry_after = json.loads(body).get("retry_after")
+    except (ValueError, AttributeError, UnicodeDecodeError):
+        return None
+    return max(0.0, float(retry_after)) if isinstance(retry_after, (int, float)) else None
+
+
+def coalesce(entries, limit=MAX_CONTENT):
+    """
+    Junta alertas em uma mensagem de até `limit` caracteres.
+
+    Args:
+        entries: Alertas pendentes de um webhook, em ordem de chegada
+
+    Returns:
+        Tupla (alertas incluídos, texto da mensagem); os demais ficam para o próximo envio
+    """
+    first = entries[0]["message"]
+    if len(first) > limit:
+        first = first[:limit - 1] + "…"
+    if len(entries) == 1:
+        return entries[:1], first
+
+    batch, parts = [], []
+    size = 40  # reserva para o cabeçalho
+    for entry in entries:
+        message = entry["message"] if batch else first
+        if batch and size + len(message) + 2 > limit:
+            break
+        batch.append(entry)
+        parts.append(message)
+        size += len(message) + 2
+    if len(batch) == 1:
+        return batch, first
+    header = f"📣 **{len(batch)} alertas agrupados**"
+    return batch, "\n\n".join([header] + parts)
+
+
+class AlertOutbox:
+    """
+    Remetente dos alertas gravados no spool.
+
+    submit() apenas grava o alerta em disco e acorda o remetente; quem gera
+    alertas nunca espera pela entrega. Os alertas de um mesmo webhook são
+    enviados em ordem e agrupados quando chegam juntos; falhas temporárias
+    (erro de rede, 429 e 5xx) são repetidas com backoff, enquanto respostas
+    4xx definitivas descartam o alerta.
+
+    Com metrics (MetricsRegistry), os resultados de cada alerta (sent,
+    retried, rejected, expired) e o tamanho da fila são exportados.
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR, profile=None, coalesce_window=COALESCE_WINDOW,
+                 rate=RATE, burst=BURST, max_age=MAX_AGE, metrics=None):
+        self.spool = AlertSpool(spool_dir)
+        self.profile = profile or {}
+        self.coalesce_window = coalesce_window
+        self.rate = rate
+        self.burst = burst
+        self.max_age = max_age
+        self._buckets = {}
+        self._pool = None
+        self._loop = None
+        self._wake = None
+        self._outcomes = self._pending = None
+        if metrics is not None:
+            self._outcomes = metrics.counter(
+                "projeto_linux_alerts_total", "Alertas por resultado da entrega", ("outcome",)
+            )
+            self._pending = metrics.gauge("projeto_linux_alerts_pending", "Alertas aguardando entrega no spool")
+
+    def _count(self, outcome, amount=1):
+        """Soma `amount` alertas ao resultado nas métricas (se houver)."""
+        if self._outcomes is not None:
+            self._outcomes.inc(amount, outcome=outcome)
+
+    def submit(self, webhook, message):
+        """
+        Enfileira um alerta (pode ser chamado de qualquer thread).
+
+        Args:
+            webhook: URL do webhook de destino
+            message: Texto do alerta
+
+        Returns:
+            Dict do alerta gravado
+
+        Raises:
+            OSError: Falha ao gravar no spool
+        """
+        entry = self.spool.put(webhook, message)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return entry
+
+    async def run(self, stop):
+        """
+        Entrega os alertas continuamente até stop (asyncio.Event).
+
+        Alertas ainda não entregues permanecem no spool para a próxima execução.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while not stop.is_set():
+                self._wake.clear()
+                try:
+                    delay = await self.deliver_due()
+                except OSError as e:
+                    logger.error(f"Erro ao acessar o spool de alertas {self.spool.directory}: {e}")
+                    delay = BACKOFF_MAX
+                waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(self._wake.wait())]
+                try:
+                    await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+        finally:
+            self._loop = None
+            await self.close()
+
+    async def drain(self, timeout):
+        """
+        Entrega o que estiver pendente, sem aguardar novos alertas.
+
+        Args:
+            timeout: Tempo máximo (segundos); o que restar fica no spool
+
+        Returns:
+            Número de alertas que continuam pendentes
+        """
+        window, self.coalesce_window = self.coalesce_window, 0
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                delay = await self.deliver_due()
+                remaining = deadline - time.monotonic()
+                if delay is None or delay > remaining:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            self.coalesce_window = window
+            await self.close()
+        return len(self.spool.pending())
+
+    async def close(self):
+        """Fecha as conexões com os webhooks."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def deliver_due(self):
+        """
+        Envia os lotes cujo horário chegou.
+
+        Returns:
+            Segundos até o próximo envio possível ou None se o spool está vazio
+        """
+        by_webhook = {}
+        for entry in self.spool.pending():
+            by_webhook.setdefault(entry["webhook"], []).append(entry)
+
+        next_delay = None
+        for webhook, entries in by_webhook.items():
+            delay = await self._deliver_webhook(webhook, entries)
+            if delay is not None:
+                next_delay = delay if next_delay is None else min(next_delay, delay)
+        if self._pending is not None:
+            self._pending.set(len(self.spool.pending()))
+        return next_delay
+
+    async def _deliver_webhook(self, webhook, entries):
+        """Envia os alertas de um webhook; devolve os segundos até a próxima tentativa."""
+        now = time.time()
+        while entries:
+            expired = [entry for entry in entries if now - entry["created"] > self.max_age]
+            for entry in expired:
+                logger.error(f"Alerta descartado após {entry['attempts']} tentativa(s) sem entrega: "
+                             f"{entry['last_error']}")
+                self.spool.remove(entry)
+                self._count("expired")
+            entries = [entry for entry in entries if entry not in expired]
+            if not entries:
+                return None
+
+            # Uma falha adia o webhook inteiro, preservando a ordem dos alertas
+            due = max(max(entry["next_attempt"] for entry in entries),
+                      entries[0]["created"] + self.coalesce_window)
+            if due > now:
+                return due - now
+            bucket = self._buckets.get(webhook)
+            if bucket is None:
+                bucket = self._buckets[webhook] = TokenBucket(self.rate, self.burst)
+            wait = bucket.take()
+            if wait:
+                return wait
+
+            batch, content = coalesce(entries)
+            retry_after = await self._send(webhook, batch, content, bucket)
+            if retry_after is not None:
+                return retry_after
+            entries = entries[len(batch):]
+            now = time.time()
+        return None
+
+    async def _send(self, webhook, batch, content, bucket):
+        """
+        Faz uma tentativa de envio do lote.
+
+        Returns:
+            None se o lote saiu do spool (entregue ou rejeitado), senão os segundos até a nova tentativa
+        """
+        if self._pool is None:
+            self._pool = ConnectionPool()
+        payload = json.dumps(dict(self.profile, content=content)).encode("utf-8")
+        retry_after = None
+        try:
+            response = await self._pool.request(
+                "POST", webhook, timeout=SEND_TIMEOUT, body=payload,
+                headers={"Content-Type": "application/json"}
+            )
+        except HTTPClientError as e:
+            error = str(e)
+        else:
+            if response.headers.get("x-ratelimit-remaining") == "0":
+                bucket.drain()
+            if 200 <= response.status < 300:
+                for entry in batch:
+                    self.spool.remove(entry)
+                self._count("sent", len(batch))
+                grouped = f" ({len(batch)} alertas agrupados)" if len(batch) > 1 else ""
+                logger.info(f"Alerta enviado via webhook com sucesso{grouped}")
+                return None
+            error = f"HTTP {response.status} {response.reason}".strip()
+            if response.status == 429 or response.status >= 500:
+                retry_after = parse_retry_after(response.headers, response.body)
+                if response.status == 429:
+                    bucket.drain()
+            else:
+                # Webhook inexistente, payload inválido etc.: repetir não adianta
+                for entry in batch:
+                    self.spool.remove(entry)
+                self._count("rejected", len(batch))
+                logger.error(f"Alerta rejeitado pelo webhook e descartado: {error}")
+                return None
+
+        attempts = batch[0]["attempts"] + 1
+        if retry_after is None:
+            retry_after = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1)
+        next_attempt = time.time() + retry_after
+        for entry in batch:
+            entry.update(attempts=attempts, next_attempt=next_attempt, last_error=error)
+            self.spool.update(entry)
+        self._count("retried", len(batch))
+        retry_at = datetime.datetime.fromtimestamp(next_attempt).strftime("%H:%M:%S")
+        logger.warning(f"Falha ao enviar alerta ({error}); tentativa {attempts}, nova tentativa às {retry_at}")
+        return retry_after
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP/1.1 assíncrono mínimo usado pelo monitoramento.
+Mantém conexões keep-alive por origem (esquema, host e porta), para que
+verificações frequentes não paguem uma nova conexão TCP/TLS a cada vez, e
+mede cada fase da requisição (DNS, conexão, TLS, TTFB e transferência).
+"""
+
+import ssl
+import time
+import socket
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit, urljoin
+
+USER_AGENT = "ProjetoLinux-Monitor/1.0"
+MAX_HEADER_BYTES = 64 * 1024
+MAX_REDIRECTS = 5
+IDLE_TIMEOUT = 30  # segundos que uma conexão ociosa é mantida
+MAX_PER_HOST = 4  # requisições simultâneas (e conexões abertas) por origem
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Fases medidas, em nanossegundos (perf_counter_ns), somadas entre redirecionamentos
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer")
+
+# Tipos de falha informados em HTTPClientError.kind
+ERROR_KINDS = ("timeout", "dns", "connect", "tls", "connection", "protocol")
+
+
+def new_timings():
+    """Dict de medições: uma entrada por fase, bytes do corpo e se a conexão foi reutilizada."""
+    timings = dict.fromkeys(PHASES, 0)
+    timings["body_bytes"] = 0
+    timings["reused"] = False
+    return timings
+
+
+class HTTPClientError(Exception):
+    """
+    Falha de conexão, protocolo ou tempo esgotado em uma requisição.
+
+    `timings` traz as fases concluídas antes da falha (formato de new_timings)
+    e `kind` o tipo da falha (um de ERROR_KINDS).
+    """
+
+    def __init__(self, message, timings=None, kind="protocol"):
+        super().__init__(message)
+        self.timings = timings
+        self.kind = kind
+
+
+class Response:
+    """
+    Resposta HTTP: status, reason, headers (chaves minúsculas), body, url final,
+    elapsed (segundos desde a obtenção da vaga na origem até o fim do corpo)
+    e timings (fases da requisição, formato de new_timings).
+    """
+
+    def __init__(self, status, reason, headers, body, url):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.url = url
+        self.elapsed = None
+        self.timings = None
+
+
+class _Connection:
+    """Conexão aberta com uma origem."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.requests = 0
+
+    def usable(self):
+        return (not self.writer.is_closing() and not self.reader.at_eof()
+                and time.monotonic() - self.last_used < IDLE_TIMEOUT)
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Conjunto de conexões keep-alive reutilizadas entre requisições.
+
+    Uma conexão só volta ao pool depois que a resposta foi lida por completo
+    e o servidor não pediu o encerramento (Connection: close). Se uma conexão
+    reutilizada falhar antes do primeiro byte da resposta (o servidor fechou
+    a conexão ociosa), a requisição é reenviada em uma conexão nova; depois
+    disso, nunca, para não repetir um POST já processado. Cada origem
+    atende no máximo max_per_host requisições ao mesmo tempo; as demais
+    aguardam a vaga antes de começar a contar o timeout.
+    """
+
+    def __init__(self, ssl_context=None, max_per_host=MAX_PER_HOST):
+        self._idle = {}  # (esquema, host, porta) -> deque de _Connection
+        self._limits = {}  # (esquema, host, porta) -> asyncio.Semaphore
+        self._ssl_context = ssl_context
+        self.max_per_host = max_per_host
+
+    async def request(self, method, url, timeout=10, headers=None, max_redirects=MAX_REDIRECTS, body=None):
+        """
+        Executa uma requisição, seguindo redirecionamentos como requests.
+
+        Args:
+            method: Método HTTP ("GET", "HEAD", "POST", ...)
+            url: URL http:// ou https://
+            timeout: Tempo máximo (segundos) da requisição inteira
+            headers: Cabeçalhos adicionais (opcional)
+            max_redirects: Redirecionamentos seguidos no máximo
+            body: Corpo da requisição em bytes (opcional)
+
+        Returns:
+            Response
+
+        Raises:
+            HTTPClientError: Falha de conexão, protocolo ou tempo esgotado
+        """
+        origin = _origin(urlsplit(url))
+        limit = self._limits.get(origin)
+        if limit is None:
+            limit = self._limits[origin] = asyncio.Semaphore(self.max_per_host)
+        async with limit:
+            timings = new_timings()
+            started = time.perf_counter_ns()
+            try:
+                response = await asyncio.wait_for(
+                    self._request(method, url, headers or {}, max_redirects, body, timings), timeout
+                )
+            except asyncio.TimeoutError:
+                raise HTTPClientError(f"Tempo esgotado após {timeout}s ao acessar {url}", timings, "timeout") from None
+            except HTTPClientError as e:
+                e.timings = timings
+                raise
+            response.elapsed = (time.perf_counter_ns() - started) / 1e9
+            response.timings = timings
+            return response
+
+    async def _request(self, method, url, headers, max_redirects, body, timings):
+        for _ in range(max_redirects + 1):
+            response = await self._send(method, url, headers, body, timings)
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+            if response.status in (301, 302, 303) and method not in ("GET", "HEAD"):
+                # Como os navegadores e requests: o redirecionamento vira GET sem corpo
+                method, body = "GET", None
+        raise HTTPClientError(f"Mais de {max_redirects} redirecionamentos a partir de {url}")
+
+    async def _send(self, method, url, headers, body, timings):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise HTTPClientError(f"URL inválida: {url}")
+        origin = _origin(parts)
+        port = origin[2]
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        host = parts.hostname if port in (80, 443) else f"{parts.hostname}:{port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+                 "Accept: */*", "Connection: keep-alive"]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+        connection = self._acquire(origin)
+        if connection is not None:
+            # Conexão reutilizada: DNS, conexão e TLS não são pagos de novo
+            attempt = new_timings()
+            try:
+                response = await self._exchange(connection, origin, method, payload, url, attempt)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                connection.close()
+                if attempt["ttfb"] or getattr(e, "partial", b""):
+                    # A resposta já havia começado: reenviar poderia repetir a requisição (ex.: um POST)
+                    _add_timings(timings, attempt)
+                    timings["reused"] = True
+                    raise _connection_error(e, origin) from None
+                # O servidor fechou a conexão ociosa antes de responder: tenta uma nova
+            except BaseException:
+                connection.close()
+                raise
+            else:
+                _add_timings(timings, attempt)
+                timings["reused"] = True
+                return response
+        connection = await self._connect(origin, timings)
+        try:
+            return await self._exchange(connection, origin, method, payload, url, timings)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            connection.close()
+            raise _connection_error(e, origin) from None
+        except BaseException:
+            connection.close()
+            raise
+
+    def _acquire(self, origin):
+        idle = self._idle.get(origin)
+        while idle:
+            connection = idle.pop()
+            if connection.usable():
+                return connection
+            connection.close()
+        return None
+
+    def _release(self, origin, connection):
+        connection.last_used = time.monotonic()
+        self._idle.setdefault(origin, deque()).append(connection)
+
+    async def _connect(self, origin, timings):
+        """Abre uma conexão medindo separadamente DNS, TCP e TLS."""
+        scheme, hostname, port = origin
+        loop = asyncio.get_running_loop()
+
+        started = time.perf_counter_ns()
+        try:
+            addresses = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            raise HTTPClientError(f"Falha ao resolver {hostname}: {e}", kind="dns") from None
+        resolved = time.perf_counter_ns()
+        timings["dns"] += resolved - started
+
+        sock = None
+        error = None
+        for family, sock_type, proto, _, address in addresses:
+            sock = socket.socket(family, sock_type, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                break
+            except OSError as e:
+                sock.close()
+                sock, error = None, e
+            except BaseException:
+                sock.close()
+                raise
+        connected = time.perf_counter_ns()
+        timings["connect"] += connected - resolved
+        if sock is None:
+            raise HTTPClientError(f"Falha ao conectar em {hostname}:{port}: {error}", kind="connect")
+
+        context = None
+        if scheme == "https":
+            context = self._ssl_context or ssl.create_default_context()
+        try:
+            reader, writer = await asyncio.open_connection(
+                sock=sock, ssl=context, server_hostname=hostname if context else None,
+                limit=MAX_HEADER_BYTES
+            )
+        except (OSError, ssl.SSLError) as e:
+            sock.close()
+            raise HTTPClientError(f"Falha no handshake TLS com {hostname}:{port}: {e}", kind="tls") from None
+        except BaseException:
+            sock.close()
+            raise
+        if context is not None:
+            timings["tls"] += time.perf_counter_ns() - connected
+        return _Connection(reader, writer)
+
+    async def _exchange(self, connection, origin, method, payload, url, timings):
+        reader = connection.reader
+        sent = time.perf_counter_ns()
+        connection.writer.write(payload)
+        await connection.writer.drain()
+
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPClientError("Cabeçalhos da resposta muito grandes") from None
+        first_byte = time.perf_counter_ns()
+        timings["ttfb"] += first_byte - sent
+
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        version, _, rest = status_line.partition(" ")
+        code, _, reason = rest.partition(" ")
+        if not version.startswith("HTTP/1.") or not code.isdigit():
+            raise HTTPClientError(f"Resposta HTTP inválida: {status_line[:80]!r}")
+        status = int(code)
+        response_headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, _, value = line.partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in response_headers.get("transfer-encoding", "").lower():
+            body = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            length = response_headers["content-length"]
+            if not (length.isascii() and length.isdigit()):
+                raise HTTPClientError(f"Content-Length inválido na resposta: {length[:80]!r}")
+            body = await reader.readexactly(int(length))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        timings["transfer"] += time.perf_counter_ns() - first_byte
+        timings["body_bytes"] = len(body)
+
+        connection.requests += 1
+        if keep_alive:
+            self._release(origin, connection)
+        else:
+            connection.close()
+        return Response(status, reason, response_headers, body, url)
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        try:
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size < 0:
+                    raise ValueError(size_line)
+                if size == 0:
+                    # Trailers opcionais até a linha vazia
+                    while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        except (asyncio.LimitOverrunError, ValueError):
+            raise HTTPClientError("Bloco inválido na resposta chunked") from None
+
+    async def close(self):
+        """Fecha todas as conexões ociosas."""
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+
+def _origin(parts):
+    """Origem (esquema, host, porta) de uma URL já dividida, com a porta padrão explícita."""
+    return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+
+
+def _connection_error(error, origin):
+    """HTTPClientError correspondente a uma falha de leitura ou escrita na conexão."""
+    if isinstance(error, asyncio.IncompleteReadError):
+        return HTTPClientError(f"Conexão encerrada pelo servidor {origin[1]}:{origin[2]}", kind="connection")
+    return HTTPClientError(f"Erro de comunicação com {origin[1]}:{origin[2]}: {error}", kind="connection")
+
+
+def _add_timings(timings, other):
+    """Soma as fases de other em timings (o corpo considerado é o de other)."""
+    for phase in PHASES:
+        timings[phase] += other[phase]
+    timings["body_bytes"] = other["body_bytes"]
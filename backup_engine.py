@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Backup incremental e deduplicado do Projeto Linux.
+Cada arquivo é dividido em blocos de tamanho fixo, identificados pelo
+SHA-256 do conteúdo e gravados comprimidos uma única vez no repositório;
+cada backup (snapshot) é apenas um manifesto JSON com a lista de arquivos
+e seus blocos. Arquivos com o mesmo tamanho, mtime e inode da execução
+anterior nem são lidos (cache de manifesto), e a compressão roda em
+paralelo em todos os núcleos.
+"""
+
+import os
+import sys
+import glob
+import json
+import zlib
+import fcntl
+import socket
+import hashlib
+import argparse
+import datetime
+import platform
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Configurações
+REPOSITORY_DIR = "/backup/projeto-linux"
+PROJECT_NAME = "projeto-linux"
+KEEP_SNAPSHOTS = 10  # snapshots mantidos pela limpeza
+CHUNK_SIZE = 1024 * 1024  # blocos fixos: logs crescem no final, então os blocos anteriores se repetem
+COMPRESS_LEVEL = 6
+MANIFEST_VERSION = 1
+
+# Origens do backup, por categoria (caminhos absolutos, diretórios ou padrões glob)
+SOURCES = {
+    "nginx": ["/etc/nginx/sites-available/projeto-linux", "/etc/nginx/nginx.conf"],
+    "web": ["/var/www/html/projeto-linux"],
+    "scripts": [
+        f"/home/ubuntu/{name}" for name in (
+            "monitor_site.py", "webhook_config.py", "log_analyzer.py", "nginx_parser.py", "log_sketches.py",
+            "timeseries_store.py", "async_http.py", "alert_outbox.py", "check_history.py",
+            "metrics_exporter.py", "report_writer.py", "backup_engine.py", "monitor_targets.json",
+            "scripts_backup.sh"
+        )
+    ],
+    "systemd": [
+        "/etc/systemd/system/monitor-site.service", "/etc/systemd/system/monitor-site.timer",
+        "/etc/systemd/system/monitor-site-daemon.service"
+    ],
+    "logrotate": ["/etc/logrotate.d/projeto-linux"],
+    "logs": [
+        "/var/log/monitoramento.log", "/var/log/monitoramento.jsonl",
+        "/var/log/nginx/projeto-linux.access.log", "/var/log/nginx/projeto-linux.error.log",
+        "/home/ubuntu/relatorio_logs_*", "/home/ubuntu/resumo_*"
+    ],
+    "documentation": ["/home/ubuntu/README.md", "/home/ubuntu/INSTALL.md", "/home/ubuntu/todo.md"]
+}
+
+# Primeiro byte de cada bloco gravado: comprimido com zlib ou guardado como está
+STORED_ZLIB = b"Z"
+STORED_RAW = b"R"
+
+
+def _write_atomic(path, data):
+    """Grava bytes em path por meio de um arquivo temporário renomeado."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def iter_source_files(sources=SOURCES):
+    """
+    Percorre os arquivos das origens do backup.
+
+    Yields:
+        Tuplas (categoria, caminho absoluto), cada arquivo uma única vez
+    """
+    seen = set()
+    for category, patterns in sources.items():
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]:
+                if os.path.isdir(path):
+                    files = []
+                    for root, dirs, names in os.walk(path):
+                        dirs.sort()
+                        files.extend(os.path.join(root, name) for name in sorted(names))
+                else:
+                    files = [path]
+                for file_path in files:
+                    if file_path not in seen and os.path.isfile(file_path):
+                        seen.add(file_path)
+                        yield category, file_path
+
+
+def collect_info():
+    """Informações do sistema registradas no manifesto (antigo backup_info.txt)."""
+    def command(*args):
+        try:
+            result = subprocess.run(args, capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        output = (result.stdout or result.stderr).strip()
+        return output.splitlines()[0] if output else None
+
+    return {
+        "hostname": socket.gethostname(),
+        "user": os.environ.get("USER") or str(os.getuid()),
+        "system": platform.platform(),
+        "kernel": platform.release(),
+        "python": platform.python_version(),
+        "nginx": command("nginx", "-v"),
+        "services": {name: command("systemctl", "is-active", name) for name in ("nginx", "monitor-site.timer")}
+    }
+
+
+class BackupRepository:
+    """
+    Repositório de blocos e manifestos.
+
+    Estrutura de `directory`:
+        chunks/ab/abcdef...  blocos, nomeados pelo SHA-256 do conteúdo original
+        snapshots/*.json     um manifesto por backup
+        cache.json           tamanho, mtime, inode e blocos de cada arquivo já lido
+        lock                 impede backups e limpezas simultâneos
+    """
+
+    def __init__(self, directory=REPOSITORY_DIR):
+        self.directory = directory
+        self.chunks_dir = os.path.join(directory, "chunks")
+        self.snapshots_dir = os.path.join(directory, "snapshots")
+        self.cache_file = os.path.join(directory, "cache.json")
+        self._lock = None
+
+    def __enter__(self):
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        self._lock = open(os.path.join(self.directory, "lock"), 'w')
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock.close()
+            raise RuntimeError(f"Outro backup está em andamento em {self.directory}")
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.close()
+        return False
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def has_chunk(self, digest):
+        """True se o bloco já está no repositório."""
+        return os.path.exists(self._chunk_path(digest))
+
+    def store_chunk(self, digest, data):
+        """
+        Comprime e grava um bloco (executado nas threads de compressão).
+
+        Returns:
+            Bytes ocupados no repositório
+        """
+        compressed = zlib.compress(data, COMPRESS_LEVEL)
+        stored = STORED_ZLIB + compressed if len(compressed) < len(data) else STORED_RAW + data
+        path = self._chunk_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, stored)
+        return len(stored)
+
+    def read_chunk(self, digest):
+        """
+        Lê um bloco e confere o SHA-256.
+
+        Raises:
+            ValueError: Bloco corrompido
+        """
+        with open(self._chunk_path(digest), 'rb') as f:
+            stored = f.read()
+        data = zlib.decompress(stored[1:]) if stored[:1] == STORED_ZLIB else stored[1:]
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"bloco {digest} corrompido")
+        return data
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def snapshots(self):
+        """Nomes dos snapshots, do mais antigo para o mais recente."""
+        return sorted(name[:-len(".json")] for name in os.listdir(self.snapshots_dir) if name.endswith(".json"))
+
+    def load_manifest(self, name):
+        """
+        Lê o manifesto de um snapshot.
+
+        Raises:
+            FileNotFoundError: Snapshot inexistente
+        """
+        with open(os.path.join(self.snapshots_dir, f"{name}.json"), 'r') as f:
+            return json.load(f)
+
+    def backup(self, sources=SOURCES, workers=None, progress=print):
+        """
+        Cria um snapshot das origens.
+
+        Args:
+            sources: Dict categoria -> caminhos (ver SOURCES)
+            workers: Threads de compressão (padrão: número de núcleos)
+            progress: Função chamada com mensagens de andamento
+
+        Returns:
+            Manifesto criado (inclui o resumo em "stats")
+        """
+        workers = workers or os.cpu_count() or 1
+        cache = self._load_cache()
+        new_cache = {}
+        stats = dict.fromkeys(("files", "unchanged", "bytes", "bytes_read", "new_chunks", "stored_bytes"), 0)
+        files = []
+        queued = set()  # blocos novos já enviados à compressão nesta execução
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def submit(digest, data):
+                # Limita os blocos em memória aguardando compressão
+                while len(pending) >= workers * 2:
+                    stats["stored_bytes"] += pending.popleft().result()
+                pending.append(pool.submit(self.store_chunk, digest, data))
+                stats["new_chunks"] += 1
+
+            for category, path in iter_source_files(sources):
+                try:
+                    st = os.stat(path)
+                    key = [st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev]
+                    cached = cache.get(path)
+                    if cached and cached["key"] == key and all(map(self.has_chunk, cached["chunks"])):
+                        chunks = cached["chunks"]
+                        stats["unchanged"] += 1
+                    else:
+                        chunks = []
+                        with open(path, 'rb') as f:
+                            while True:
+                                data = f.read(CHUNK_SIZE)
+                                if not data:
+                                    break
+                                stats["bytes_read"] += len(data)
+                                digest = hashlib.sha256(data).hexdigest()
+                                chunks.append(digest)
+                                if digest not in queued and not self.has_chunk(digest):
+                                    queued.add(digest)
+                                    submit(digest, data)
+                except OSError as e:
+                    progress(f"Arquivo ignorado ({path}): {e}")
+                    continue
+                new_cache[path] = {"key": key, "chunks": chunks}
+                files.append({
+                    "path": path, "category": category, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                    "mode": st.st_mode & 0o7777, "uid": st.st_uid, "gid": st.st_gid, "chunks": chunks
+                })
+                stats["files"] += 1
+                stats["bytes"] += st.st_size
+            while pending:
+                stats["stored_bytes"] += pending.popleft().result()
+
+        now = datetime.datetime.now()
+        name = f"{PROJECT_NAME}_{now:%Y%m%d_%H%M%S}"
+        if os.path.exists(os.path.join(self.snapshots_dir, f"{name}.json")):
+            name = f"{name}_{now:%f}"
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "name": name,
+            "created_at": now.isoformat(),
+            "chunk_size": CHUNK_SIZE,
+            "info": collect_info(),
+            "stats": stats,
+            "files": files
+        }
+        # Blocos antes do manifesto: um manifesto gravado sempre tem todos os seus blocos
+        _write_atomic(os.path.join(self.snapshots_dir, f"{name}.json"),
+                      json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+        _write_atomic(self.cache_file, json.dumps(new_cache, separators=(",", ":")).encode("utf-8"))
+        return manifest
+
+    def restore(self, name, target, prefix=None, progress=print):
+        """
+        Restaura os arquivos de um snapshot.
+
+        Args:
+            name: Snapshot a restaurar
+            target: Diretório de destino; os arquivos vão para target + caminho
+                    original ("/" restaura nos locais originais)
+            prefix: Restaura apenas os caminhos iniciados por prefix (opcional)
+            progress: Função chamada com mensagens de andamento
+
+        Returns:
+            Número de arquivos restaurados
+
+        Raises:
+            FileNotFoundError: Snapshot ou bloco inexistente
+            ValueError: Bloco corrompido
+        """
+        manifest = self.load_manifest(name)
+        restored = 0
+        for entry in manifest["files"]:
+            if prefix and not entry["path"].startswith(prefix):
+                continue
+            destination = os.path.join(target, entry["path"].lstrip("/"))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            tmp_path = f"{destination}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                for digest in entry["chunks"]:
+                    f.write(self.read_chunk(digest))
+            os.chmod(tmp_path, entry["mode"])
+            if os.geteuid() == 0:
+                os.chown(tmp_path, entry["uid"], entry["gid"])
+            os.utime(tmp_path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+            os.replace(tmp_path, destination)
+            restored += 1
+            progress(f"Restaurado: {destination}")
+        return restored
+
+    def prune(self, keep=KEEP_SNAPSHOTS):
+        """
+        Mantém os `keep` snapshots mais recentes e apaga os blocos que
+        nenhum snapshot restante usa. Com keep <= 0 nenhum snapshot é
+        removido (apenas os blocos sem referência).
+
+        Returns:
+            Tupla (snapshots removidos, blocos removidos, bytes liberados)
+        """
+        names = self.snapshots()
+        removed = names[:-keep] if keep > 0 else []
+        for name in removed:
+            os.remove(os.path.join(self.snapshots_dir, f"{name}.json"))
+
+        referenced = set()
+        for name in self.snapshots():
+            for entry in self.load_manifest(name)["files"]:
+                referenced.update(entry["chunks"])
+        chunks = freed = 0
+        for root, _, names_in_dir in os.walk(self.chunks_dir):
+            for chunk_name in names_in_dir:
+                if chunk_name not in referenced:
+                    path = os.path.join(root, chunk_name)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    chunks += 1
+        return removed, chunks, freed
+
+
+def _format_size(size):
+    """Tamanho legível (B, KB, MB, GB)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def parse_args(argv=None):
+    """Interpreta os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="Backup incremental - Projeto Linux")
+    parser.add_argument("--repository", default=REPOSITORY_DIR, metavar="DIR",
+                        help=f"diretório do repositório de backups (padrão: {REPOSITORY_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backup = commands.add_parser("backup", help="cria um snapshot e aplica a retenção")
+    backup.add_argument("--keep", type=int, default=KEEP_SNAPSHOTS, metavar="N",
+                        help=f"snapshots mantidos (padrão: {KEEP_SNAPSHOTS}; 0 = não remove nenhum)")
+    backup.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="threads de compressão (padrão: número de núcleos)")
+
+    commands.add_parser("list", help="lista os snapshots")
+
+    restore = commands.add_parser("restore", help="restaura um snapshot")
+    restore.add_argument("snapshot", help="nome do snapshot (ou 'latest')")
+    restore.add_argument("--target", default=None, metavar="DIR",
+                         help="diretório de destino (padrão: ./restauracao_<snapshot>; '/' restaura nos locais originais)")
+    restore.add_argument("--path", default=None, metavar="PREFIXO",
+                         help="restaura apenas os arquivos sob este caminho (ex.: /etc/nginx)")
+
+    prune = commands.add_parser("prune", help="remove snapshots antigos e blocos não usados")
+    prune.add_argument("--keep", type=int, default=KEEP_SNAPSHOTS, metavar="N",
+                       help=f"snapshots mantidos (padrão: {KEEP_SNAPSHOTS})")
+    args = parser.parse_args(argv)
+    if getattr(args, "keep", 0) < 0:
+        parser.error("--keep deve ser >= 0")
+    if args.command == "prune" and args.keep == 0:
+        parser.error("prune --keep deve ser >= 1 (para não apagar todos os snapshots)")
+    if getattr(args, "workers", None) is not None and args.workers < 1:
+        parser.error("--workers deve ser >= 1")
+    return args
+
+
+def main():
+    """Função principal."""
+    args = parse_args()
+    try:
+        with BackupRepository(args.repository) as repository:
+            if args.command == "backup":
+                manifest = repository.backup(workers=args.workers)
+                stats = manifest["stats"]
+                print(f"Snapshot {manifest['name']}: {stats['files']} arquivos ({_format_size(stats['bytes'])}), "
+                      f"{stats['unchanged']} sem alteração")
+                print(f"Lidos: {_format_size(stats['bytes_read'])} - blocos novos: {stats['new_chunks']} "
+                      f"({_format_size(stats['stored_bytes'])} gravados)")
+                if args.keep:
+                    removed, chunks, freed = repository.prune(args.keep)
+                    print(f"Retenção: {len(removed)} snapshot(s) e {chunks} bloco(s) removidos "
+                          f"({_format_size(freed)} liberados)")
+            elif args.command == "list":
+                for name in repository.snapshots():
+                    manifest = repository.load_manifest(name)
+                    size = sum(entry["size"] for entry in manifest["files"])
+                    print(f"{name}  {len(manifest['files']):5d} arquivos  {_format_size(size):>10}  "
+                          f"{manifest['info']['hostname']}")
+            elif args.command == "restore":
+                names = repository.snapshots()
+                name = names[-1] if args.snapshot == "latest" and names else args.snapshot
+                target = args.target or os.path.abspath(f"restauracao_{name}")
+                count = repository.restore(name, target, args.path)
+                print(f"{count} arquivo(s) restaurado(s) em {target}")
+            elif args.command == "prune":
+                removed, chunks, freed = repository.prune(args.keep)
+                print(f"{len(removed)} snapshot(s) e {chunks} bloco(s) removidos ({_format_size(freed)} liberados)")
+    except FileNotFoundError as e:
+        print(f"Não encontrado: {e.filename or e}", file=sys.stderr)
+        sys.exit(1)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
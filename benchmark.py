@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do Projeto Linux.
+Gera logs sintéticos determinísticos (log de acesso no formato combined e
+logs de monitoramento de texto e JSON), sobe um servidor HTTP local com
+latência e falhas controláveis e mede analyze_nginx_access_log,
+analyze_monitoring_log e check_site_status: linhas por segundo, pico de
+memória (RSS) e o custo da verificação além da latência do servidor.
+Os resultados podem ser gravados como referência e comparados depois.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import logging
+import argparse
+import datetime
+import platform
+import resource
+import tempfile
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configurações
+BASELINE_FILE = "benchmark_baseline.json"
+REGRESSION_TOLERANCE = 0.10  # variação aceita em relação à referência (10%)
+DEFAULT_SEED = 42
+GENERATOR_START = datetime.datetime(2025, 1, 15, tzinfo=datetime.timezone(datetime.timedelta(hours=-3)))
+GENERATOR_SPAN = 86400  # segundos cobertos pelos logs gerados
+WRITE_BATCH_LINES = 10000
+
+# Métricas de cada resultado e se valores maiores são melhores
+METRIC_DIRECTIONS = {
+    "lines_per_second": True,
+    "peak_rss_kb": False,
+    "mean_ms": False,
+    "p99_ms": False,
+    "overhead_ms": False
+}
+
+USER_AGENT_TEMPLATES = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{}.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:{}.0) Gecko/20100101 Firefox/{}.0",
+    "curl/7.{}.0",
+    "Googlebot/2.{} (+http://www.google.com/bot.html)"
+)
+ERROR_STATUSES = ("404", "404", "403", "500", "502", "503")
+
+
+def _ip_address(index):
+    """Endereço IPv4 determinístico para o índice de um visitante."""
+    return f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+
+
+def _zipf_weights(count, skew):
+    """Pesos acumulados de uma distribuição de Zipf com `count` itens."""
+    cumulative = []
+    total = 0.0
+    for rank in range(1, count + 1):
+        total += 1 / rank ** skew
+        cumulative.append(total)
+    return cumulative
+
+
+def generate_access_log(path, lines, ips=5000, error_ratio=0.05, agents=50, paths=200, skew=1.1,
+                        seed=DEFAULT_SEED):
+    """
+    Gera um log de acesso do Nginx no formato combined.
+
+    A mesma combinação de parâmetros sempre gera o mesmo arquivo.
+
+    Args:
+        path: Arquivo de destino
+        lines: Número de linhas
+        ips: Quantidade de visitantes distintos (cardinalidade dos IPs)
+        error_ratio: Fração de respostas 4xx/5xx
+        agents: Quantidade de user agents distintos
+        paths: Quantidade de páginas distintas
+        skew: Expoente de Zipf da popularidade de páginas e visitantes (0 = uniforme)
+        seed: Semente do gerador pseudoaleatório
+
+    Returns:
+        Tamanho do arquivo em bytes
+    """
+    rng = random.Random(seed)
+    pages = [f"/pagina/{i}" if i else "/" for i in range(paths)]
+    page_weights = _zipf_weights(paths, skew)
+    ip_weights = _zipf_weights(ips, skew)
+    user_agents = [
+        USER_AGENT_TEMPLATES[i % len(USER_AGENT_TEMPLATES)].replace("{}", str(40 + i // len(USER_AGENT_TEMPLATES)))
+        for i in range(agents)
+    ]
+    step = GENERATOR_SPAN / max(lines, 1)
+    start = GENERATOR_START.timestamp()
+    zone = GENERATOR_START.tzinfo
+    last_second = None
+    stamp = ""
+
+    with open(path, 'w') as f:
+        for offset in range(0, lines, WRITE_BATCH_LINES):
+            count = min(WRITE_BATCH_LINES, lines - offset)
+            chosen_pages = rng.choices(pages, cum_weights=page_weights, k=count)
+            chosen_ips = rng.choices(range(ips), cum_weights=ip_weights, k=count)
+            block = []
+            for i in range(count):
+                second = int(start + (offset + i) * step)
+                if second != last_second:
+                    last_second = second
+                    stamp = datetime.datetime.fromtimestamp(second, zone).strftime("%d/%b/%Y:%H:%M:%S %z")
+                status = rng.choice(ERROR_STATUSES) if rng.random() < error_ratio else "200"
+                size = rng.randint(200, 20000) if status == "200" else 150
+                block.append(
+                    f'{_ip_address(chosen_ips[i])} - - [{stamp}] "GET {chosen_pages[i]} HTTP/1.1" {status} {size} '
+                    f'"-" "{user_agents[rng.randrange(agents)]}"\n'
+                )
+            f.write("".join(block))
+    return os.path.getsize(path)
+
+
+def generate_monitoring_log(path, checks, structured=False, failure_ratio=0.02, targets=1, seed=DEFAULT_SEED):
+    """
+    Gera um log de monitoramento no formato do monitor_site.py.
+
+    Args:
+        path: Arquivo de destino
+        checks: Número de verificações
+        structured: Gera o log JSON (CHECKS_LOG) em vez do log de texto
+        failure_ratio: Fração de verificações com falha
+        targets: Quantidade de alvos verificados
+        seed: Semente do gerador pseudoaleatório
+
+    Returns:
+        Tamanho do arquivo em bytes
+    """
+    rng = random.Random(seed)
+    step = GENERATOR_SPAN / max(checks, 1)
+    start = GENERATOR_START.replace(tzinfo=None)
+    was_up = True
+
+    with open(path, 'w') as f:
+        for offset in range(0, checks, WRITE_BATCH_LINES):
+            block = []
+            for i in range(offset, min(checks, offset + WRITE_BATCH_LINES)):
+                moment = start + datetime.timedelta(seconds=i * step)
+                target = f"alvo{i % targets}" if targets > 1 else "site"
+                is_up = rng.random() >= failure_ratio
+                latency = round(rng.lognormvariate(-4, 0.6), 6)
+                status = 200 if is_up else rng.choice((500, 502, 503, None))
+                if structured:
+                    record = {
+                        "ts": moment.isoformat(timespec="milliseconds"), "target": target,
+                        "status": status, "latency": latency if is_up else None, "up": is_up,
+                        "error": None if is_up else ("status" if status else "timeout")
+                    }
+                    block.append(json.dumps(record, separators=(",", ":")) + "\n")
+                else:
+                    prefix = moment.strftime("%Y-%m-%d %H:%M:%S,") + f"{moment.microsecond // 1000:03d}"
+                    if is_up:
+                        block.append(f"{prefix} - INFO - Site OK - Status: 200, Tempo: {latency:.2f}s\n")
+                    elif status:
+                        block.append(f"{prefix} - WARNING - Site com problema - Status: {status}, "
+                                     f"Tempo: {latency:.2f}s\n")
+                    else:
+                        block.append(f"{prefix} - ERROR - Erro ao acessar o site: Tempo esgotado após 10s\n")
+                if is_up != was_up:
+                    if structured:
+                        record = {"ts": moment.isoformat(timespec="milliseconds"), "target": target,
+                                  "alert": "up" if is_up else "down"}
+                        block.append(json.dumps(record, separators=(",", ":")) + "\n")
+                    else:
+                        block.append(f"{prefix} - INFO - Alerta enviado via Discord com sucesso\n")
+                    was_up = is_up
+            f.write("".join(block))
+    return os.path.getsize(path)
+
+
+class StandInServer:
+    """
+    Servidor HTTP local que substitui o site nos benchmarks.
+
+    Cada resposta espera `latency` segundos; uma fração `failure_ratio` das
+    requisições falha, com status 500 (failure_mode="status") ou fechando a
+    conexão sem resposta (failure_mode="reset"). As falhas são sorteadas
+    com semente fixa, de modo que a sequência se repete entre execuções.
+    """
+
+    def __init__(self, latency=0.0, failure_ratio=0.0, failure_mode="status", body_bytes=2000,
+                 seed=DEFAULT_SEED):
+        self.latency = latency
+        self.failure_ratio = failure_ratio
+        self.failure_mode = failure_mode
+        self.body = b"x" * body_bytes
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    failed = stand_in._rng.random() < stand_in.failure_ratio
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                if failed and stand_in.failure_mode == "reset":
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                body = b"erro" if failed else stand_in.body
+                self.send_response(500 if failed else 200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_HEAD = do_GET
+
+        self._handler = Handler
+
+    @property
+    def url(self):
+        """URL do servidor (após start)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self, host="127.0.0.1", port=0):
+        """Sobe o servidor em uma thread (porta 0 = porta livre qualquer)."""
+        self._server = ThreadingHTTPServer((host, port), self._handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Encerra o servidor."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _peak_rss_kb():
+    """Maior RSS (KB) deste processo e dos processos filhos já encerrados."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == "darwin":  # bytes no macOS
+        own, children = own // 1024, children // 1024
+    return max(own, children)
+
+
+def _import_monitor(directory):
+    """
+    Importa o monitor_site com os logs em `directory`, fora de /var/log.
+
+    O logging é configurado antes da importação, o que torna sem efeito o
+    basicConfig do módulo; o log estruturado é trocado antes da primeira linha.
+    """
+    logging.basicConfig(level=logging.INFO, handlers=[
+        logging.FileHandler(os.path.join(directory, "monitoramento.log"), delay=True)
+    ])
+    import monitor_site
+    for handler in monitor_site.check_logger.handlers[:]:
+        monitor_site.check_logger.removeHandler(handler)
+        handler.close()
+    monitor_site.check_logger.addHandler(
+        logging.FileHandler(os.path.join(directory, "monitoramento.jsonl"), delay=True)
+    )
+    return monitor_site
+
+
+def _bench_nginx(path, workers=1, bounded=False):
+    """Mede analyze_nginx_access_log em um processo limpo."""
+    import log_analyzer
+    started = time.perf_counter()
+    stats = log_analyzer.analyze_nginx_access_log(path, workers=workers, bounded=bounded)
+    seconds = time.perf_counter() - started
+    return {"lines": stats["throughput"]["lines_read"], "seconds": seconds,
+            "parse_failures": stats["throughput"]["parse_failures"]}
+
+
+def _bench_monitoring(path):
+    """Mede analyze_monitoring_log em um processo limpo."""
+    import log_analyzer
+    started = time.perf_counter()
+    stats = log_analyzer.analyze_monitoring_log(path)
+    seconds = time.perf_counter() - started
+    return {"lines": stats["throughput"]["lines_read"], "seconds": seconds,
+            "parse_failures": stats["throughput"]["parse_failures"]}
+
+
+def _bench_checks(url, checks, latency, log_dir):
+    """Mede check_site_status contra o servidor local, em um processo limpo."""
+    monitor_site = _import_monitor(log_dir)
+    monitor_site.SITE_URL = url
+    durations = []
+    failed = 0
+    for _ in range(checks):
+        started = time.perf_counter()
+        status = monitor_site.check_site_status()
+        durations.append(time.perf_counter() - started)
+        failed += not status["is_up"]
+    durations.sort()
+    mean = sum(durations) / len(durations)
+    return {
+        "checks": checks,
+        "failed": failed,
+        "seconds": sum(durations),
+        "mean_ms": mean * 1000,
+        "p50_ms": durations[len(durations) // 2] * 1000,
+        "p99_ms": durations[min(len(durations) - 1, int(len(durations) * 0.99))] * 1000,
+        "overhead_ms": (mean - latency) * 1000  # custo além da latência do servidor
+    }
+
+
+def _child(function, args, queue):
+    """Executa um benchmark e devolve o resultado com o pico de memória."""
+    try:
+        result = function(*args)
+        result["peak_rss_kb"] = _peak_rss_kb()
+        queue.put(result)
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_isolated(function, *args):
+    """
+    Executa um benchmark em um processo novo (spawn), para que o pico de RSS
+    e os caches de um benchmark não afetem os demais.
+
+    Returns:
+        Dict com o resultado do benchmark e peak_rss_kb
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(function, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_benchmarks(args, workdir):
+    """
+    Gera os dados e executa os benchmarks selecionados.
+
+    Args:
+        args: Argumentos de linha de comando (parse_args)
+        workdir: Diretório temporário para os arquivos gerados
+
+    Returns:
+        Dict nome do benchmark -> resultado (melhor de args.repeat execuções)
+    """
+    access_log = os.path.join(workdir, "access.log")
+    text_log = os.path.join(workdir, "monitoramento.log")
+    json_log = os.path.join(workdir, "monitoramento.jsonl")
+    benchmarks = []
+
+    if "nginx" in args.only:
+        print(f"🛠️  Gerando log de acesso: {args.lines} linhas, {args.ips} IPs, {args.agents} user agents, "
+              f"{args.error_ratio:.0%} de erros")
+        size = generate_access_log(access_log, args.lines, args.ips, args.error_ratio, args.agents,
+                                   args.paths, args.skew, args.seed)
+        print(f"   • {size / 1e6:.1f} MB")
+        benchmarks.append(("nginx_serial", _bench_nginx, (access_log, 1, False)))
+        benchmarks.append(("nginx_bounded", _bench_nginx, (access_log, 1, True)))
+        if args.workers > 1:
+            benchmarks.append((f"nginx_workers_{args.workers}", _bench_nginx, (access_log, args.workers, False)))
+
+    if "monitoring" in args.only:
+        print(f"🛠️  Gerando logs de monitoramento: {args.checks_lines} verificações")
+        generate_monitoring_log(text_log, args.checks_lines, False, args.failure_ratio, args.targets, args.seed)
+        generate_monitoring_log(json_log, args.checks_lines, True, args.failure_ratio, args.targets, args.seed)
+        benchmarks.append(("monitoring_text", _bench_monitoring, (text_log,)))
+        benchmarks.append(("monitoring_json", _bench_monitoring, (json_log,)))
+
+    server = None
+    if "checks" in args.only:
+        server = StandInServer(args.latency, args.failure_ratio, args.failure_mode, seed=args.seed).start()
+        print(f"🛠️  Servidor local em {server.url} (latência {args.latency * 1000:g}ms, "
+              f"{args.failure_ratio:.0%} de falhas por {args.failure_mode})")
+        benchmarks.append(("check_site_status", _bench_checks, (server.url, args.checks, args.latency, workdir)))
+
+    results = {}
+    try:
+        for name, function, function_args in benchmarks:
+            runs = [run_isolated(function, *function_args) for _ in range(args.repeat)]
+            errors = [run["error"] for run in runs if "error" in run]
+            if errors:
+                print(f"❌ {name}: {errors[0]}")
+                continue
+            best = min(runs, key=lambda run: run["seconds"])
+            best["peak_rss_kb"] = max(run["peak_rss_kb"] for run in runs)
+            if "lines" in best:
+                best["lines_per_second"] = best["lines"] / best["seconds"] if best["seconds"] else 0.0
+            results[name] = best
+            print_result(name, best)
+    finally:
+        if server is not None:
+            server.stop()
+    return results
+
+
+def print_result(name, result):
+    """Exibe o resultado de um benchmark."""
+    if "lines_per_second" in result:
+        print(f"   • {name}: {result['lines_per_second']:,.0f} linhas/s ({result['lines']} linhas em "
+              f"{result['seconds']:.2f}s), pico de RSS {result['peak_rss_kb'] / 1024:.1f} MB")
+    else:
+        print(f"   • {name}: média {result['mean_ms']:.2f}ms, p50 {result['p50_ms']:.2f}ms, "
+              f"p99 {result['p99_ms']:.2f}ms, custo além do servidor {result['overhead_ms']:.2f}ms "
+              f"({result['checks']} verificações, {result['failed']} falhas), "
+              f"pico de RSS {result['peak_rss_kb'] / 1024:.1f} MB")
+
+
+def compare_with_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compara os resultados com a referência gravada.
+
+    Args:
+        results: Resultados desta execução
+        baseline: Referência carregada de BASELINE_FILE
+        tolerance: Variação relativa aceita antes de apontar regressão
+
+    Returns:
+        Lista de regressões (benchmark, métrica, referência, atual)
+    """
+    regressions = []
+    print("\n📏 COMPARAÇÃO COM A REFERÊNCIA:")
+    if baseline.get("parameters") != results.get("parameters"):
+        print("   ⚠️  Referência gerada com outros parâmetros; a comparação é apenas indicativa")
+    for name, result in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            print(f"   • {name}: sem referência")
+            continue
+        for metric, higher_is_better in METRIC_DIRECTIONS.items():
+            if metric not in result or not reference.get(metric):
+                continue
+            change = (result[metric] - reference[metric]) / abs(reference[metric])
+            worse = -change if higher_is_better else change
+            mark = "❌" if worse > tolerance else "✅" if worse < -tolerance else "➖"
+            print(f"   {mark} {name} {metric}: {reference[metric]:,.2f} → {result[metric]:,.2f} ({change:+.1%})")
+            if worse > tolerance:
+                regressions.append((name, metric, reference[metric], result[metric]))
+    return regressions
+
+
+def parse_args(argv=None):
+    """Interpreta os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="Benchmarks - Projeto Linux")
+    parser.add_argument("--only", nargs="+", choices=("nginx", "monitoring", "checks"),
+                        default=["nginx", "monitoring", "checks"], help="benchmarks a executar (padrão: todos)")
+    parser.add_argument("--lines", type=int, default=500000, metavar="N", help="linhas do log de acesso")
+    parser.add_argument("--ips", type=int, default=5000, metavar="N", help="visitantes distintos")
+    parser.add_argument("--agents", type=int, default=50, metavar="N", help="user agents distintos")
+    parser.add_argument("--paths", type=int, default=200, metavar="N", help="páginas distintas")
+    parser.add_argument("--skew", type=float, default=1.1, metavar="S",
+                        help="expoente de Zipf da popularidade de páginas e visitantes (0 = uniforme)")
+    parser.add_argument("--error-ratio", type=float, default=0.05, metavar="FRAÇÃO",
+                        help="fração de respostas 4xx/5xx no log de acesso")
+    parser.add_argument("--checks-lines", type=int, default=200000, metavar="N",
+                        help="verificações nos logs de monitoramento gerados")
+    parser.add_argument("--targets", type=int, default=1, metavar="N", help="alvos nos logs de monitoramento")
+    parser.add_argument("--checks", type=int, default=200, metavar="N",
+                        help="chamadas a check_site_status contra o servidor local")
+    parser.add_argument("--latency", type=float, default=0.005, metavar="SEGUNDOS",
+                        help="latência de cada resposta do servidor local")
+    parser.add_argument("--failure-ratio", type=float, default=0.02, metavar="FRAÇÃO",
+                        help="fração de falhas do servidor local e dos logs de monitoramento")
+    parser.add_argument("--failure-mode", choices=("status", "reset"), default="status",
+                        help="falha do servidor local: status 500 ou conexão fechada")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), metavar="N",
+                        help="processos do benchmark paralelo do log de acesso (1 = não executa)")
+    parser.add_argument("--repeat", type=int, default=3, metavar="N", help="execuções de cada benchmark (vale a melhor)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="semente dos dados gerados")
+    parser.add_argument("--baseline", default=BASELINE_FILE, metavar="ARQUIVO",
+                        help=f"referência para comparação (padrão: {BASELINE_FILE})")
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como nova referência")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, metavar="FRAÇÃO",
+                        help=f"variação aceita antes de apontar regressão (padrão: {REGRESSION_TOLERANCE})")
+    parser.add_argument("--output", metavar="ARQUIVO", help="grava os resultados desta execução em JSON")
+    args = parser.parse_args(argv)
+    for name in ("lines", "ips", "agents", "paths", "checks_lines", "targets", "checks", "repeat", "workers"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} deve ser >= 1")
+    if not 0 <= args.error_ratio <= 1 or not 0 <= args.failure_ratio <= 1:
+        parser.error("as frações devem estar entre 0 e 1")
+    return args
+
+
+def main():
+    """Função principal."""
+    args = parse_args()
+    print("⏱️  Benchmarks - Projeto Linux")
+    parameters = {key: value for key, value in vars(args).items()
+                  if key not in ("baseline", "save_baseline", "tolerance", "output", "repeat")}
+
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as workdir:
+        benchmarks = run_benchmarks(args, workdir)
+    results = {
+        "generated_at": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "parameters": parameters,
+        "benchmarks": benchmarks
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Referência salva em: {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressão(ões) acima de {args.tolerance:.0%}")
+        sys.exit(1)
+    print("\n✅ Benchmarks concluídos!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Histórico recente das verificações do monitoramento.
+Cada alvo tem um anel de tamanho fixo em um arquivo mapeado em memória
+(mmap): cada verificação ocupa um slot binário de 32 bytes com timestamp,
+status, latência e código de erro, protegido por CRC32, de modo que uma
+gravação interrompida invalida apenas o próprio slot.
+"""
+
+import os
+import re
+import mmap
+import zlib
+import struct
+import datetime
+
+HISTORY_DIR = "/var/lib/monitoramento/historico"
+SLOTS = 2880  # verificações guardadas por alvo (4 horas a cada 5s, 2 dias a cada minuto)
+
+MAGIC = b"PLCHK001"
+VERSION = 1
+HEADER = struct.Struct("<8sHIHH")  # magic, versão, slots, tamanho do slot, tamanho do nome
+HEADER_SIZE = 256  # cabeçalho + nome do alvo em UTF-8
+MAX_NAME = HEADER_SIZE - HEADER.size
+
+# Slot: sequência, timestamp (ms), latência (µs), status HTTP, código de erro, no ar; CRC32 ao final
+RECORD = struct.Struct("<QqIHHB3x")
+CRC = struct.Struct("<I")
+SLOT_SIZE = RECORD.size + CRC.size
+NO_LATENCY = 0xFFFFFFFF
+
+# Códigos de erro gravados no slot (índice na tupla); "status" é um código HTTP inesperado
+ERROR_TYPES = (None, "timeout", "dns", "connect", "tls", "connection", "protocol", "status")
+ERROR_DESCRIPTIONS = {
+    "timeout": "tempo esgotado",
+    "dns": "falha de DNS",
+    "connect": "falha de conexão",
+    "tls": "falha de TLS",
+    "connection": "conexão interrompida",
+    "protocol": "erro de protocolo",
+    "status": "status inesperado"
+}
+
+
+def _file_name(name):
+    """Nome do arquivo do anel de um alvo (o nome pode ser uma URL)."""
+    safe = re.sub(r"[^\w.-]", "_", name)[:80]
+    return f"{safe}-{zlib.crc32(name.encode('utf-8')):08x}.ring"
+
+
+class CheckRing:
+    """
+    Anel de verificações de um alvo.
+
+    O arquivo tem sempre HEADER_SIZE + slots * SLOT_SIZE bytes. A verificação
+    de sequência n vai para o slot (n - 1) % slots; a mais recente é a de
+    maior sequência válida, encontrada ao abrir o arquivo. Com readonly, o
+    arquivo precisa existir e o número de slots vem do próprio cabeçalho.
+    """
+
+    def __init__(self, path, name, slots=SLOTS, readonly=False):
+        encoded = name.encode("utf-8")[:MAX_NAME]
+        self.path = path
+        self.name = name
+
+        fd = os.open(path, os.O_RDONLY if readonly else os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if readonly:
+                magic, _, slots, slot_size, _ = HEADER.unpack(
+                    os.pread(fd, HEADER.size, 0).ljust(HEADER.size, b"\0")
+                )
+                if magic != MAGIC or slot_size != SLOT_SIZE:
+                    raise ValueError(f"{path} não é um histórico de verificações")
+            size = HEADER_SIZE + slots * SLOT_SIZE
+            header = HEADER.pack(MAGIC, VERSION, slots, SLOT_SIZE, len(encoded)) + encoded
+            if readonly:
+                if os.fstat(fd).st_size < size:
+                    raise ValueError(f"{path} está truncado")
+                self._map = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+            else:
+                if os.fstat(fd).st_size != size or os.pread(fd, len(header), 0) != header:
+                    # Arquivo novo ou de outra configuração: recomeça vazio
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, header, 0)
+                self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.slots = slots
+        self.readonly = readonly
+
+        self.head = 0
+        for index, slot in enumerate(struct.iter_unpack(f"{SLOT_SIZE}s", self._map[HEADER_SIZE:])):
+            record = self._unpack(slot[0])
+            if record is not None and (record[0] - 1) % slots == index:
+                self.head = max(self.head, record[0])
+
+    def __len__(self):
+        return min(self.head, self.slots)
+
+    def close(self):
+        """Grava as páginas alteradas e fecha o mapeamento."""
+        if not self._map.closed:
+            if not self.readonly:
+                self._map.flush()
+            self._map.close()
+
+    @staticmethod
+    def _unpack(slot):
+        """Tupla do slot ou None se vazio ou corrompido."""
+        data = slot[:RECORD.size]
+        if CRC.unpack_from(slot, RECORD.size)[0] != zlib.crc32(data):
+            return None
+        record = RECORD.unpack(data)
+        return record if record[0] else None
+
+    def append(self, status_info):
+        """
+        Registra uma verificação.
+
+        Args:
+            status_info: Registro criado por build_status
+        """
+        timestamp = datetime.datetime.fromisoformat(status_info["timestamp"]).timestamp()
+        response_time = status_info.get("response_time")
+        latency = NO_LATENCY if response_time is None else min(int(response_time * 1e6), NO_LATENCY - 1)
+        error_type = status_info.get("error_type")
+        if error_type is None and not status_info["is_up"]:
+            error_type = "status" if status_info.get("status_code") else "protocol"
+        sequence = self.head + 1
+        data = RECORD.pack(
+            sequence, int(timestamp * 1000), latency, status_info.get("status_code") or 0,
+            ERROR_TYPES.index(error_type) if error_type in ERROR_TYPES else ERROR_TYPES.index("protocol"),
+            1 if status_info["is_up"] else 0
+        )
+        offset = HEADER_SIZE + (sequence - 1) % self.slots * SLOT_SIZE
+        self._map[offset:offset + SLOT_SIZE] = data + CRC.pack(zlib.crc32(data))
+        self.head = sequence
+
+    def _walk(self):
+        """Tuplas válidas, da mais recente para a mais antiga."""
+        for sequence in range(self.head, max(0, self.head - self.slots), -1):
+            offset = HEADER_SIZE + (sequence - 1) % self.slots * SLOT_SIZE
+            record = self._unpack(self._map[offset:offset + SLOT_SIZE])
+            if record is not None and record[0] == sequence:
+                yield record
+
+    def records(self, limit=None):
+        """
+        Lê as verificações mais recentes.
+
+        Args:
+            limit: Quantidade máxima (padrão: todas as guardadas)
+
+        Returns:
+            Lista de dicts (timestamp, status_code, response_time, error_type, is_up), da mais antiga para a mais recente
+        """
+        records = []
+        for sequence, timestamp, latency, status_code, error, is_up in self._walk():
+            if limit is not None and len(records) >= limit:
+                break
+            records.append({
+                "timestamp": datetime.datetime.fromtimestamp(timestamp / 1000),
+                "status_code": status_code or None,
+                "response_time": None if latency == NO_LATENCY else latency / 1e6,
+                "error_type": ERROR_TYPES[error] if error < len(ERROR_TYPES) else "protocol",
+                "is_up": bool(is_up)
+            })
+        records.reverse()
+        return records
+
+    def is_up(self, failures=1, window=1):
+        """
+        Estado usado nos alertas: fora do ar quando pelo menos `failures`
+        das últimas `window` verificações falharam.
+
+        Returns:
+            True se o alvo está no ar (ou não há verificações)
+        """
+        failed = 0
+        for index, record in enumerate(self._walk()):
+            if index >= window:
+                break
+            failed += not record[5]
+        return failed < failures
+
+
+class CheckHistory:
+    """
+    Anéis de todos os alvos, um arquivo por alvo em `directory`.
+
+    Com readonly (consultas), nenhum arquivo é criado ou alterado.
+    """
+
+    def __init__(self, directory=HISTORY_DIR, slots=SLOTS, readonly=False):
+        self.directory = directory
+        self.slots = slots
+        self.readonly = readonly
+        self._rings = {}
+
+    def target(self, name):
+        """
+        Anel de um alvo, criado se necessário.
+
+        Raises:
+            OSError: Falha ao criar, abrir ou mapear o arquivo
+            ValueError: Arquivo inválido (apenas com readonly)
+        """
+        ring = self._rings.get(name)
+        if ring is None:
+            if not self.readonly:
+                os.makedirs(self.directory, exist_ok=True)
+            ring = CheckRing(os.path.join(self.directory, _file_name(name)), name, self.slots, self.readonly)
+            self._rings[name] = ring
+        return ring
+
+    def names(self):
+        """Nomes dos alvos com histórico no diretório."""
+        names = []
+        try:
+            files = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return names
+        for file_name in files:
+            if not file_name.endswith(".ring"):
+                continue
+            with open(os.path.join(self.directory, file_name), 'rb') as f:
+                header = f.read(HEADER_SIZE)
+            if len(header) < HEADER.size:
+                continue
+            magic, _, _, _, name_length = HEADER.unpack_from(header)
+            if magic == MAGIC:
+                names.append(header[HEADER.size:HEADER.size + name_length].decode("utf-8", "replace"))
+        return names
+
+    def close(self):
+        """Fecha todos os anéis abertos."""
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
@@ -1,254 +1,2960 @@
-#!/usr/bin/env python3
-"""
-Analisador de Logs do Projeto Linux
-Analisa logs do Nginx e do sistema de monitoramento para gerar relatórios.
-"""
-
-import re
-import json
-import datetime
-from collections import defaultdict, Counter
-from pathlib import Path
-
-def analyze_nginx_access_log(log_path="/var/log/nginx/projeto-linux.access.log"):
-    """
-    Analisa o log de acesso do Nginx.
-    
-    Args:
-        log_path: Caminho para o arquivo de log
-        
-    Returns:
-        Dict com estatísticas do log
-    """
-    stats = {
-        "total_requests": 0,
-        "unique_ips": set(),
-        "status_codes": Counter(),
-        "user_agents": Counter(),
-        "hourly_requests": defaultdict(int),
-        "daily_requests": defaultdict(int),
-        "top_pages": Counter(),
-        "errors": []
-    }
-    
-    # Padrão para log do Nginx (formato padrão)
-    log_pattern = re.compile(
-        r'(?P<ip>\S+) - - \[(?P<datetime>[^\]]+)\] "(?P<method>\S+) (?P<path>\S+) (?P<protocol>\S+)" '
-        r'(?P<status>\d+) (?P<size>\d+) "(?P<referer>[^"]*)" "(?P<user_agent>[^"]*)"'
-    )
-    
-    try:
-        with open(log_path, 'r') as f:
-            for line in f:
-                match = log_pattern.match(line.strip())
-                if match:
-                    data = match.groupdict()
-                    
-                    stats["total_requests"] += 1
-                    stats["unique_ips"].add(data["ip"])
-                    stats["status_codes"][data["status"]] += 1
-                    stats["user_agents"][data["user_agent"]] += 1
-                    stats["top_pages"][data["path"]] += 1
-                    
-                    # Parse datetime
-                    try:
-                        dt = datetime.datetime.strptime(data["datetime"], "%d/%b/%Y:%H:%M:%S %z")
-                        hour_key = dt.strftime("%Y-%m-%d %H:00")
-                        day_key = dt.strftime("%Y-%m-%d")
-                        
-                        stats["hourly_requests"][hour_key] += 1
-                        stats["daily_requests"][day_key] += 1
-                        
-                        # Verifica se é erro
-                        if int(data["status"]) >= 400:
-                            stats["errors"].append({
-                                "timestamp": dt.isoformat(),
-                                "ip": data["ip"],
-                                "status": data["status"],
-                                "path": data["path"],
-                                "user_agent": data["user_agent"]
-                            })
-                    except ValueError:
-                        pass
-                        
-    except FileNotFoundError:
-        print(f"Arquivo de log não encontrado: {log_path}")
-    except Exception as e:
-        print(f"Erro ao analisar log: {e}")
-    
-    # Converte set para lista para serialização JSON
-    stats["unique_ips"] = list(stats["unique_ips"])
-    
-    return stats
-
-def analyze_monitoring_log(log_path="/var/log/monitoramento.log"):
-    """
-    Analisa o log do sistema de monitoramento.
-    
-    Args:
-        log_path: Caminho para o arquivo de log
-        
-    Returns:
-        Dict com estatísticas do monitoramento
-    """
-    stats = {
-        "total_checks": 0,
-        "successful_checks": 0,
-        "failed_checks": 0,
-        "alerts_sent": 0,
-        "average_response_time": 0,
-        "response_times": [],
-        "errors": [],
-        "uptime_percentage": 0,
-        "downtime_events": []
-    }
-    
-    try:
-        with open(log_path, 'r') as f:
-            for line in f:
-                if "Site OK" in line:
-                    stats["total_checks"] += 1
-                    stats["successful_checks"] += 1
-                    
-                    # Extrai tempo de resposta
-                    time_match = re.search(r'Tempo: ([\d.]+)s', line)
-                    if time_match:
-                        response_time = float(time_match.group(1))
-                        stats["response_times"].append(response_time)
-                
-                elif "Site com problema" in line or "Erro ao acessar" in line:
-                    stats["total_checks"] += 1
-                    stats["failed_checks"] += 1
-                    
-                    # Extrai timestamp do erro
-                    timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                    if timestamp_match:
-                        stats["downtime_events"].append({
-                            "timestamp": timestamp_match.group(1),
-                            "error": line.strip()
-                        })
-                
-                elif "Alerta" in line and "enviado" in line:
-                    stats["alerts_sent"] += 1
-                    
-    except FileNotFoundError:
-        print(f"Arquivo de log não encontrado: {log_path}")
-    except Exception as e:
-        print(f"Erro ao analisar log de monitoramento: {e}")
-    
-    # Calcula estatísticas
-    if stats["response_times"]:
-        stats["average_response_time"] = sum(stats["response_times"]) / len(stats["response_times"])
-    
-    if stats["total_checks"] > 0:
-        stats["uptime_percentage"] = (stats["successful_checks"] / stats["total_checks"]) * 100
-    
-    return stats
-
-def generate_report():
-    """
-    Gera um relatório completo dos logs.
-    
-    Returns:
-        Dict com o relatório completo
-    """
-    print("🔍 Analisando logs...")
-    
-    nginx_stats = analyze_nginx_access_log()
-    monitoring_stats = analyze_monitoring_log()
-    
-    report = {
-        "generated_at": datetime.datetime.now().isoformat(),
-        "nginx": nginx_stats,
-        "monitoring": monitoring_stats,
-        "summary": {
-            "total_web_requests": nginx_stats["total_requests"],
-            "unique_visitors": len(nginx_stats["unique_ips"]),
-            "monitoring_uptime": monitoring_stats["uptime_percentage"],
-            "total_monitoring_checks": monitoring_stats["total_checks"],
-            "alerts_sent": monitoring_stats["alerts_sent"]
-        }
-    }
-    
-    return report
-
-def print_summary_report(report):
-    """
-    Imprime um resumo do relatório.
-    
-    Args:
-        report: Relatório gerado pela função generate_report
-    """
-    print("\n" + "="*60)
-    print("📊 RELATÓRIO DE LOGS - PROJETO LINUX")
-    print("="*60)
-    
-    print(f"\n🕒 Gerado em: {report['generated_at']}")
-    
-    print("\n🌐 ESTATÍSTICAS DO SERVIDOR WEB:")
-    print(f"   • Total de requisições: {report['nginx']['total_requests']}")
-    print(f"   • Visitantes únicos: {len(report['nginx']['unique_ips'])}")
-    print(f"   • Códigos de status mais comuns:")
-    for status, count in report['nginx']['status_codes'].most_common(5):
-        print(f"     - {status}: {count} requisições")
-    
-    if report['nginx']['top_pages']:
-        print(f"   • Páginas mais acessadas:")
-        for page, count in report['nginx']['top_pages'].most_common(5):
-            print(f"     - {page}: {count} acessos")
-    
-    print("\n📊 ESTATÍSTICAS DO MONITORAMENTO:")
-    print(f"   • Total de verificações: {report['monitoring']['total_checks']}")
-    print(f"   • Verificações bem-sucedidas: {report['monitoring']['successful_checks']}")
-    print(f"   • Verificações com falha: {report['monitoring']['failed_checks']}")
-    print(f"   • Uptime: {report['monitoring']['uptime_percentage']:.2f}%")
-    print(f"   • Tempo médio de resposta: {report['monitoring']['average_response_time']:.3f}s")
-    print(f"   • Alertas enviados: {report['monitoring']['alerts_sent']}")
-    
-    if report['monitoring']['downtime_events']:
-        print(f"\n⚠️  EVENTOS DE INDISPONIBILIDADE:")
-        for event in report['monitoring']['downtime_events'][-5:]:  # Últimos 5
-            print(f"   • {event['timestamp']}: {event['error']}")
-    
-    if report['nginx']['errors']:
-        print(f"\n❌ ERROS HTTP RECENTES:")
-        for error in report['nginx']['errors'][-5:]:  # Últimos 5
-            print(f"   • {error['timestamp']}: {error['status']} - {error['path']} ({error['ip']})")
-
-def save_report_json(report, filename=None):
-    """
-    Salva o relatório em formato JSON.
-    
-    Args:
-        report: Relatório a ser salvo
-        filename: Nome do arquivo (opcional)
-    """
-    if filename is None:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"/home/ubuntu/relatorio_logs_{timestamp}.json"
-    
-    try:
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=2, default=str)
-        print(f"\n💾 Relatório salvo em: {filename}")
-    except Exception as e:
-        print(f"❌ Erro ao salvar relatório: {e}")
-
-def main():
-    """Função principal."""
-    print("📋 Analisador de Logs - Projeto Linux")
-    
-    # Gera o relatório
-    report = generate_report()
-    
-    # Exibe o resumo
-    print_summary_report(report)
-    
-    # Salva o relatório completo
-    save_report_json(report)
-    
-    print("\n✅ Análise concluída!")
-
-if __name__ == "__main__":
-    main()
-
+#!/usr/bin/env python3
+"""
+Analisador de Logs do Projeto Linux
+Analisa logs do Nginx e do sistema de monitoramento para gerar relatórios.
+"""
+
+import re
+import os
+import json
+import hashlib
+import argparse
+import datetime
+import time
+import math
+import heapq
+import gzip
+import socket
+import tempfile
+from collections import defaultdict, deque, Counter
+from itertools import islice
+from functools import lru_cache, partial
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from nginx_parser import (
+    COMBINED_LOG_FORMAT, FIELDS, compile_log_format,
+    ERROR_CONTEXT_SEPARATOR, ErrorLogParser, iter_error_entries, split_error_message, error_template
+)
+from log_sketches import HyperLogLog, SpaceSaving, LatencyHistogram, SlidingWindow, RateAnomalyDetector
+from timeseries_store import RollupStore
+from metrics_exporter import MetricsRegistry
+from report_writer import write_report, write_summary, load_summary
+
+# Configurações
+NGINX_ACCESS_LOG = "/var/log/nginx/projeto-linux.access.log"
+NGINX_ERROR_LOG = "/var/log/nginx/projeto-linux.error.log"
+MONITORING_LOG = "/var/log/monitoramento.log"
+MONITORING_CHECKS_LOG = "/var/log/monitoramento.jsonl"  # log estruturado (preferido quando existe)
+STATE_DIR = "/home/ubuntu/.log_analyzer"
+CHECKPOINT_FILE = os.path.join(STATE_DIR, "nginx_access.checkpoint.json")
+NGINX_GENERATIONS_CACHE = os.path.join(STATE_DIR, "nginx_access.generations.json")
+ERROR_CHECKPOINT_FILE = os.path.join(STATE_DIR, "nginx_error.checkpoint.json")
+NGINX_ERROR_GENERATIONS_CACHE = os.path.join(STATE_DIR, "nginx_error.generations.json")
+MONITORING_GENERATIONS_CACHE = os.path.join(STATE_DIR, "monitoring.generations.json")
+CHECKPOINT_VERSION = 2
+SUMMARY_VERSION = 4  # formato dos resumos no cache de gerações rotacionadas
+FINGERPRINT_BYTES = 1024  # bytes iniciais usados para reconhecer o arquivo após rotação
+READ_BLOCK_SIZE = 1024 * 1024
+NGINX_LOG_FORMAT = COMBINED_LOG_FORMAT  # log_format usado em /etc/nginx/sites-available/projeto-linux
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024  # trechos menores são processados sem pool
+RANGES_PER_WORKER = 4  # faixas por processo, para balancear a carga
+SEEK_SLACK_SECONDS = 300  # tolerância para linhas fora de ordem nas bordas de --since/--until
+SEEK_LINEAR_BYTES = 64 * 1024  # abaixo disso a busca binária termina com leitura sequencial
+SEEK_PROBE_LINES = 16  # linhas lidas em cada sondagem até achar um timestamp
+
+# Modo de memória limitada (--bounded)
+HLL_PRECISION = 14  # 16 KB por HyperLogLog, erro padrão de 0,81%
+SKETCH_CAPACITY = 1000  # contadores por Space-Saving (páginas e user agents)
+SKETCH_REPORT_SIZE = 100  # itens de cada Space-Saving incluídos no relatório
+ERROR_SAMPLE_SIZE = 1000  # erros HTTP mais recentes mantidos
+BATCH_LINES = 50000  # linhas agregadas de forma exata antes de ir para os sketches
+
+# Detecção de taxas anômalas por IP e por página (memória fixa, no mesmo laço do parsing)
+RATE_DIMENSIONS = (("ips", "ip"), ("paths", "path"))  # dimensão no detector -> nome no relatório
+RATE_THRESHOLD = 300  # requisições por minuto que sempre marcam a chave
+RATE_BASELINE_FACTOR = 10  # marca a chave com taxa >= fator x a própria linha de base...
+RATE_MIN_REQUESTS = 60  # ...desde que tenha ao menos esta taxa por minuto
+RATE_BASELINE_MINUTES = 60  # horizonte da média móvel da linha de base
+RATE_WARMUP_MINUTES = 10  # histórico mínimo para comparar com a linha de base
+RATE_SKETCH_WIDTH = 4096  # contadores por linha do count-min sketch (4 linhas, 128 KB por dimensão)
+RATE_CAPACITY = 1000  # chaves marcadas mantidas por dimensão
+RATE_REPORT_SIZE = 20  # chaves marcadas incluídas no relatório
+
+# Linha do tempo de incidentes
+INCIDENT_GAP_MINUTES = 10  # falhas separadas por até N minutos sem sucesso pertencem ao mesmo incidente
+INCIDENT_MARGIN_MINUTES = 5  # minutos antes e depois da indisponibilidade associados ao incidente
+INCIDENT_BURST_ERRORS = 10  # respostas 4xx/5xx em um minuto que formam uma rajada
+INCIDENT_SAMPLE_SIZE = 5  # mensagens de exemplo por incidente
+INCIDENT_MINUTE_TEMPLATES = 5  # modelos do log de erros guardados por minuto (os graves primeiro)
+
+# Log de erros do Nginx
+ERROR_TEMPLATE_CAPACITY = 1000  # modelos de mensagem contados pelo Space-Saving
+ERROR_TEMPLATE_REPORT_SIZE = 50  # modelos incluídos no relatório
+ERROR_EXAMPLE_CHARS = 500  # tamanho máximo da mensagem de exemplo de cada modelo
+ERROR_SEVERE_LEVELS = ("error", "crit", "alert", "emerg")
+
+# Log estruturado do monitoramento: linhas JSON iniciadas por {"ts":"AAAA-MM-DDTHH:MM:SS...
+CHECK_RECORD_PREFIX = '{"ts":"'
+CHECK_RECORD_BATCH = 1024  # linhas JSON decodificadas por chamada a json.loads
+
+# Latência do monitoramento
+LATENCY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))  # limites (s) do histograma por hora
+
+# Acompanhamento ao vivo (--follow)
+FOLLOW_WINDOWS = (("1m", 60), ("5m", 300), ("1h", 3600))  # janelas deslizantes exibidas
+FOLLOW_SLOTS = 60  # sub-janelas por janela (memória fixa)
+FOLLOW_REFRESH = 2  # segundos entre resumos
+FOLLOW_POLL = 0.2  # espera (s) quando não há linhas novas
+FOLLOW_TOP = 10  # páginas mais acessadas em cada janela
+
+# Contadores de leitura de cada execução (não entram em checkpoints nem no cache de gerações)
+READ_COUNTERS = ("lines_read", "bytes_read", "parse_failures")
+
+# Métricas da última execução, no formato Prometheus, anexadas ao endpoint do monitor_site.py
+METRICS_FILE = os.path.join(STATE_DIR, "metrics.prom")
+METRICS_STATE_FILE = os.path.join(STATE_DIR, "metrics.json")  # totais acumulados entre execuções
+
+# Séries por minuto (--store)
+ROLLUP_DB = os.path.join(STATE_DIR, "rollups.sqlite3")
+STATUS_CLASS_COLUMNS = {"2": 1, "3": 2, "4": 3, "5": 4}  # posição da classe em cada minuto
+
+# Resumos parciais mergeáveis (--export-summary e comando merge)
+NODE_SUMMARY_FORMAT = "projeto-linux-summary"
+NODE_SUMMARY_VERSION = 1
+
+# Padrão para log do Nginx (formato padrão)
+NGINX_LOG_PATTERN = re.compile(
+    r'(?P<ip>\S+) - - \[(?P<datetime>[^\]]+)\] "(?P<method>\S+) (?P<path>\S+) (?P<protocol>\S+)" '
+    r'(?P<status>\d+) (?P<size>\d+) "(?P<referer>[^"]*)" "(?P<user_agent>[^"]*)"'
+)
+
+def _new_nginx_stats(bounded=False):
+    """
+    Cria a estrutura de agregados parciais do log de acesso.
+    
+    Args:
+        bounded: Usa estruturas de memória fixa (HyperLogLog, Space-Saving e
+                 amostra dos erros mais recentes) em vez de conjuntos e contadores exatos
+    """
+    rates = RateAnomalyDetector(
+        [dimension for dimension, _ in RATE_DIMENSIONS], RATE_THRESHOLD, RATE_BASELINE_FACTOR,
+        RATE_MIN_REQUESTS, RATE_BASELINE_MINUTES, RATE_WARMUP_MINUTES,
+        capacity=RATE_CAPACITY, width=RATE_SKETCH_WIDTH
+    )
+    if bounded:
+        return {
+            "bounded": True,
+            "total_requests": 0,
+            "unique_ips": HyperLogLog(HLL_PRECISION),
+            "status_codes": Counter(),
+            "user_agents": SpaceSaving(SKETCH_CAPACITY),
+            "hourly_requests": defaultdict(int),
+            "daily_requests": defaultdict(int),
+            "top_pages": SpaceSaving(SKETCH_CAPACITY),
+            "errors": deque(maxlen=ERROR_SAMPLE_SIZE),
+            "error_count": 0,
+            "minutes": {},
+            "rates": rates,
+            **dict.fromkeys(READ_COUNTERS, 0)
+        }
+    return {
+        "total_requests": 0,
+        "unique_ips": set(),
+        "status_codes": Counter(),
+        "user_agents": Counter(),
+        "hourly_requests": defaultdict(int),
+        "daily_requests": defaultdict(int),
+        "top_pages": Counter(),
+        "errors": [],
+        "error_count": 0,
+        "minutes": {},
+        "rates": rates,
+        **dict.fromkeys(READ_COUNTERS, 0)
+    }
+
+def _parse_nginx_lines(lines, stats, log_format=NGINX_LOG_FORMAT, since=None, until=None):
+    """
+    Processa linhas do log de acesso acumulando em stats.
+    
+    Usa o parser compilado a partir do log_format; linhas que não correspondem
+    a ele passam pela expressão regular tradicional. As chaves de
+    hourly_requests/daily_requests são inteiros AAAAMMDDHH/AAAAMMDD e as de
+    minutes são o epoch de cada minuto, com [requisições, 2xx, 3xx, 4xx, 5xx, bytes].
+    O IP e a página de cada requisição vão para o detector de taxas
+    anômalas (stats["rates"]), que só guarda os minutos recentes.
+    
+    Args:
+        lines: Iterável de linhas (str)
+        stats: Agregados parciais criados por _new_nginx_stats
+        log_format: Diretiva log_format do Nginx usada para gerar o log
+        since / until: Intervalo [since, until) em epoch; linhas fora dele
+                       (ou sem timestamp válido) são ignoradas
+    """
+    parser = compile_log_format(log_format)
+    parse = parser.parse
+    decode_time = parser.decode_time
+    fallback = NGINX_LOG_PATTERN.match
+    
+    add_ip = stats["unique_ips"].add
+    status_codes = stats["status_codes"]
+    user_agents = stats["user_agents"]
+    top_pages = stats["top_pages"]
+    hourly_requests = stats["hourly_requests"]
+    daily_requests = stats["daily_requests"]
+    errors = stats["errors"]
+    minutes = stats["minutes"]
+    open_rate_minute = stats["rates"].open_minute
+    rate_minute = None
+    add_rate_ip = add_rate_path = None
+    status_class = STATUS_CLASS_COLUMNS
+    total = 0
+    error_count = 0
+    lines_read = 0
+    parse_failures = 0
+    windowed = since is not None or until is not None
+    since = float("-inf") if since is None else since
+    until = float("inf") if until is None else until
+    
+    for line in lines:
+        lines_read += 1
+        fields = parse(line)
+        if fields is None:
+            match = fallback(line.strip())
+            if match is None:
+                parse_failures += 1
+                continue
+            fields = match.group(*FIELDS)
+        ip, timestamp, method, path, protocol, status, size, referer, user_agent = fields
+        
+        # Parse datetime
+        try:
+            hour_key, day_key, epoch, iso = decode_time(timestamp)
+        except ValueError:
+            if windowed:
+                continue
+            hour_key = None
+        else:
+            if windowed and not since <= epoch < until:
+                continue
+        
+        total += 1
+        add_ip(ip)
+        status_codes[status] += 1
+        user_agents[user_agent] += 1
+        top_pages[path] += 1
+        
+        if hour_key is None:
+            continue
+        
+        hourly_requests[hour_key] += 1
+        daily_requests[day_key] += 1
+        
+        minute = epoch - epoch % 60
+        counts = minutes.get(minute)
+        if counts is None:
+            counts = minutes[minute] = [0, 0, 0, 0, 0, 0]
+        counts[0] += 1
+        column = status_class.get(status[0])
+        if column:
+            counts[column] += 1
+        if size:
+            counts[5] += int(size)
+        
+        if minute != rate_minute:
+            rate_minute = minute
+            ip_rates, path_rates = open_rate_minute(minute)
+            add_rate_ip, add_rate_path = ip_rates.append, path_rates.append
+        add_rate_ip(ip)
+        add_rate_path(path)
+        
+        # Verifica se é erro
+        if int(status) >= 400:
+            error_count += 1
+            errors.append({
+                "timestamp": iso,
+                "ip": ip,
+                "status": status,
+                "path": path,
+                "user_agent": user_agent
+            })
+    
+    stats["total_requests"] += total
+    stats["error_count"] += error_count
+    stats["lines_read"] += lines_read
+    stats["parse_failures"] += parse_failures
+
+def _accumulate_nginx_lines(lines, stats, log_format=NGINX_LOG_FORMAT, since=None, until=None):
+    """
+    Processa linhas do log de acesso em agregados exatos ou limitados.
+    
+    No modo de memória limitada, as linhas são processadas em lotes de
+    BATCH_LINES com agregados exatos, que são então incorporados aos sketches.
+    """
+    if not stats.get("bounded"):
+        _parse_nginx_lines(lines, stats, log_format, since, until)
+        return stats
+    
+    lines = iter(lines)
+    while True:
+        batch_lines = list(islice(lines, BATCH_LINES))
+        if not batch_lines:
+            break
+        batch = _new_nginx_stats()
+        batch["rates"] = stats["rates"]  # o detector acompanha os lotes em sequência
+        _parse_nginx_lines(batch_lines, batch, log_format, since, until)
+        _merge_nginx_stats(stats, batch)
+    return stats
+
+def _merge_nginx_stats(stats, other):
+    """
+    Combina os agregados de other em stats (other deve ser mais recente).
+    
+    stats pode estar no modo exato ou de memória limitada; other pode ser
+    exato ou do mesmo modo que stats.
+    
+    Args:
+        stats: Agregados que recebem a soma
+        other: Agregados a serem incorporados
+        
+    Returns:
+        O próprio stats, atualizado
+    """
+    stats["total_requests"] += other["total_requests"]
+    for key in ("unique_ips", "user_agents", "top_pages"):
+        target, source = stats[key], other[key]
+        if type(target) is type(source) and hasattr(target, "merge"):
+            target.merge(source)
+        else:
+            target.update(source)
+    stats["status_codes"].update(other["status_codes"])
+    for key, count in other["hourly_requests"].items():
+        stats["hourly_requests"][key] += count
+    for key, count in other["daily_requests"].items():
+        stats["daily_requests"][key] += count
+    stats["errors"].extend(other["errors"])
+    stats["error_count"] += other["error_count"]
+    for key in READ_COUNTERS:
+        stats[key] += other.get(key, 0)
+    _merge_minutes(stats["minutes"], other["minutes"])
+    if other["rates"] is not stats["rates"]:
+        stats["rates"].merge(other["rates"])
+    return stats
+
+def _merge_minutes(minutes, other, max_columns=()):
+    """
+    Soma as séries por minuto de other em minutes.
+    
+    Args:
+        minutes: Dict epoch do minuto -> lista de contadores (atualizado)
+        other: Dict no mesmo formato
+        max_columns: Posições combinadas pelo máximo em vez da soma
+    """
+    for minute, values in other.items():
+        current = minutes.get(minute)
+        if current is None:
+            minutes[minute] = list(values)
+            continue
+        for i, value in enumerate(values):
+            current[i] = max(current[i], value) if i in max_columns else current[i] + value
+
+def _nginx_stats_to_state(stats):
+    """Converte os agregados parciais em uma estrutura serializável em JSON."""
+    state = {
+        "total_requests": stats["total_requests"],
+        "status_codes": dict(stats["status_codes"]),
+        "hourly_requests": {str(k): v for k, v in stats["hourly_requests"].items()},
+        "daily_requests": {str(k): v for k, v in stats["daily_requests"].items()},
+        "errors": list(stats["errors"]),
+        "error_count": stats["error_count"],
+        "minutes": {str(k): v for k, v in stats["minutes"].items()},
+        "rates": stats["rates"].to_state()
+    }
+    if stats.get("bounded"):
+        state["bounded"] = True
+        state["unique_ips"] = stats["unique_ips"].to_state()
+        state["user_agents"] = stats["user_agents"].to_state()
+        state["top_pages"] = stats["top_pages"].to_state()
+    else:
+        state["unique_ips"] = sorted(stats["unique_ips"])
+        state["user_agents"] = dict(stats["user_agents"])
+        state["top_pages"] = dict(stats["top_pages"])
+    return state
+
+def _nginx_stats_from_state(state):
+    """Reconstrói os agregados parciais a partir de _nginx_stats_to_state."""
+    bounded = state.get("bounded", False)
+    stats = _new_nginx_stats(bounded)
+    stats["total_requests"] = state["total_requests"]
+    stats["status_codes"].update(state["status_codes"])
+    stats["hourly_requests"].update((int(k), v) for k, v in state["hourly_requests"].items())
+    stats["daily_requests"].update((int(k), v) for k, v in state["daily_requests"].items())
+    stats["errors"].extend(state["errors"])
+    stats["error_count"] = state["error_count"]
+    stats["minutes"].update((int(k), v) for k, v in state.get("minutes", {}).items())
+    if "rates" in state:
+        stats["rates"] = RateAnomalyDetector.from_state(state["rates"])
+    if bounded:
+        stats["unique_ips"] = HyperLogLog.from_state(state["unique_ips"])
+        stats["user_agents"] = SpaceSaving.from_state(state["user_agents"])
+        stats["top_pages"] = SpaceSaving.from_state(state["top_pages"])
+    else:
+        stats["unique_ips"].update(state["unique_ips"])
+        stats["user_agents"].update(state["user_agents"])
+        stats["top_pages"].update(state["top_pages"])
+    return stats
+
+def _rate_anomalies_report(rates):
+    """Chaves marcadas pelo detector de taxas, com os limites usados, para o relatório."""
+    flagged = rates.report(RATE_REPORT_SIZE)
+    result = {
+        "limits": {
+            "requests_per_minute": rates.threshold,
+            "baseline_factor": rates.factor,
+            "min_requests_per_minute": rates.min_rate,
+            "baseline_minutes": rates.horizon
+        },
+        # Com probabilidade 1 - e^-depth, a linha de base excede a real em no máximo e/width do total
+        "baseline_max_overestimate": math.e / rates.sketches[0].width
+    }
+    for dimension, name in RATE_DIMENSIONS:
+        result[dimension] = [{
+            name: item["key"],
+            "peak_requests_per_minute": item["peak"],
+            "peak_minute": datetime.datetime.fromtimestamp(item["peak_minute"]).strftime("%Y-%m-%d %H:%M"),
+            "baseline_per_minute": item["baseline"],
+            "reason": item["reason"],
+            "flagged_minutes": item["minutes"],
+            "flagged_requests": item["requests"]
+        } for item in flagged[dimension]]
+    return result
+
+def _nginx_summary_state(stats):
+    """
+    Agregados do log de acesso para o resumo mergeável.
+    
+    O resumo é sempre de memória fixa: no modo exato, a lista de IPs e os
+    contadores são convertidos em HyperLogLog e Space-Saving. O detector de
+    taxas é reduzido às chaves marcadas.
+    """
+    summary = _new_nginx_stats(bounded=True)
+    _merge_nginx_stats(summary, dict(stats, rates=summary["rates"]))
+    state = _nginx_stats_to_state(summary)
+    state["rates"] = stats["rates"].flagged().to_state()
+    return state
+
+def _finalize_nginx_stats(stats):
+    """Prepara os agregados para o relatório."""
+    stats["rate_anomalies"] = _rate_anomalies_report(stats.pop("rates"))
+    stats["hourly_requests"] = defaultdict(int, (
+        (_format_hour_bucket(k), v) for k, v in stats["hourly_requests"].items()
+    ))
+    stats["daily_requests"] = defaultdict(int, (
+        (_format_day_bucket(k), v) for k, v in stats["daily_requests"].items()
+    ))
+    
+    if not stats.pop("bounded", False):
+        # Converte set para lista ordenada (determinística) para serialização JSON
+        stats["unique_ips"] = sorted(stats["unique_ips"])
+        stats["unique_visitors"] = len(stats["unique_ips"])
+        return stats
+    
+    # Modo de memória limitada: estimativas acompanhadas dos limites de erro
+    unique_ips = stats.pop("unique_ips")
+    user_agents = stats["user_agents"]
+    top_pages = stats["top_pages"]
+    stats["unique_visitors"] = unique_ips.estimate()
+    stats["user_agents"] = Counter(dict(user_agents.most_common(SKETCH_REPORT_SIZE)))
+    stats["top_pages"] = Counter(dict(top_pages.most_common(SKETCH_REPORT_SIZE)))
+    stats["errors"] = list(stats["errors"])
+    stats["error_bounds"] = {
+        "unique_visitors": {
+            "relative_standard_error": unique_ips.relative_error,
+            "range_95": [
+                int(stats["unique_visitors"] * (1 - 2 * unique_ips.relative_error)),
+                int(stats["unique_visitors"] * (1 + 2 * unique_ips.relative_error))
+            ]
+        },
+        "user_agents": {
+            "max_overestimate": user_agents.floor,
+            "ranges": user_agents.error_bounds(SKETCH_REPORT_SIZE)
+        },
+        "top_pages": {
+            "max_overestimate": top_pages.floor,
+            "ranges": top_pages.error_bounds(SKETCH_REPORT_SIZE)
+        },
+        "errors": {"sampled": len(stats["errors"]), "total": stats["error_count"]}
+    }
+    return stats
+
+def _format_hour_bucket(bucket):
+    """Converte AAAAMMDDHH em "AAAA-MM-DD HH:00"."""
+    day, hour = divmod(bucket, 100)
+    return f"{_format_day_bucket(day)} {hour:02d}:00"
+
+def _format_day_bucket(bucket):
+    """Converte AAAAMMDD em "AAAA-MM-DD"."""
+    return f"{bucket // 10000:04d}-{bucket // 100 % 100:02d}-{bucket % 100:02d}"
+
+def _open_log(path):
+    """Abre um log em modo binário, descompactando gerações .gz em streaming."""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def _iter_log_lines(path, start=0, end=None, stats=None):
+    """
+    Lê as linhas de um trecho [start, end) do arquivo em modo binário.
+    
+    Args:
+        path: Caminho do arquivo (.gz é descompactado em streaming)
+        start: Offset inicial (deve estar no início de uma linha)
+        end: Offset final (None = fim do arquivo)
+        stats: Agregados cujo "bytes_read" recebe os bytes lidos, já
+               descompactados (opcional)
+        
+    Yields:
+        Linhas decodificadas (str), incluindo o '\n' final
+    """
+    with _open_log(path) as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        pending = b""
+        while remaining is None or remaining > 0:
+            size = READ_BLOCK_SIZE if remaining is None else min(READ_BLOCK_SIZE, remaining)
+            block = f.read(size)
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+            if stats is not None:
+                stats["bytes_read"] += len(block)
+            block = pending + block
+            cut = block.rfind(b"\n") + 1
+            pending = block[cut:]
+            if cut:
+                yield from block[:cut].decode("utf-8", errors="replace").splitlines(True)
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+
+def _complete_lines_end(path, start, end):
+    """
+    Retorna o offset logo após a última quebra de linha em [start, end).
+    
+    Usado para não consumir uma linha que ainda está sendo escrita.
+    """
+    with open(path, 'rb') as f:
+        position = end
+        while position > start:
+            size = min(READ_BLOCK_SIZE, position - start)
+            f.seek(position - size)
+            block = f.read(size)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                return position - size + newline + 1
+            position -= size
+    return start
+
+def _split_ranges(path, start, end, parts, line_start=None):
+    """
+    Divide [start, end) em até `parts` trechos alinhados em quebras de linha.
+    
+    Args:
+        line_start: Função linha (bytes) -> bool; se informada, cada corte
+                    avança até a próxima linha que inicia um registro (ex.:
+                    cabeçalho de entrada do log de erros), para que um
+                    registro de várias linhas não fique dividido
+    
+    Returns:
+        Lista de tuplas (início, fim) contíguas e em ordem
+    """
+    step = max((end - start) // parts, 1)
+    bounds = [start]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            target = max(start + i * step, bounds[-1])
+            if target >= end:
+                break
+            f.seek(target)
+            f.readline()
+            if line_start is not None:
+                while f.tell() < end:
+                    position = f.tell()
+                    if line_start(f.readline()):
+                        f.seek(position)
+                        break
+            position = min(f.tell(), end)
+            if position > bounds[-1]:
+                bounds.append(position)
+    if bounds[-1] < end:
+        bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _parse_nginx_range(path, start, end, log_format=NGINX_LOG_FORMAT, bounded=False,
+                       since=None, until=None):
+    """
+    Processa um trecho do log de acesso (executado nos processos do pool).
+    
+    Returns:
+        Agregados parciais do trecho
+    """
+    stats = _new_nginx_stats(bounded)
+    _accumulate_nginx_lines(_iter_log_lines(path, start, end, stats), stats, log_format, since, until)
+    return stats
+
+def _nginx_line_time(line, log_format=NGINX_LOG_FORMAT):
+    """Epoch de uma linha do log de acesso ou None se não houver timestamp válido."""
+    parser = compile_log_format(log_format)
+    fields = parser.parse(line)
+    if fields is None:
+        match = NGINX_LOG_PATTERN.match(line.strip())
+        if match is None:
+            return None
+        fields = match.group(*FIELDS)
+    try:
+        return parser.decode_time(fields[1])[2]
+    except ValueError:
+        return None
+
+def _plan_ranges(path, start, end, workers, line_start=None):
+    """
+    Divide um trecho de arquivo em faixas para o pool de processos.
+    
+    Trechos pequenos, arquivos .gz (end=None) e o modo serial resultam
+    em uma única faixa. line_start alinha os cortes (ver _split_ranges).
+    """
+    if workers <= 1 or end is None or end - start < PARALLEL_MIN_BYTES:
+        return [(path, start, end)]
+    parts = min(workers * RANGES_PER_WORKER, (end - start) // (PARALLEL_MIN_BYTES // 4) or 1)
+    return [(path, s, e) for s, e in _split_ranges(path, start, end, parts, line_start)]
+
+def _run_ranges(ranges, parse_range, workers=1):
+    """
+    Processa faixas (caminho, início, fim), em paralelo quando workers > 1.
+    
+    Args:
+        ranges: Lista de faixas
+        parse_range: Função (caminho, início, fim) -> agregados parciais
+        workers: Número de processos
+        
+    Yields:
+        Agregados parciais na mesma ordem das faixas
+    """
+    if workers <= 1 or len(ranges) <= 1:
+        for path, start, end in ranges:
+            yield parse_range(path, start, end)
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        paths, starts, ends = zip(*ranges)
+        yield from pool.map(parse_range, paths, starts, ends)
+
+def _generation_key(path, tag):
+    """Identidade de uma geração rotacionada (preservada pelos renames do logrotate)."""
+    st = os.stat(path)
+    return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}:{SUMMARY_VERSION}:{tag}"
+
+def _discover_generations(log_path):
+    """
+    Lista as gerações rotacionadas de um log (log.1, log.2.gz, ...).
+    
+    Returns:
+        Caminhos em ordem cronológica (mais antiga primeiro), sem o log atual
+    """
+    directory = os.path.dirname(log_path) or "."
+    base = os.path.basename(log_path)
+    pattern = re.compile(re.escape(base) + r"\.(\d+)(\.gz)?$")
+    generations = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            generations.append((int(match.group(1)), os.path.join(directory, name)))
+    generations.sort(reverse=True)
+    return [path for _, path in generations]
+
+def _process_log(stats, segments, parse_range, merge_stats, workers=1, rotated=(),
+                 cache_file=None, cache_tag="", new_stats=None, to_state=None, from_state=None,
+                 line_start=None):
+    """
+    Processa as gerações rotacionadas e os trechos do log atual.
+    
+    Todas as faixas (de todas as gerações) são enviadas juntas ao pool e os
+    resultados são combinados em ordem cronológica. Gerações rotacionadas já
+    analisadas (mesmo inode, tamanho e mtime) são lidas do cache de resumos.
+    
+    Args:
+        stats: Agregados que recebem o resultado
+        segments: Trechos (caminho, início, fim) do log atual
+        parse_range: Função (caminho, início, fim) -> agregados parciais
+        merge_stats: Função que combina agregados parciais
+        workers: Número de processos
+        rotated: Gerações rotacionadas, mais antiga primeiro
+        cache_file: Arquivo com os resumos por geração
+        cache_tag: Identifica as opções de análise que afetam o resumo
+        new_stats / to_state / from_state: Criação e (de)serialização dos agregados
+        line_start: Alinha as faixas no início de registros (ver _split_ranges)
+    """
+    cache = _load_json(cache_file) if cache_file and rotated else None
+    cache = cache if isinstance(cache, dict) else {}
+    new_cache = {}
+    
+    # Plano: uma entrada por geração e por trecho do log atual
+    plan = []
+    for path in rotated:
+        key = _generation_key(path, cache_tag)
+        if key in cache:
+            plan.append((key, None))
+        else:
+            end = None if path.endswith(".gz") else os.path.getsize(path)
+            plan.append((key, _plan_ranges(path, 0, end, workers, line_start)))
+    for path, start, end in segments:
+        plan.append((None, _plan_ranges(path, start, end, workers, line_start)))
+    
+    # Os bytes lidos (descompactados, no caso do .gz) são contados por faixa em _iter_log_lines
+    ranges = [r for _, planned in plan if planned for r in planned]
+    results = _run_ranges(ranges, parse_range, workers)
+    for key, planned in plan:
+        if planned is None:
+            merge_stats(stats, from_state(cache[key]))
+            new_cache[key] = cache[key]
+            continue
+        if key is None:
+            for _ in planned:
+                merge_stats(stats, next(results))
+            continue
+        generation = new_stats()
+        for _ in planned:
+            merge_stats(generation, next(results))
+        new_cache[key] = to_state(generation)
+        merge_stats(stats, generation)
+    
+    if cache_file and rotated and new_cache != cache:
+        _write_json_atomic(cache_file, new_cache)
+    return stats
+
+def _pop_throughput(stats, seconds):
+    """
+    Retira de stats os contadores de leitura da execução (READ_COUNTERS).
+    
+    Args:
+        stats: Agregados da análise
+        seconds: Duração da análise
+        
+    Returns:
+        Dict com os contadores, a duração e as taxas por segundo
+    """
+    throughput = {key: stats.pop(key) for key in READ_COUNTERS}
+    throughput["seconds"] = seconds
+    throughput["lines_per_second"] = throughput["lines_read"] / seconds if seconds > 0 else 0.0
+    throughput["bytes_per_second"] = throughput["bytes_read"] / seconds if seconds > 0 else 0.0
+    return throughput
+
+def _time_boundary(path, target, line_time, start, end):
+    """
+    Offset da primeira linha com timestamp >= target, por busca binária.
+    
+    A busca lê o timestamp da linha seguinte a cada ponto de sondagem e, ao
+    restarem SEEK_LINEAR_BYTES, termina com uma leitura sequencial curta.
+    Pressupõe o log aproximadamente em ordem cronológica.
+    
+    Args:
+        path: Arquivo não compactado
+        target: Instante procurado (epoch)
+        line_time: Função linha (str) -> epoch ou None
+        start / end: Trecho do arquivo considerado
+        
+    Returns:
+        Offset de início de linha em [start, end]
+    """
+    with open(path, 'rb') as f:
+        lo, hi = start, end
+        while hi - lo > SEEK_LINEAR_BYTES:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            f.readline()  # descarta a linha parcial
+            probe_time = None
+            for _ in range(SEEK_PROBE_LINES):
+                line_start = f.tell()
+                if line_start >= hi:
+                    break
+                line = f.readline()
+                if not line:
+                    break
+                probe_time = line_time(line.decode("utf-8", errors="replace"))
+                if probe_time is not None:
+                    break
+            if probe_time is not None and probe_time < target:
+                lo = line_start
+            else:
+                hi = mid
+        
+        # Trecho final: leitura sequencial a partir de lo
+        f.seek(lo)
+        position = lo
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            line_epoch = line_time(line.decode("utf-8", errors="replace"))
+            if line_epoch is not None and line_epoch >= target:
+                return position
+            position += len(line)
+        return min(position, end)
+
+def _first_line_time(path, line_time):
+    """Timestamp da primeira linha legível do arquivo (ou None)."""
+    try:
+        with _open_log(path) as f:
+            for _ in range(SEEK_PROBE_LINES):
+                line = f.readline()
+                if not line:
+                    break
+                epoch = line_time(line.decode("utf-8", errors="replace"))
+                if epoch is not None:
+                    return epoch
+    except OSError:
+        pass
+    return None
+
+def _window_segments(paths, since, until, line_time):
+    """
+    Trechos de arquivo que podem conter linhas no intervalo [since, until).
+    
+    Os limites são alargados em SEEK_SLACK_SECONDS para tolerar linhas um
+    pouco fora de ordem (o filtro exato é aplicado linha a linha). Gerações
+    .gz não permitem busca: são incluídas inteiras ou descartadas pelo
+    timestamp da primeira linha dela e da geração seguinte.
+    
+    Args:
+        paths: Arquivos em ordem cronológica (mais antigo primeiro)
+        since / until: Intervalo em epoch (None = aberto)
+        line_time: Função linha (str) -> epoch ou None
+        
+    Returns:
+        Lista de tuplas (caminho, início, fim)
+    """
+    low = float("-inf") if since is None else since - SEEK_SLACK_SECONDS
+    high = float("inf") if until is None else until + SEEK_SLACK_SECONDS
+    first_times = [_first_line_time(path, line_time) for path in paths]
+    
+    segments = []
+    for index, path in enumerate(paths):
+        first = first_times[index]
+        following = next((t for t in first_times[index + 1:] if t is not None), None)
+        if first is not None and first >= high:
+            continue
+        if following is not None and following < low:
+            continue
+        if path.endswith(".gz"):
+            segments.append((path, 0, None))
+            continue
+        size = os.path.getsize(path)
+        start = 0 if since is None else _time_boundary(path, low, line_time, 0, size)
+        end = size if until is None else _time_boundary(path, high, line_time, start, size)
+        if end > start:
+            segments.append((path, start, end))
+    return segments
+
+def _file_fingerprint(path, length=FINGERPRINT_BYTES):
+    """
+    Calcula a impressão digital dos primeiros bytes do arquivo.
+    
+    Returns:
+        Tupla (quantidade de bytes usados, sha1 hexadecimal)
+    """
+    with _open_log(path) as f:
+        head = f.read(length)
+    return len(head), hashlib.sha1(head).hexdigest()
+
+def _matches_checkpoint(path, checkpoint):
+    """Verifica se o arquivo é o mesmo registrado no checkpoint."""
+    try:
+        # O tamanho de um .gz não é comparável com o offset descompactado
+        if not path.endswith(".gz") and os.path.getsize(path) < checkpoint["offset"]:
+            return False
+        head_len, head_sha1 = _file_fingerprint(path, checkpoint["head_len"])
+    except OSError:
+        return False
+    return head_len == checkpoint["head_len"] and head_sha1 == checkpoint["head_sha1"]
+
+def _rotated_generation(log_path):
+    """Caminho da geração .1 (ou .1.gz, sem delaycompress) ou None."""
+    for rotated in (f"{log_path}.1", f"{log_path}.1.gz"):
+        if os.path.exists(rotated):
+            return rotated
+    return None
+
+def _rotated_identity(log_path):
+    """Identifica a geração .1 atual (tamanho + impressão digital) ou None."""
+    rotated = _rotated_generation(log_path)
+    try:
+        return [os.path.getsize(rotated), _file_fingerprint(rotated)[1]]
+    except (OSError, TypeError):
+        return None
+
+def _find_rotated_log(log_path, checkpoint):
+    """
+    Localiza a geração rotacionada que contém o final ainda não lido do checkpoint.
+    
+    A comparação usa a impressão digital do início do arquivo, que funciona
+    tanto para rotação por rename quanto para copytruncate. A geração .1 que
+    já existia quando o checkpoint foi salvo não é considerada.
+    
+    Returns:
+        Caminho da geração rotacionada ou None
+    """
+    rotated = _rotated_generation(log_path)
+    if rotated is None or _rotated_identity(log_path) == checkpoint.get("rotated"):
+        return None
+    if _matches_checkpoint(rotated, checkpoint):
+        return rotated
+    return None
+
+def load_checkpoint(checkpoint_file, log_path):
+    """
+    Carrega o checkpoint de um log.
+    
+    Args:
+        checkpoint_file: Caminho do arquivo de checkpoint
+        log_path: Log ao qual o checkpoint deve pertencer
+        
+    Returns:
+        Dict do checkpoint ou None se não existir / for incompatível
+    """
+    checkpoint = _load_json(checkpoint_file)
+    if checkpoint is None:
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("log_path") != log_path:
+        print(f"⚠️  Checkpoint incompatível ignorado: {checkpoint_file}")
+        return None
+    return checkpoint
+
+def _load_json(path):
+    """Carrega um arquivo JSON de estado, retornando None se ausente ou inválido."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️  Estado ignorado ({path}): {e}")
+        return None
+
+def _write_json_atomic(path, data):
+    """
+    Grava um arquivo JSON de estado de forma atômica (arquivo temporário + rename).
+    
+    Args:
+        path: Caminho do arquivo
+        data: Estrutura a ser gravada
+    """
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".state-", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception as e:
+        print(f"❌ Erro ao salvar estado em {path}: {e}")
+
+def save_checkpoint(checkpoint_file, checkpoint):
+    """
+    Grava o checkpoint de forma atômica.
+    
+    Args:
+        checkpoint_file: Caminho do arquivo de checkpoint
+        checkpoint: Dict a ser gravado
+    """
+    _write_json_atomic(checkpoint_file, checkpoint)
+
+def _pending_segments(log_path, checkpoint):
+    """
+    Determina os trechos de arquivo ainda não processados.
+    
+    Args:
+        log_path: Log atual
+        checkpoint: Checkpoint anterior (ou None)
+        
+    Returns:
+        Lista de tuplas (caminho, offset inicial)
+    """
+    if checkpoint is None:
+        return [(log_path, 0)]
+    
+    st = os.stat(log_path)
+    same_inode = st.st_ino == checkpoint["inode"] and st.st_dev == checkpoint["device"]
+    rotated = _find_rotated_log(log_path, checkpoint)
+    if rotated is None and same_inode and _matches_checkpoint(log_path, checkpoint):
+        return [(log_path, checkpoint["offset"])]
+    
+    # Arquivo foi rotacionado (inode novo) ou truncado (copytruncate)
+    segments = []
+    if rotated:
+        print(f"🔄 Rotação detectada, lendo o final de {rotated}")
+        segments.append((rotated, checkpoint["offset"]))
+    else:
+        print(f"⚠️  Rotação detectada, mas a geração anterior não foi encontrada")
+    segments.append((log_path, 0))
+    return segments
+
+def _checkpoint_segments(log_path, checkpoint, checkpoint_file=None):
+    """
+    Trechos (caminho, início, fim) do log ainda não processados.
+    
+    Com checkpoint_file, o trecho do log atual termina na última linha
+    completa, para que uma linha sendo escrita seja lida na próxima execução.
+    """
+    segments = []
+    for path, start in _pending_segments(log_path, checkpoint):
+        end = None if path.endswith(".gz") else os.path.getsize(path)
+        # Gerações rotacionadas não crescem mais: a última linha também é lida
+        if checkpoint_file and path == log_path:
+            end = _complete_lines_end(path, start, end)
+        segments.append((path, start, end))
+    return segments
+
+def _save_log_checkpoint(checkpoint_file, log_path, offset, state):
+    """
+    Grava o checkpoint de um log processado até offset.
+    
+    Args:
+        checkpoint_file: Caminho do arquivo de checkpoint
+        log_path: Log atual
+        offset: Posição até onde o log atual foi lido
+        state: Agregados serializados
+    """
+    st = os.stat(log_path)
+    head_len, head_sha1 = _file_fingerprint(log_path, min(offset, FINGERPRINT_BYTES))
+    save_checkpoint(checkpoint_file, {
+        "version": CHECKPOINT_VERSION,
+        "log_path": log_path,
+        "inode": st.st_ino,
+        "device": st.st_dev,
+        "offset": offset,
+        "head_len": head_len,
+        "head_sha1": head_sha1,
+        "rotated": _rotated_identity(log_path),
+        "updated_at": datetime.datetime.now().isoformat(),
+        "stats": state
+    })
+
+def _checkpoint_epoch(checkpoint):
+    """
+    Horário (epoch) da execução que gravou o checkpoint, a partir do qual
+    começam os dados lidos na execução atual (None sem checkpoint).
+    """
+    if checkpoint is None:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(checkpoint["updated_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def analyze_nginx_access_log(log_path=NGINX_ACCESS_LOG, checkpoint_file=None, workers=1,
+                             log_format=NGINX_LOG_FORMAT, bounded=False, include_rotated=False,
+                             since=None, until=None, keep_summary=False):
+    """
+    Analisa o log de acesso do Nginx.
+    
+    Com checkpoint_file, apenas os bytes novos desde a última execução são
+    lidos e somados aos agregados salvos no checkpoint. Com include_rotated,
+    as gerações rotacionadas (.1, .2.gz, ...) também entram no relatório;
+    combinado com checkpoint_file, isso só acontece na primeira execução,
+    que passa a incluir o histórico.
+    
+    Com since/until, apenas o intervalo pedido é lido: a posição de cada
+    limite é encontrada por busca binária nos arquivos (incluindo as gerações
+    rotacionadas que possam conter o intervalo) e o checkpoint não é usado.
+    
+    Args:
+        log_path: Caminho para o arquivo de log
+        checkpoint_file: Arquivo de checkpoint para análise incremental (opcional)
+        workers: Número de processos para o parsing paralelo
+        log_format: Diretiva log_format do Nginx usada para gerar o log
+        bounded: Usa memória fixa (estimativas com limites de erro no relatório)
+        include_rotated: Inclui as gerações rotacionadas do log
+        since / until: Intervalo [since, until) em epoch (opcional)
+        keep_summary: Inclui em "summary_state" os agregados mergeáveis (ver _nginx_summary_state)
+        
+    Returns:
+        Dict com estatísticas do log
+    """
+    windowed = since is not None or until is not None
+    if windowed and checkpoint_file:
+        print(f"⚠️  Checkpoint ignorado em consultas por intervalo de tempo")
+        checkpoint_file = None
+    
+    checkpoint = load_checkpoint(checkpoint_file, log_path) if checkpoint_file else None
+    if checkpoint and checkpoint["stats"].get("bounded", False) != bounded:
+        print(f"⚠️  Checkpoint gerado em outro modo de memória, reiniciando a análise")
+        checkpoint = None
+    stats = _nginx_stats_from_state(checkpoint["stats"]) if checkpoint else _new_nginx_stats(bounded)
+    started = time.perf_counter()
+    
+    try:
+        rotated = _discover_generations(log_path) if include_rotated and checkpoint is None else []
+        segments = []
+        if windowed:
+            paths = _discover_generations(log_path)
+            if os.path.exists(log_path) or not paths:
+                paths.append(log_path)
+            segments = _window_segments(paths, since, until, partial(_nginx_line_time, log_format=log_format))
+            rotated = []
+        elif os.path.exists(log_path) or not rotated:
+            segments = _checkpoint_segments(log_path, checkpoint, checkpoint_file)
+        
+        _process_log(
+            stats, segments,
+            partial(_parse_nginx_range, log_format=log_format, bounded=bounded, since=since, until=until),
+            _merge_nginx_stats, workers, rotated,
+            cache_file=NGINX_GENERATIONS_CACHE, cache_tag=f"{bounded}:{log_format}",
+            new_stats=partial(_new_nginx_stats, bounded),
+            to_state=_nginx_stats_to_state, from_state=_nginx_stats_from_state
+        )
+        
+        if checkpoint_file and segments:
+            # As séries por minuto vão para o --store a cada execução; o checkpoint só guarda os totais
+            state = _nginx_stats_to_state(stats)
+            del state["minutes"]
+            _save_log_checkpoint(checkpoint_file, log_path, segments[-1][2], state)
+                        
+    except FileNotFoundError:
+        print(f"Arquivo de log não encontrado: {log_path}")
+    except Exception as e:
+        print(f"Erro ao analisar log: {e}")
+    
+    summary_state = _nginx_summary_state(stats) if keep_summary else None
+    stats["throughput"] = _pop_throughput(stats, time.perf_counter() - started)
+    
+    # Dados novos de uma execução incremental são somados ao --store; uma análise
+    # completa regrava os minutos; consultas por intervalo não gravam
+    stats["minute_rollups"] = {
+        "mode": None if windowed else "add" if checkpoint else "merge",
+        "minutes": stats.pop("minutes"),
+        "since": _checkpoint_epoch(checkpoint)  # início dos minutos lidos nesta execução
+    }
+    stats = _finalize_nginx_stats(stats)
+    if keep_summary:
+        stats["summary_state"] = summary_state
+    return stats
+
+def _new_error_log_stats():
+    """
+    Cria a estrutura de agregados parciais do log de erros.
+    
+    A memória é fixa mesmo em uma enxurrada de erros: os modelos de mensagem
+    vão para um Space-Saving e apenas as entradas mais recentes são guardadas.
+    """
+    return {
+        "total_entries": 0,
+        "levels": Counter(),
+        "templates": SpaceSaving(ERROR_TEMPLATE_CAPACITY),
+        "template_info": {},  # modelo -> [nível, primeira ocorrência, última, exemplo]
+        "hourly_entries": defaultdict(int),
+        "daily_entries": defaultdict(int),
+        "continuation_lines": 0,
+        "entries": deque(maxlen=ERROR_SAMPLE_SIZE),  # (timestamp, nível, pid, conexão, mensagem)
+        "minutes": {},  # epoch do minuto -> [entradas, graves, {modelo: [contagem, graves]}]
+        **dict.fromkeys(READ_COUNTERS, 0)
+    }
+
+def _parse_error_entries(entries, stats, since=None, until=None):
+    """
+    Processa entradas de iter_error_entries acumulando em stats.
+    
+    Os modelos são contados de forma exata no lote e incorporados ao
+    Space-Saving ao final; o contexto (client, server, request, ...) só é
+    separado na hora de montar o relatório.
+    """
+    windowed = since is not None or until is not None
+    low = float("-inf") if since is None else since
+    high = float("inf") if until is None else until
+    templates = Counter()
+    minute_templates = Counter()
+    info = {}
+    levels = stats["levels"]
+    hourly = stats["hourly_entries"]
+    daily = stats["daily_entries"]
+    recent = stats["entries"]
+    total = lines_read = continuation = orphans = 0
+    
+    for fields, message, line_count in entries:
+        lines_read += line_count
+        if fields is None:
+            orphans += line_count
+            continue
+        hour_key, day_key, epoch, timestamp, level, pid, connection = fields
+        if windowed and not low <= epoch < high:
+            continue
+        total += 1
+        continuation += line_count - 1
+        levels[level] += 1
+        hourly[hour_key] += 1
+        daily[day_key] += 1
+        # O modelo vem da primeira linha, sem o contexto; as continuações ficam no exemplo
+        first_line = message.partition("\n")[0] if line_count > 1 else message
+        position = first_line.find(ERROR_CONTEXT_SEPARATOR)
+        template = error_template(first_line if position == -1 else first_line[:position])
+        templates[template] += 1
+        minute_templates[epoch - epoch % 60, template, level in ERROR_SEVERE_LEVELS] += 1
+        current = info.get(template)
+        if current is None:
+            info[template] = [level, timestamp, timestamp, message[:ERROR_EXAMPLE_CHARS]]
+        else:
+            current[2] = timestamp
+        recent.append((timestamp, level, pid, connection, message))
+    
+    stats["total_entries"] += total
+    stats["continuation_lines"] += continuation
+    stats["lines_read"] += lines_read
+    stats["parse_failures"] += orphans
+    stats["templates"].update(templates)
+    _merge_template_info(stats, info)
+    
+    minutes = {}
+    for (minute, template, severe), count in minute_templates.items():
+        counts = minutes.get(minute)
+        if counts is None:
+            counts = minutes[minute] = [0, 0, {}]
+        counts[0] += count
+        template_counts = counts[2].setdefault(template, [0, 0])
+        template_counts[0] += count
+        if severe:
+            counts[1] += count
+            template_counts[1] += count
+    for counts in minutes.values():
+        _trim_minute_templates(counts[2])
+    _merge_error_minutes(stats["minutes"], minutes)
+
+def _trim_minute_templates(templates):
+    """
+    Mantém os INCIDENT_MINUTE_TEMPLATES modelos de um minuto com mais
+    entradas graves e, depois, com mais entradas (dict alterado no lugar).
+    """
+    if len(templates) > INCIDENT_MINUTE_TEMPLATES:
+        keep = heapq.nlargest(INCIDENT_MINUTE_TEMPLATES, templates.items(), key=lambda item: (item[1][1], item[1][0]))
+        templates.clear()
+        templates.update(keep)
+
+def _merge_error_minutes(minutes, other):
+    """
+    Soma o índice por minuto do log de erros de other em minutes.
+    
+    Os modelos de um minuto dividido entre dois trechos são somados e
+    reduzidos de novo a INCIDENT_MINUTE_TEMPLATES.
+    """
+    for minute, (entries, severe, templates) in other.items():
+        current = minutes.get(minute)
+        if current is None:
+            minutes[minute] = [entries, severe, {t: list(c) for t, c in templates.items()}]
+            continue
+        current[0] += entries
+        current[1] += severe
+        for template, (count, severe_count) in templates.items():
+            template_counts = current[2].setdefault(template, [0, 0])
+            template_counts[0] += count
+            template_counts[1] += severe_count
+        _trim_minute_templates(current[2])
+
+def _merge_template_info(stats, info):
+    """
+    Incorpora as informações por modelo (de outro trecho ou de outro
+    servidor), mantendo apenas as dos modelos monitorados pelo Space-Saving.
+    """
+    current = stats["template_info"]
+    for template, (level, first, last, example) in info.items():
+        known = current.get(template)
+        if known is None:
+            current[template] = [level, first, last, example]
+            continue
+        if first < known[1]:
+            known[0], known[1], known[3] = level, first, example
+        if last > known[2]:
+            known[2] = last
+    monitored = stats["templates"].items
+    if len(current) > len(monitored):
+        stats["template_info"] = {t: v for t, v in current.items() if t in monitored}
+
+def _accumulate_error_lines(lines, stats, since=None, until=None):
+    """Processa linhas do log de erros em lotes de BATCH_LINES."""
+    entries = iter_error_entries(lines, ErrorLogParser())
+    while True:
+        batch = list(islice(entries, BATCH_LINES))
+        if not batch:
+            break
+        _parse_error_entries(batch, stats, since, until)
+    return stats
+
+def _parse_error_range(path, start, end, since=None, until=None):
+    """
+    Processa um trecho do log de erros (executado nos processos do pool).
+    
+    As faixas paralelas começam sempre em um cabeçalho (_error_entry_start).
+    Uma faixa retomada de um checkpoint pode começar com continuações de uma
+    entrada já contada na execução anterior: elas são contadas como
+    continuações, não como falhas de parsing.
+    """
+    stats = _new_error_log_stats()
+    _accumulate_error_lines(_iter_log_lines(path, start, end, stats), stats, since, until)
+    if start > 0:
+        # As únicas falhas possíveis são as continuações no início da faixa
+        stats["continuation_lines"] += stats["parse_failures"]
+        stats["parse_failures"] = 0
+    return stats
+
+def _error_entry_start(line):
+    """True se a linha (bytes) é o cabeçalho de uma entrada do log de erros."""
+    return ErrorLogParser().parse(line.decode("utf-8", errors="replace")) is not None
+
+def _error_line_time(line):
+    """Epoch de uma linha do log de erros ou None se for continuação."""
+    fields = ErrorLogParser().parse(line)
+    return fields[2] if fields else None
+
+def _merge_error_log_stats(stats, other):
+    """Combina os agregados de other (mais recente) em stats."""
+    stats["total_entries"] += other["total_entries"]
+    stats["levels"].update(other["levels"])
+    for key, count in other["hourly_entries"].items():
+        stats["hourly_entries"][key] += count
+    for key, count in other["daily_entries"].items():
+        stats["daily_entries"][key] += count
+    stats["continuation_lines"] += other["continuation_lines"]
+    stats["entries"].extend(other["entries"])
+    for key in READ_COUNTERS:
+        stats[key] += other.get(key, 0)
+    stats["templates"].merge(other["templates"])
+    _merge_template_info(stats, other["template_info"])
+    _merge_error_minutes(stats["minutes"], other["minutes"])
+    return stats
+
+def _error_log_stats_to_state(stats):
+    """Converte os agregados parciais do log de erros em estrutura serializável."""
+    return {
+        "total_entries": stats["total_entries"],
+        "levels": dict(stats["levels"]),
+        "templates": stats["templates"].to_state(),
+        "template_info": stats["template_info"],
+        "hourly_entries": {str(k): v for k, v in stats["hourly_entries"].items()},
+        "daily_entries": {str(k): v for k, v in stats["daily_entries"].items()},
+        "continuation_lines": stats["continuation_lines"],
+        "entries": list(stats["entries"]),
+        "minutes": {str(k): v for k, v in stats["minutes"].items()}
+    }
+
+def _error_log_stats_from_state(state):
+    """Reconstrói os agregados parciais a partir de _error_log_stats_to_state."""
+    stats = _new_error_log_stats()
+    stats["total_entries"] = state["total_entries"]
+    stats["levels"].update(state["levels"])
+    stats["templates"] = SpaceSaving.from_state(state["templates"])
+    stats["template_info"] = state["template_info"]
+    stats["hourly_entries"].update((int(k), v) for k, v in state["hourly_entries"].items())
+    stats["daily_entries"].update((int(k), v) for k, v in state["daily_entries"].items())
+    stats["continuation_lines"] = state["continuation_lines"]
+    stats["entries"].extend(tuple(entry) for entry in state["entries"])
+    for minute, counts in state.get("minutes", {}).items():
+        if len(counts) == 4:
+            # Formato anterior: apenas o modelo mais frequente, sem a contagem de graves
+            counts = [counts[0], counts[1], {counts[2]: [counts[3], 0]}]
+        stats["minutes"][int(minute)] = counts
+    return stats
+
+def _finalize_error_log_stats(stats):
+    """Prepara os agregados do log de erros para o relatório."""
+    templates = stats.pop("templates")
+    info = stats.pop("template_info")
+    bounds = templates.error_bounds(ERROR_TEMPLATE_REPORT_SIZE)
+    stats["templates"] = []
+    for template, count in templates.most_common(ERROR_TEMPLATE_REPORT_SIZE):
+        level, first, last, example = info.get(template, (None, None, None, None))
+        stats["templates"].append({
+            "template": template,
+            "count": count,
+            "min_count": bounds[template][0],
+            "level": level,
+            "first_seen": first,
+            "last_seen": last,
+            "example": example
+        })
+    stats["template_max_overestimate"] = templates.floor
+    stats["severe_entries"] = sum(stats["levels"][level] for level in ERROR_SEVERE_LEVELS)
+    stats["hourly_entries"] = defaultdict(int, (
+        (_format_hour_bucket(k), v) for k, v in stats["hourly_entries"].items()
+    ))
+    stats["daily_entries"] = defaultdict(int, (
+        (_format_day_bucket(k), v) for k, v in stats["daily_entries"].items()
+    ))
+    entries = []
+    for timestamp, level, pid, connection, message in stats["entries"]:
+        text, context = split_error_message(message)
+        entries.append({
+            "timestamp": timestamp,
+            "level": level,
+            "pid": pid,
+            "connection": connection,
+            "message": text,
+            **context
+        })
+    stats["entries"] = entries
+    return stats
+
+def analyze_nginx_error_log(log_path=NGINX_ERROR_LOG, checkpoint_file=None, workers=1,
+                            include_rotated=False, since=None, until=None, keep_summary=False):
+    """
+    Analisa o log de erros do Nginx.
+    
+    Linhas de continuação são agrupadas à entrada anterior e as mensagens são
+    reduzidas a modelos (IPs, caminhos e números mascarados), contados com
+    memória fixa. Checkpoint, gerações rotacionadas, intervalo de tempo e
+    parsing paralelo funcionam como em analyze_nginx_access_log.
+    
+    Args:
+        log_path: Caminho para o log de erros
+        checkpoint_file: Arquivo de checkpoint para análise incremental (opcional)
+        workers: Número de processos para o parsing paralelo
+        include_rotated: Inclui as gerações rotacionadas do log
+        since / until: Intervalo [since, until) em epoch (opcional)
+        keep_summary: Inclui em "summary_state" os agregados mergeáveis
+        
+    Returns:
+        Dict com estatísticas do log de erros
+    """
+    windowed = since is not None or until is not None
+    if windowed and checkpoint_file:
+        print(f"⚠️  Checkpoint ignorado em consultas por intervalo de tempo")
+        checkpoint_file = None
+    
+    checkpoint = load_checkpoint(checkpoint_file, log_path) if checkpoint_file else None
+    stats = _error_log_stats_from_state(checkpoint["stats"]) if checkpoint else _new_error_log_stats()
+    started = time.perf_counter()
+    
+    try:
+        rotated = _discover_generations(log_path) if include_rotated and checkpoint is None else []
+        segments = []
+        if windowed:
+            paths = _discover_generations(log_path)
+            if os.path.exists(log_path) or not paths:
+                paths.append(log_path)
+            segments = _window_segments(paths, since, until, _error_line_time)
+            rotated = []
+        elif os.path.exists(log_path) or not rotated:
+            segments = _checkpoint_segments(log_path, checkpoint, checkpoint_file)
+        
+        _process_log(
+            stats, segments, partial(_parse_error_range, since=since, until=until),
+            _merge_error_log_stats, workers, rotated,
+            cache_file=NGINX_ERROR_GENERATIONS_CACHE, new_stats=_new_error_log_stats,
+            to_state=_error_log_stats_to_state, from_state=_error_log_stats_from_state,
+            line_start=_error_entry_start
+        )
+        
+        if checkpoint_file and segments:
+            # Como no log de acesso, o índice por minuto cobre só os dados lidos nesta execução
+            state = _error_log_stats_to_state(stats)
+            del state["minutes"]
+            _save_log_checkpoint(checkpoint_file, log_path, segments[-1][2], state)
+    
+    except FileNotFoundError:
+        print(f"Arquivo de log não encontrado: {log_path}")
+    except Exception as e:
+        print(f"Erro ao analisar log de erros: {e}")
+    
+    summary_state = _error_log_stats_to_state(stats) if keep_summary else None
+    stats["throughput"] = _pop_throughput(stats, time.perf_counter() - started)
+    stats["minute_rollups"] = {
+        "mode": None if windowed else "add" if checkpoint else "merge",
+        "minutes": stats.pop("minutes"),
+        "since": _checkpoint_epoch(checkpoint)  # início dos minutos lidos nesta execução
+    }
+    stats = _finalize_error_log_stats(stats)
+    if keep_summary:
+        stats["summary_state"] = summary_state
+    return stats
+
+def _new_monitoring_stats():
+    """Cria a estrutura de agregados parciais do log de monitoramento."""
+    return {
+        "total_checks": 0,
+        "successful_checks": 0,
+        "failed_checks": 0,
+        "alerts_sent": 0,
+        "average_response_time": 0,
+        "latency": LatencyHistogram(),
+        "hourly_latency": {},
+        "errors": [],
+        "uptime_percentage": 0,
+        "downtime_events": [],
+        "minutes": {},
+        **dict.fromkeys(READ_COUNTERS, 0)
+    }
+
+def _parse_monitoring_lines(lines, stats, since=None, until=None):
+    """
+    Processa linhas do log de monitoramento acumulando em stats.
+    
+    Aceita o log estruturado (linhas JSON de CHECKS_LOG, decodificadas em
+    lotes) e o log de texto, inclusive misturados. Os tempos de resposta vão
+    para o histograma geral (latency) e para o da hora da linha
+    (hourly_latency, chave "AAAA-MM-DD HH:00"). As chaves de minutes são o
+    epoch de cada minuto, com
+    [sucessos, falhas, tempos medidos, soma dos tempos, maior tempo].
+    
+    Args:
+        lines: Iterável de linhas (str)
+        stats: Agregados parciais criados por _new_monitoring_stats
+        since / until: Intervalo [since, until) em epoch (opcional)
+    """
+    windowed = since is not None or until is not None
+    since = float("-inf") if since is None else since
+    until = float("inf") if until is None else until
+    minutes = stats["minutes"]
+    latency = stats["latency"]
+    hourly_latency = stats["hourly_latency"]
+    batch = []
+    lines_read = 0
+    
+    for line in lines:
+        lines_read += 1
+        if line.startswith("{"):
+            batch.append(line)
+            if len(batch) >= CHECK_RECORD_BATCH:
+                _parse_check_batch(batch, stats, since, until)
+                batch = []
+            continue
+        
+        epoch = None
+        if windowed:
+            epoch = _monitoring_line_time(line)
+            if epoch is None or not since <= epoch < until:
+                continue
+        
+        if "Site OK" in line:
+            stats["total_checks"] += 1
+            stats["successful_checks"] += 1
+            counts = _minute_counts(minutes, line, epoch)
+            if counts:
+                counts[0] += 1
+            
+            # Extrai tempo de resposta
+            time_match = re.search(r'Tempo: ([\d.]+)s', line)
+            if time_match:
+                response_time = float(time_match.group(1))
+                latency.add(response_time)
+                if counts:
+                    hour = f"{line[:13]}:00"
+                    histogram = hourly_latency.get(hour)
+                    if histogram is None:
+                        histogram = hourly_latency[hour] = LatencyHistogram()
+                    histogram.add(response_time)
+                    counts[2] += 1
+                    counts[3] += response_time
+                    counts[4] = max(counts[4], response_time)
+        
+        elif "Site com problema" in line or "Erro ao acessar" in line:
+            stats["total_checks"] += 1
+            stats["failed_checks"] += 1
+            counts = _minute_counts(minutes, line, epoch)
+            if counts:
+                counts[1] += 1
+            
+            # Extrai timestamp do erro
+            timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
+            if timestamp_match:
+                stats["downtime_events"].append({
+                    "timestamp": timestamp_match.group(1),
+                    "error": line.strip()
+                })
+        
+        elif "Alerta" in line and "enviado" in line:
+            stats["alerts_sent"] += 1
+    
+    if batch:
+        _parse_check_batch(batch, stats, since, until)
+    stats["lines_read"] += lines_read
+
+def _parse_check_batch(lines, stats, since, until):
+    """Decodifica um lote de linhas JSON e acumula os registros em stats."""
+    records = _decode_check_batch(lines)
+    stats["parse_failures"] += len(lines) - len(records)
+    _parse_check_records(records, stats, since, until)
+
+def _decode_check_batch(lines):
+    """
+    Decodifica um lote de linhas JSON com uma única chamada a json.loads.
+    
+    Se alguma linha estiver corrompida (ex.: escrita interrompida), o lote é
+    decodificado linha a linha e as inválidas são ignoradas.
+    """
+    try:
+        return json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+def _parse_check_records(records, stats, since, until):
+    """
+    Acumula em stats os registros do log estruturado (ver _parse_monitoring_lines).
+    
+    Os registros chegam em ordem: o minuto é calculado uma vez por prefixo
+    "AAAA-MM-DDTHH:MM" e as latências do lote são agrupadas por hora e
+    registradas nos histogramas de uma só vez.
+    """
+    minutes = stats["minutes"]
+    downtime_events = stats["downtime_events"]
+    batch_latencies = {}  # hora -> latências do lote
+    successful = failed = alerts = 0
+    prefix = minute = counts = values = None
+    
+    for record in records:
+        try:
+            ts = record["ts"]
+            if ts[:16] != prefix:
+                epoch = int(_local_iso_minute_epoch(ts[:16]))
+                prefix, minute, counts, values = ts[:16], epoch - epoch % 60, None, None
+            epoch = minute + int(ts[17:19])
+        except (TypeError, KeyError, ValueError):
+            continue
+        if not since <= epoch < until:
+            continue
+        
+        up = record.get("up")
+        if up is None:
+            if "alert" in record:
+                alerts += 1
+            continue
+        if counts is None:
+            counts = minutes.get(minute)
+            if counts is None:
+                counts = minutes[minute] = [0, 0, 0, 0.0, 0.0]
+        
+        if up:
+            successful += 1
+            counts[0] += 1
+            response_time = record.get("latency")
+            if response_time is not None:
+                if values is None:
+                    values = batch_latencies.setdefault(f"{ts[:10]} {ts[11:13]}:00", [])
+                values.append(response_time)
+                counts[2] += 1
+                counts[3] += response_time
+                if response_time > counts[4]:
+                    counts[4] = response_time
+        else:
+            failed += 1
+            counts[1] += 1
+            detail = record.get("error") or "falha"
+            if record.get("status"):
+                detail = f"{detail} (HTTP {record['status']})"
+            downtime_events.append({
+                "timestamp": f"{ts[:10]} {ts[11:19]}",
+                "error": f"{record.get('target')}: {detail}"
+            })
+    
+    stats["total_checks"] += successful + failed
+    stats["successful_checks"] += successful
+    stats["failed_checks"] += failed
+    stats["alerts_sent"] += alerts
+    hourly_latency = stats["hourly_latency"]
+    for hour, values in batch_latencies.items():
+        histogram = LatencyHistogram()
+        histogram.add_many(values)
+        stats["latency"].merge(histogram)
+        if hour in hourly_latency:
+            hourly_latency[hour].merge(histogram)
+        else:
+            hourly_latency[hour] = histogram
+
+def _minute_counts(minutes, line, epoch=None):
+    """Contadores do minuto da linha em minutes (criados se preciso) ou None sem timestamp."""
+    if epoch is None:
+        epoch = _monitoring_line_time(line)
+        if epoch is None:
+            return None
+    minute = int(epoch) - int(epoch) % 60
+    counts = minutes.get(minute)
+    if counts is None:
+        counts = minutes[minute] = [0, 0, 0, 0.0, 0.0]
+    return counts
+
+def _parse_monitoring_range(path, start, end, since=None, until=None):
+    """Processa um trecho do log de monitoramento (executado nos processos do pool)."""
+    stats = _new_monitoring_stats()
+    _parse_monitoring_lines(_iter_log_lines(path, start, end, stats), stats, since, until)
+    return stats
+
+@lru_cache(maxsize=4096)
+def _local_minute_epoch(prefix):
+    """Epoch de "AAAA-MM-DD HH:MM" no horário local (memorizado por minuto)."""
+    return time.mktime(time.strptime(prefix, "%Y-%m-%d %H:%M"))
+
+@lru_cache(maxsize=4096)
+def _local_iso_minute_epoch(prefix):
+    """Epoch de "AAAA-MM-DDTHH:MM" no horário local (memorizado por minuto)."""
+    return time.mktime(time.strptime(prefix, "%Y-%m-%dT%H:%M"))
+
+def _monitoring_line_time(line):
+    """
+    Epoch de uma linha do log de monitoramento ou None.
+    
+    Aceita o log de texto ("AAAA-MM-DD HH:MM:SS,mmm - ...") e o estruturado
+    ('{"ts":"AAAA-MM-DDTHH:MM:SS.mmm", ...').
+    """
+    if line.startswith(CHECK_RECORD_PREFIX):
+        ts = line[len(CHECK_RECORD_PREFIX):len(CHECK_RECORD_PREFIX) + 19]
+        if len(ts) < 19 or ts[10] != "T" or ts[16] != ":":
+            return None
+        try:
+            return _local_iso_minute_epoch(ts[:16]) + int(ts[17:19])
+        except ValueError:
+            return None
+    if len(line) < 19 or line[4] != "-" or line[13] != ":" or line[16] != ":":
+        return None
+    try:
+        return _local_minute_epoch(line[:16]) + int(line[17:19])
+    except ValueError:
+        return None
+
+def _merge_monitoring_stats(stats, other):
+    """Combina os agregados de other (mais recente) em stats."""
+    for key in ("total_checks", "successful_checks", "failed_checks", "alerts_sent"):
+        stats[key] += other[key]
+    for key in READ_COUNTERS:
+        stats[key] += other.get(key, 0)
+    for key in ("errors", "downtime_events"):
+        stats[key].extend(other[key])
+    stats["latency"].merge(other["latency"])
+    for hour, histogram in other["hourly_latency"].items():
+        if hour in stats["hourly_latency"]:
+            stats["hourly_latency"][hour].merge(histogram)
+        else:
+            stats["hourly_latency"][hour] = histogram
+    _merge_minutes(stats["minutes"], other["minutes"], max_columns=(4,))
+    return stats
+
+def _monitoring_stats_to_state(stats):
+    """Converte os agregados do monitoramento em uma estrutura serializável em JSON."""
+    return dict(
+        {key: value for key, value in stats.items() if key not in READ_COUNTERS},
+        latency=stats["latency"].to_state(),
+        hourly_latency={hour: h.to_state() for hour, h in stats["hourly_latency"].items()}
+    )
+
+def _monitoring_stats_from_state(state):
+    """Reconstrói os agregados do monitoramento a partir de _monitoring_stats_to_state."""
+    state = dict(
+        state,
+        latency=LatencyHistogram.from_state(state["latency"]),
+        hourly_latency={hour: LatencyHistogram.from_state(h) for hour, h in state["hourly_latency"].items()},
+        minutes={int(k): v for k, v in state.get("minutes", {}).items()}
+    )
+    return _merge_monitoring_stats(_new_monitoring_stats(), state)
+
+def _finalize_monitoring_stats(stats):
+    """Calcula as estatísticas derivadas do monitoramento."""
+    latency = stats["latency"]
+    if latency.count:
+        stats["average_response_time"] = latency.mean()
+    stats["latency"] = latency.summary(LATENCY_QUANTILES)
+    
+    # Histograma por hora: quantis e contagem por faixa de LATENCY_BUCKETS
+    labels = [f"{bound:g}" if bound != float("inf") else "+Inf" for bound in LATENCY_BUCKETS]
+    stats["hourly_latency"] = {
+        hour: dict(histogram.summary(LATENCY_QUANTILES),
+                   buckets=dict(zip(labels, histogram.bucket_counts(LATENCY_BUCKETS))))
+        for hour, histogram in sorted(stats["hourly_latency"].items())
+    }
+    
+    if stats["total_checks"] > 0:
+        stats["uptime_percentage"] = (stats["successful_checks"] / stats["total_checks"]) * 100
+    
+    return stats
+
+def default_monitoring_log():
+    """
+    Log de monitoramento analisado por padrão.
+    
+    Returns:
+        MONITORING_CHECKS_LOG se ele (ou uma geração rotacionada dele) existir, senão MONITORING_LOG
+    """
+    if os.path.exists(MONITORING_CHECKS_LOG) or _discover_generations(MONITORING_CHECKS_LOG):
+        return MONITORING_CHECKS_LOG
+    return MONITORING_LOG
+
+def analyze_monitoring_log(log_path=None, include_rotated=False, workers=1,
+                           since=None, until=None, keep_summary=False):
+    """
+    Analisa o log do sistema de monitoramento.
+    
+    Args:
+        log_path: Caminho para o arquivo de log, estruturado (JSON) ou de texto
+                  (padrão: default_monitoring_log())
+        include_rotated: Inclui as gerações rotacionadas do log
+        workers: Número de processos para o parsing paralelo
+        since / until: Intervalo [since, until) em epoch, localizado por busca binária
+        keep_summary: Inclui em "summary_state" os agregados mergeáveis, com
+                      apenas os ERROR_SAMPLE_SIZE eventos mais recentes
+        
+    Returns:
+        Dict com estatísticas do monitoramento
+    """
+    stats = _new_monitoring_stats()
+    log_path = log_path or default_monitoring_log()
+    started = time.perf_counter()
+    
+    try:
+        rotated = _discover_generations(log_path) if include_rotated else []
+        segments = []
+        if since is not None or until is not None:
+            paths = _discover_generations(log_path)
+            if os.path.exists(log_path) or not paths:
+                paths.append(log_path)
+            segments = _window_segments(paths, since, until, _monitoring_line_time)
+            rotated = []
+        elif os.path.exists(log_path) or not rotated:
+            segments.append((log_path, 0, os.path.getsize(log_path)))
+        _process_log(
+            stats, segments, partial(_parse_monitoring_range, since=since, until=until),
+            _merge_monitoring_stats, workers, rotated,
+            cache_file=MONITORING_GENERATIONS_CACHE,
+            new_stats=_new_monitoring_stats, to_state=_monitoring_stats_to_state,
+            from_state=_monitoring_stats_from_state
+        )
+                    
+    except FileNotFoundError:
+        print(f"Arquivo de log não encontrado: {log_path}")
+    except Exception as e:
+        print(f"Erro ao analisar log de monitoramento: {e}")
+    
+    summary_state = None
+    if keep_summary:
+        summary_state = _monitoring_stats_to_state(stats)
+        for key in ("errors", "downtime_events"):
+            summary_state[key] = summary_state[key][-ERROR_SAMPLE_SIZE:]
+    stats["throughput"] = _pop_throughput(stats, time.perf_counter() - started)
+    stats["minute_rollups"] = {
+        "mode": None if since is not None or until is not None else "merge",
+        "minutes": stats.pop("minutes")
+    }
+    stats = _finalize_monitoring_stats(stats)
+    if keep_summary:
+        stats["summary_state"] = summary_state
+    return stats
+
+def update_rollup_store(store_file, nginx_rollups, monitoring_rollups, trend_days=None):
+    """
+    Grava as séries por minuto no armazenamento SQLite e consulta a tendência.
+    
+    Args:
+        store_file: Arquivo SQLite das séries
+        nginx_rollups / monitoring_rollups: Dicts {"mode", "minutes"} produzidos pelas análises
+        trend_days: Dias da tendência diária a consultar (opcional)
+        
+    Returns:
+        Lista com a tendência diária, ou None
+    """
+    try:
+        with RollupStore(store_file) as store:
+            if nginx_rollups["mode"]:
+                store.write_requests(nginx_rollups["minutes"], nginx_rollups["mode"])
+            if monitoring_rollups["mode"]:
+                store.write_checks(monitoring_rollups["minutes"], monitoring_rollups["mode"])
+            return store.trend(trend_days) if trend_days else None
+    except Exception as e:
+        print(f"❌ Erro ao atualizar séries em {store_file}: {e}")
+        return None
+
+def _downtime_windows(minutes):
+    """
+    Janelas de indisponibilidade a partir do índice por minuto do monitoramento.
+    
+    Uma janela começa no primeiro minuto com falha e termina no primeiro
+    minuto só com sucessos ou quando passam INCIDENT_GAP_MINUTES sem nenhuma
+    falha registrada (verificações ausentes: recuperação desconhecida).
+    
+    Args:
+        minutes: Dict epoch do minuto -> [sucessos, falhas, ...]
+        
+    Returns:
+        Lista de dicts {start, end, failed, successful, recovered_at} em ordem
+        cronológica, com epochs e end exclusivo
+    """
+    windows = []
+    current = None
+    for minute in sorted(minutes):
+        successful, failed = minutes[minute][0], minutes[minute][1]
+        if current is not None and minute - current["end"] >= INCIDENT_GAP_MINUTES * 60:
+            windows.append(current)
+            current = None
+        if failed:
+            if current is None:
+                current = {"start": minute, "end": minute, "failed": 0, "successful": 0, "recovered_at": None}
+            current["end"] = minute + 60
+            current["failed"] += failed
+            current["successful"] += successful
+        elif successful and current is not None:
+            current["recovered_at"] = minute
+            windows.append(current)
+            current = None
+    if current is not None:
+        windows.append(current)
+    return windows
+
+def _sort_merge_join(bounds, items):
+    """
+    Junção sort-merge entre intervalos e itens, ambos em ordem cronológica.
+    
+    Cada lado é percorrido uma única vez: O(intervalos + itens).
+    
+    Args:
+        bounds: Intervalos [início, fim) disjuntos e ordenados
+        items: Iterável de (epoch, valor) ordenado pelo epoch
+        
+    Yields:
+        Tuplas (índice do intervalo, valor) dos itens dentro de algum intervalo
+    """
+    index, count = 0, len(bounds)
+    for epoch, value in items:
+        while index < count and bounds[index][1] <= epoch:
+            index += 1
+        if index == count:
+            return
+        if epoch >= bounds[index][0]:
+            yield index, value
+
+def _event_epoch(timestamp):
+    """Epoch de "AAAA-MM-DD HH:MM:SS" ou "AAAA-MM-DDTHH:MM:SS" (None se inválido)."""
+    try:
+        return _local_minute_epoch(f"{timestamp[:10]} {timestamp[11:16]}") + int(timestamp[17:19])
+    except (TypeError, ValueError):
+        return None
+
+def build_incident_timeline(monitoring_minutes, nginx_minutes=None, error_minutes=None,
+                            downtime_events=(), error_entries=(), since=None):
+    """
+    Monta a linha do tempo de incidentes.
+    
+    Cada janela de indisponibilidade do monitoramento é combinada com as
+    respostas 4xx/5xx do log de acesso e com as entradas do log de erros do
+    mesmo período (alargado em INCIDENT_MARGIN_MINUTES). Todos os índices são
+    por minuto: cada um é ordenado uma vez (já chegam quase em ordem) e
+    percorrido junto com as janelas por _sort_merge_join, em tempo linear
+    no número de minutos, sem laços aninhados.
+    
+    Args:
+        monitoring_minutes: Índice por minuto do monitoramento
+        nginx_minutes: Índice por minuto do log de acesso ([total, 2xx, 3xx, 4xx, 5xx, bytes])
+        error_minutes: Índice por minuto do log de erros ([entradas, graves, {modelo: [contagem, graves]}])
+        downtime_events: Eventos de indisponibilidade do relatório do monitoramento
+        error_entries: Entradas recentes do relatório do log de erros
+        since: Início (epoch) dos índices dos logs do Nginx quando eles cobrem
+               só parte do histórico (execuções com checkpoint); janelas
+               terminadas antes disso são omitidas, e as que começam antes
+               recebem "partial_evidence"
+        
+    Returns:
+        Lista de incidentes em ordem cronológica
+    """
+    windows = _downtime_windows(monitoring_minutes)
+    if since is not None:
+        windows = [window for window in windows if window["end"] > since]
+    if not windows:
+        return []
+    
+    # Janelas alargadas pela margem, sem sobreposição (um minuto fica com a janela anterior)
+    margin = INCIDENT_MARGIN_MINUTES * 60
+    bounds = []
+    previous_end = float("-inf")
+    for window in windows:
+        start = max(window["start"] - margin, previous_end)
+        previous_end = window["end"] + margin
+        bounds.append((start, previous_end))
+    
+    def minute_text(epoch):
+        return datetime.datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M")
+    
+    incidents = []
+    for window in windows:
+        incidents.append({
+            "start": minute_text(window["start"]),
+            "end": minute_text(window["end"]),
+            "duration_minutes": (window["end"] - window["start"]) // 60,
+            "recovered_at": minute_text(window["recovered_at"]) if window["recovered_at"] else None,
+            "partial_evidence": since is not None and window["start"] < since,
+            "failed_checks": window["failed"],
+            "successful_checks": window["successful"],
+            "check_errors": [],
+            "http": {"requests": 0, "status_4xx": 0, "status_5xx": 0, "error_rate": 0.0,
+                     "burst_minutes": 0, "peak_minute": None, "peak_errors": 0},
+            "error_log": {"entries": 0, "severe_entries": 0, "templates": {}, "examples": []}
+        })
+    
+    for index, minute in _sort_merge_join(bounds, ((m, m) for m in sorted(nginx_minutes or ()))):
+        http = incidents[index]["http"]
+        counts = nginx_minutes[minute]
+        errors = counts[3] + counts[4]
+        http["requests"] += counts[0]
+        http["status_4xx"] += counts[3]
+        http["status_5xx"] += counts[4]
+        if errors >= INCIDENT_BURST_ERRORS:
+            http["burst_minutes"] += 1
+        if errors > http["peak_errors"]:
+            http["peak_errors"] = errors
+            http["peak_minute"] = minute_text(minute)
+    
+    for index, counts in _sort_merge_join(bounds, ((m, error_minutes[m]) for m in sorted(error_minutes or ()))):
+        error_log = incidents[index]["error_log"]
+        error_log["entries"] += counts[0]
+        error_log["severe_entries"] += counts[1]
+        for template, (count, severe_count) in counts[2].items():
+            template_counts = error_log["templates"].setdefault(template, [0, 0])
+            template_counts[0] += count
+            template_counts[1] += severe_count
+    
+    events = ((_event_epoch(e["timestamp"]), e) for e in sorted(downtime_events, key=lambda e: e["timestamp"]))
+    for index, event in _sort_merge_join(bounds, ((t, e) for t, e in events if t is not None)):
+        check_errors = incidents[index]["check_errors"]
+        if len(check_errors) < INCIDENT_SAMPLE_SIZE and event["error"] not in check_errors:
+            check_errors.append(event["error"])
+    
+    entries = ((_event_epoch(e["timestamp"]), e) for e in sorted(error_entries, key=lambda e: e["timestamp"]))
+    for index, entry in _sort_merge_join(bounds, ((t, e) for t, e in entries if t is not None)):
+        examples = incidents[index]["error_log"]["examples"]
+        if len(examples) < INCIDENT_SAMPLE_SIZE:
+            examples.append(entry)
+    
+    for incident in incidents:
+        http = incident["http"]
+        if http["requests"]:
+            http["error_rate"] = (http["status_4xx"] + http["status_5xx"]) / http["requests"]
+        # Os modelos com entradas graves vêm primeiro, mesmo que outros sejam mais frequentes
+        templates = heapq.nlargest(INCIDENT_SAMPLE_SIZE, incident["error_log"]["templates"].items(),
+                                   key=lambda item: (item[1][1], item[1][0]))
+        incident["error_log"]["templates"] = [
+            {"template": template, "count": count, "severe": severe_count}
+            for template, (count, severe_count) in templates
+        ]
+    return incidents
+
+def error_checkpoint_file(checkpoint_file):
+    """
+    Checkpoint do log de erros correspondente ao checkpoint do log de acesso
+    (ex.: relatorio.checkpoint.json -> relatorio.checkpoint.error.json).
+    """
+    if checkpoint_file == CHECKPOINT_FILE:
+        return ERROR_CHECKPOINT_FILE
+    root, ext = os.path.splitext(checkpoint_file)
+    return f"{root}.error{ext}"
+
+def _assemble_report(nginx_stats, monitoring_stats, error_stats, nginx_minutes, monitoring_minutes,
+                     error_minutes, incidents_since=None):
+    """
+    Monta o relatório a partir das estatísticas já finalizadas de cada log.
+    
+    incidents_since é o início (epoch) dos índices por minuto dos logs do
+    Nginx quando eles cobrem só os dados novos (ver build_incident_timeline).
+    """
+    report = {
+        "generated_at": datetime.datetime.now().isoformat(),
+        "nginx": nginx_stats,
+        "monitoring": monitoring_stats,
+        "summary": {
+            "total_web_requests": nginx_stats["total_requests"],
+            "unique_visitors": nginx_stats["unique_visitors"],
+            "monitoring_uptime": monitoring_stats["uptime_percentage"],
+            "total_monitoring_checks": monitoring_stats["total_checks"],
+            "alerts_sent": monitoring_stats["alerts_sent"]
+        }
+    }
+    if error_stats is not None:
+        report["nginx_error_log"] = error_stats
+        report["summary"]["error_log_entries"] = error_stats["total_entries"]
+        report["summary"]["severe_error_log_entries"] = error_stats["severe_entries"]
+    
+    report["incidents"] = build_incident_timeline(
+        monitoring_minutes, nginx_minutes, error_minutes,
+        monitoring_stats["downtime_events"], error_stats["entries"] if error_stats is not None else (),
+        incidents_since
+    )
+    report["incidents_since"] = (
+        datetime.datetime.fromtimestamp(incidents_since).isoformat() if incidents_since is not None else None
+    )
+    report["summary"]["incidents"] = len(report["incidents"])
+    return report
+
+def build_node_summary(states, throughput, since=None, until=None, node=None, incidents_since=None):
+    """
+    Monta o resumo parcial mergeável de um servidor.
+    
+    O resumo guarda os agregados antes da finalização (contadores, sketches,
+    histogramas e séries por minuto), em memória fixa exceto pelas séries,
+    que crescem com o período analisado e não com o tráfego.
+    
+    Args:
+        states: Dict log -> agregados serializados ("nginx", "monitoring" e,
+                opcionalmente, "nginx_error_log")
+        throughput: Dict log -> contadores de leitura da análise
+        since / until: Intervalo analisado em epoch (None = aberto)
+        node: Nome do servidor (padrão: hostname)
+        incidents_since: Início (epoch) das séries por minuto dos logs do
+                         Nginx em uma execução com checkpoint (None = completas)
+    """
+    node = node or socket.gethostname()
+    return dict(
+        states,
+        format=NODE_SUMMARY_FORMAT,
+        version=NODE_SUMMARY_VERSION,
+        generated_at=datetime.datetime.now().isoformat(),
+        nodes=[{
+            "node": node,
+            "generated_at": datetime.datetime.now().isoformat(),
+            "since": datetime.datetime.fromtimestamp(since).isoformat() if since is not None else None,
+            "until": datetime.datetime.fromtimestamp(until).isoformat() if until is not None else None,
+            "incidents_since": (datetime.datetime.fromtimestamp(incidents_since).isoformat()
+                                if incidents_since is not None else None)
+        }],
+        throughput=throughput
+    )
+
+def save_node_summary(summary, filename):
+    """
+    Salva o resumo parcial (JSON compacto; gzip se o nome terminar em .gz).
+    
+    Args:
+        summary: Resumo gerado por build_node_summary ou merge_node_summaries
+        filename: Arquivo de destino
+    """
+    try:
+        write_summary(summary, filename)
+        print(f"\n📦 Resumo parcial salvo em: {filename}")
+    except Exception as e:
+        print(f"❌ Erro ao salvar resumo parcial: {e}")
+
+def _merge_throughput(throughput, other):
+    """Soma os contadores de leitura de other em throughput e recalcula as taxas."""
+    for key in READ_COUNTERS + ("seconds",):
+        throughput[key] = throughput.get(key, 0) + other.get(key, 0)
+    seconds = throughput["seconds"]
+    throughput["lines_per_second"] = throughput["lines_read"] / seconds if seconds > 0 else 0.0
+    throughput["bytes_per_second"] = throughput["bytes_read"] / seconds if seconds > 0 else 0.0
+    return throughput
+
+def merge_node_summaries(summaries):
+    """
+    Combina resumos parciais de vários servidores em um único resumo.
+    
+    Cada seção é reconstruída com from_state e somada pelas mesmas funções
+    que combinam as faixas de um log; nenhum log é lido e o custo depende
+    só do tamanho dos resumos. As chaves marcadas pelos detectores de taxa
+    são unidas (RateAnomalyDetector.combine) e as amostras (erros recentes,
+    eventos de indisponibilidade) são reordenadas pelo horário e limitadas
+    a ERROR_SAMPLE_SIZE. O resultado pode ser combinado de novo.
+    
+    Args:
+        summaries: Lista de resumos (build_node_summary ou merge_node_summaries)
+        
+    Returns:
+        Resumo combinado
+        
+    Raises:
+        ValueError: Resumo em formato desconhecido ou com parâmetros incompatíveis
+    """
+    for summary in summaries:
+        if summary.get("format") != NODE_SUMMARY_FORMAT or summary.get("version") != NODE_SUMMARY_VERSION:
+            raise ValueError(f"resumo em formato desconhecido: {summary.get('format')} {summary.get('version')}")
+    
+    nginx = _new_nginx_stats(bounded=True)
+    monitoring = _new_monitoring_stats()
+    error_log = _new_error_log_stats() if any("nginx_error_log" in s for s in summaries) else None
+    rates = None
+    samples = {"nginx": [], "nginx_error_log": [], "downtime_events": [], "errors": []}
+    throughput = {}
+    nodes = []
+    
+    for summary in summaries:
+        other = _nginx_stats_from_state(summary["nginx"])
+        other_rates, other["rates"] = other["rates"], nginx["rates"]
+        rates = other_rates if rates is None else rates.combine(other_rates)
+        samples["nginx"].extend(other["errors"])
+        _merge_nginx_stats(nginx, other)
+        
+        other = _monitoring_stats_from_state(summary["monitoring"])
+        for key in ("downtime_events", "errors"):
+            samples[key].extend(other[key])
+        _merge_monitoring_stats(monitoring, other)
+        
+        if "nginx_error_log" in summary:
+            other = _error_log_stats_from_state(summary["nginx_error_log"])
+            samples["nginx_error_log"].extend(other["entries"])
+            _merge_error_log_stats(error_log, other)
+        
+        for log, counters in summary.get("throughput", {}).items():
+            _merge_throughput(throughput.setdefault(log, {}), counters)
+        nodes.extend(summary.get("nodes", ()))
+    
+    def recent(items, key):
+        return sorted(items, key=key)[-ERROR_SAMPLE_SIZE:]
+    
+    nginx["rates"] = rates or nginx["rates"]
+    nginx["errors"] = deque(recent(samples["nginx"], lambda e: e["timestamp"]), maxlen=ERROR_SAMPLE_SIZE)
+    for key in ("downtime_events", "errors"):
+        monitoring[key] = recent(samples[key], lambda e: e.get("timestamp", ""))
+    
+    merged = {
+        "format": NODE_SUMMARY_FORMAT,
+        "version": NODE_SUMMARY_VERSION,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "nodes": nodes,
+        "throughput": throughput,
+        "nginx": _nginx_stats_to_state(nginx),
+        "monitoring": _monitoring_stats_to_state(monitoring)
+    }
+    if error_log is not None:
+        error_log["entries"] = deque(recent(samples["nginx_error_log"], lambda e: e[0]), maxlen=ERROR_SAMPLE_SIZE)
+        merged["nginx_error_log"] = _error_log_stats_to_state(error_log)
+    return merged
+
+def report_from_summary(summary):
+    """
+    Gera o relatório de um resumo parcial (de um servidor ou combinado).
+    
+    Args:
+        summary: Resumo gerado por build_node_summary ou merge_node_summaries
+        
+    Returns:
+        Dict no mesmo formato de generate_report, com a lista de servidores em "nodes"
+    """
+    sections = {}
+    minutes = {}
+    for log, from_state, finalize in (
+        ("nginx", _nginx_stats_from_state, _finalize_nginx_stats),
+        ("monitoring", _monitoring_stats_from_state, _finalize_monitoring_stats),
+        ("nginx_error_log", _error_log_stats_from_state, _finalize_error_log_stats)
+    ):
+        if log not in summary:
+            continue
+        stats = from_state(summary[log])
+        for key in READ_COUNTERS:
+            stats.pop(key)
+        stats["throughput"] = _merge_throughput({}, summary.get("throughput", {}).get(log, {}))
+        minutes[log] = stats.pop("minutes")
+        sections[log] = finalize(stats)
+    
+    # As séries de um servidor com checkpoint limitam os incidentes de todo o conjunto
+    starts = [node["incidents_since"] for node in summary.get("nodes", []) if node.get("incidents_since")]
+    report = _assemble_report(
+        sections["nginx"], sections["monitoring"], sections.get("nginx_error_log"),
+        minutes["nginx"], minutes["monitoring"], minutes.get("nginx_error_log"),
+        datetime.datetime.fromisoformat(max(starts)).timestamp() if starts else None
+    )
+    report["nodes"] = summary.get("nodes", [])
+    return report
+
+def merge_summary_files(filenames):
+    """
+    Lê e combina resumos parciais gravados em arquivo.
+    
+    Returns:
+        Resumo combinado ou None se algum arquivo não puder ser lido
+    """
+    summaries = []
+    for filename in filenames:
+        try:
+            summaries.append(load_summary(filename))
+        except (OSError, ValueError) as e:
+            print(f"❌ Erro ao ler resumo {filename}: {e}")
+            return None
+    try:
+        return merge_node_summaries(summaries)
+    except ValueError as e:
+        print(f"❌ Resumos incompatíveis: {e}")
+        return None
+
+def generate_report(checkpoint_file=None, workers=1, log_format=NGINX_LOG_FORMAT, bounded=False,
+                    include_rotated=False, since=None, until=None, store_file=None, trend_days=None,
+                    monitoring_log=None, error_log=NGINX_ERROR_LOG, summary_file=None):
+    """
+    Gera um relatório completo dos logs.
+    
+    Args:
+        checkpoint_file: Checkpoint para análise incremental do log de acesso (opcional)
+        workers: Número de processos para o parsing do log de acesso
+        log_format: Diretiva log_format do Nginx usada no log de acesso
+        bounded: Analisa o log de acesso com memória fixa
+        include_rotated: Inclui as gerações rotacionadas (.1, .2.gz, ...) dos logs
+        since / until: Restringe o relatório ao intervalo [since, until) em epoch
+        store_file: Arquivo SQLite que recebe as séries por minuto (opcional)
+        trend_days: Inclui a tendência diária dos últimos N dias, lida de store_file
+        monitoring_log: Log de monitoramento analisado (padrão: default_monitoring_log())
+        error_log: Log de erros do Nginx (None = não analisa)
+        summary_file: Grava também o resumo parcial mergeável deste servidor (opcional)
+        
+    Returns:
+        Dict com o relatório completo
+    """
+    print("🔍 Analisando logs...")
+    
+    keep_summary = bool(summary_file)
+    nginx_stats = analyze_nginx_access_log(
+        checkpoint_file=checkpoint_file, workers=workers, log_format=log_format, bounded=bounded,
+        include_rotated=include_rotated, since=since, until=until, keep_summary=keep_summary
+    )
+    monitoring_stats = analyze_monitoring_log(
+        monitoring_log, include_rotated=include_rotated, workers=workers, since=since, until=until,
+        keep_summary=keep_summary
+    )
+    error_stats = None
+    if error_log:
+        error_stats = analyze_nginx_error_log(
+            error_log, checkpoint_file=error_checkpoint_file(checkpoint_file) if checkpoint_file else None,
+            workers=workers, include_rotated=include_rotated, since=since, until=until,
+            keep_summary=keep_summary
+        )
+    nginx_rollups = nginx_stats.pop("minute_rollups")
+    monitoring_rollups = monitoring_stats.pop("minute_rollups")
+    error_rollups = error_stats.pop("minute_rollups") if error_stats is not None else None
+    error_minutes = error_rollups["minutes"] if error_rollups is not None else None
+    # Com checkpoint, os índices por minuto cobrem apenas os dados lidos nesta execução
+    starts = [rollups["since"] for rollups in (nginx_rollups, error_rollups)
+              if rollups is not None and rollups["since"] is not None]
+    incidents_since = max(starts) if starts else None
+    
+    if summary_file:
+        states = {"nginx": nginx_stats.pop("summary_state"), "monitoring": monitoring_stats.pop("summary_state")}
+        if error_stats is not None:
+            states["nginx_error_log"] = error_stats.pop("summary_state")
+        throughput = {log: stats["throughput"] for log, stats in (
+            ("nginx", nginx_stats), ("nginx_error_log", error_stats), ("monitoring", monitoring_stats)
+        ) if stats is not None}
+        save_node_summary(build_node_summary(states, throughput, since, until,
+                                             incidents_since=incidents_since), summary_file)
+    
+    report = _assemble_report(
+        nginx_stats, monitoring_stats, error_stats,
+        nginx_rollups["minutes"], monitoring_rollups["minutes"], error_minutes, incidents_since
+    )
+    
+    if store_file:
+        trend = update_rollup_store(store_file, nginx_rollups, monitoring_rollups, trend_days)
+        if trend is not None:
+            report["trend"] = trend
+    
+    return report
+
+def print_summary_report(report):
+    """
+    Imprime um resumo do relatório.
+    
+    Args:
+        report: Relatório gerado pela função generate_report
+    """
+    print("\n" + "="*60)
+    print("📊 RELATÓRIO DE LOGS - PROJETO LINUX")
+    print("="*60)
+    
+    print(f"\n🕒 Gerado em: {report['generated_at']}")
+    if report.get('nodes'):
+        print(f"🖥️  Servidores: {', '.join(node['node'] for node in report['nodes'])}")
+    
+    print("\n🌐 ESTATÍSTICAS DO SERVIDOR WEB:")
+    print(f"   • Total de requisições: {report['nginx']['total_requests']}")
+    print(f"   • Visitantes únicos: {report['nginx']['unique_visitors']}")
+    print(f"   • Códigos de status mais comuns:")
+    for status, count in report['nginx']['status_codes'].most_common(5):
+        print(f"     - {status}: {count} requisições")
+    
+    if report['nginx']['top_pages']:
+        print(f"   • Páginas mais acessadas:")
+        for page, count in report['nginx']['top_pages'].most_common(5):
+            print(f"     - {page}: {count} acessos")
+    
+    print("\n📊 ESTATÍSTICAS DO MONITORAMENTO:")
+    print(f"   • Total de verificações: {report['monitoring']['total_checks']}")
+    print(f"   • Verificações bem-sucedidas: {report['monitoring']['successful_checks']}")
+    print(f"   • Verificações com falha: {report['monitoring']['failed_checks']}")
+    print(f"   • Uptime: {report['monitoring']['uptime_percentage']:.2f}%")
+    print(f"   • Tempo médio de resposta: {report['monitoring']['average_response_time']:.3f}s")
+    latency = report['monitoring']['latency']
+    if latency['count']:
+        print(f"   • Latência p50/p90/p99/p99.9: {latency['p50']:.3f}s / {latency['p90']:.3f}s / "
+              f"{latency['p99']:.3f}s / {latency['p99.9']:.3f}s (mín. {latency['min']:.3f}s, "
+              f"máx. {latency['max']:.3f}s)")
+    print(f"   • Alertas enviados: {report['monitoring']['alerts_sent']}")
+    
+    error_log = report.get('nginx_error_log')
+    if error_log is not None:
+        print("\n🧯 LOG DE ERROS DO NGINX:")
+        levels = ", ".join(f"{level}: {count}" for level, count in error_log['levels'].most_common())
+        print(f"   • Entradas: {error_log['total_entries']} ({levels or 'nenhuma'})")
+        if error_log['templates']:
+            print(f"   • Mensagens mais frequentes:")
+            for item in error_log['templates'][:5]:
+                print(f"     - [{item['level']}] {item['template'][:100]}: {item['count']} vezes "
+                      f"(última em {item['last_seen']})")
+    
+    print("\n⚡ DESEMPENHO DA ANÁLISE:")
+    for name, log in (("Log de acesso", "nginx"), ("Log de erros", "nginx_error_log"),
+                      ("Log de monitoramento", "monitoring")):
+        if log not in report:
+            continue
+        throughput = report[log]["throughput"]
+        print(f"   • {name}: {throughput['lines_read']} linhas, {throughput['bytes_read'] / 1e6:.1f} MB em "
+              f"{throughput['seconds']:.2f}s ({throughput['lines_per_second']:.0f} linhas/s, "
+              f"{throughput['parse_failures']} falhas de parsing)")
+    
+    if report.get('incidents'):
+        print(f"\n🔥 INCIDENTES ({len(report['incidents'])}):")
+        if report.get('incidents_since'):
+            print(f"   (a partir de {report['incidents_since'][:16].replace('T', ' ')}: com --checkpoint, "
+                  f"apenas os dados novos dos logs do Nginx são cruzados)")
+        for incident in report['incidents'][-5:]:  # Últimos 5
+            recovered = f"até {incident['end'][11:]}" if incident['recovered_at'] else "sem recuperação registrada"
+            partial = " - evidências parciais" if incident.get('partial_evidence') else ""
+            print(f"   • {incident['start']} ({incident['duration_minutes']} min, {recovered}): "
+                  f"{incident['failed_checks']} verificações com falha{partial}")
+            http = incident['http']
+            if http['requests']:
+                print(f"     - HTTP: {http['status_5xx']} erros 5xx e {http['status_4xx']} 4xx em "
+                      f"{http['requests']} requisições ({http['error_rate']:.1%}), pico em {http['peak_minute']}")
+            error_log = incident['error_log']
+            if error_log['entries']:
+                top = error_log['templates'][0]['template'][:80] if error_log['templates'] else ""
+                print(f"     - Log de erros: {error_log['entries']} entradas ({error_log['severe_entries']} graves): {top}")
+    
+    if report['monitoring']['downtime_events']:
+        print(f"\n⚠️  EVENTOS DE INDISPONIBILIDADE:")
+        for event in report['monitoring']['downtime_events'][-5:]:  # Últimos 5
+            print(f"   • {event['timestamp']}: {event['error']}")
+    
+    anomalies = report['nginx'].get('rate_anomalies')
+    if anomalies and (anomalies['ips'] or anomalies['paths']):
+        print(f"\n🚨 TAXAS ANÔMALAS (limite {anomalies['limits']['requests_per_minute']} req/min ou "
+              f"{anomalies['limits']['baseline_factor']}x a linha de base):")
+        for dimension, name, label in (("ips", "ip", "IP"), ("paths", "path", "Página")):
+            for item in anomalies[dimension][:5]:
+                reason = "limite" if item['reason'] == "threshold" else f"base {item['baseline_per_minute']:.1f}/min"
+                print(f"   • {label} {item[name]}: pico de {item['peak_requests_per_minute']} req/min em "
+                      f"{item['peak_minute']} ({reason}, {item['flagged_minutes']} min marcados)")
+
+    if report['nginx']['errors']:
+        print(f"\n❌ ERROS HTTP RECENTES:")
+        for error in report['nginx']['errors'][-5:]:  # Últimos 5
+            print(f"   • {error['timestamp']}: {error['status']} - {error['path']} ({error['ip']})")
+    
+    if report.get('trend'):
+        print(f"\n📈 TENDÊNCIA DIÁRIA ({len(report['trend'])} dias com dados):")
+        for day in report['trend'][-10:]:  # Últimos 10
+            uptime = f"{day['uptime_percentage']:.2f}%" if day['uptime_percentage'] is not None else "-"
+            print(f"   • {day['date']}: {day['requests']} requisições, "
+                  f"{day['status_5xx']} erros 5xx, uptime {uptime}")
+
+def save_report_json(report, filename=None, compact=False, compress=False, split=True):
+    """
+    Salva o relatório em formato JSON.
+    
+    O relatório é gravado em streaming por report_writer.write_report: as
+    seções volumosas (IPs, erros e eventos de indisponibilidade) vão para
+    arquivos JSON Lines ao lado do arquivo principal, que fica só com o resumo.
+    
+    Args:
+        report: Relatório a ser salvo
+        filename: Nome do arquivo (opcional)
+        compact: JSON sem indentação
+        compress: Comprime os arquivos com gzip
+        split: Grava as seções volumosas em arquivos separados
+    """
+    if filename is None:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"/home/ubuntu/relatorio_logs_{timestamp}.json"
+    
+    try:
+        paths = write_report(report, filename, compact=compact, compress=compress, split=split)
+        print(f"\n💾 Relatório salvo em: {paths[0]}")
+        if len(paths) > 1:
+            print(f"   • Seções volumosas em {len(paths) - 1} arquivo(s) separado(s)")
+    except Exception as e:
+        print(f"❌ Erro ao salvar relatório: {e}")
+
+def save_metrics(report, metrics_file=METRICS_FILE, state_file=METRICS_STATE_FILE):
+    """
+    Grava as métricas de desempenho da análise no formato Prometheus.
+    
+    Os counters (linhas e bytes lidos, falhas de parsing, execuções) são
+    acumulados entre execuções em state_file; os gauges descrevem a última
+    execução. O arquivo é anexado ao endpoint de métricas do monitor_site.py.
+    
+    Args:
+        report: Relatório gerado pela função generate_report
+        metrics_file: Arquivo .prom de destino
+        state_file: Arquivo JSON com os totais acumulados
+    """
+    totals = _load_json(state_file)
+    totals = totals if isinstance(totals, dict) else {}
+    
+    metrics = MetricsRegistry()
+    counters = {
+        key: metrics.counter(f"projeto_linux_analyzer_{key}_total", help_text, ("log",))
+        for key, help_text in (
+            ("lines_read", "Linhas lidas pelo analisador"),
+            ("bytes_read", "Bytes lidos pelo analisador (descompactados, nas gerações .gz)"),
+            ("parse_failures", "Linhas que não puderam ser interpretadas")
+        )
+    }
+    seconds = metrics.gauge("projeto_linux_analyzer_last_run_seconds", "Duração da última análise", ("log",))
+    rate = metrics.gauge("projeto_linux_analyzer_lines_per_second", "Linhas por segundo na última análise", ("log",))
+    for log in ("nginx", "nginx_error_log", "monitoring"):
+        if log not in report:
+            continue
+        throughput = report[log]["throughput"]
+        log_totals = totals.setdefault(log, {})
+        for key, counter in counters.items():
+            log_totals[key] = log_totals.get(key, 0) + throughput[key]
+            counter.inc(log_totals[key], log=log)
+        seconds.set(round(throughput["seconds"], 6), log=log)
+        rate.set(round(throughput["lines_per_second"], 3), log=log)
+    totals["runs"] = totals.get("runs", 0) + 1
+    metrics.counter("projeto_linux_analyzer_runs_total", "Execuções do analisador").inc(totals["runs"])
+    metrics.gauge("projeto_linux_analyzer_last_run_timestamp_seconds", "Horário (epoch) da última análise").set(
+        int(time.time())
+    )
+    
+    try:
+        _write_json_atomic(state_file, totals)
+        metrics.write_textfile(metrics_file)
+    except OSError as e:
+        print(f"❌ Erro ao salvar métricas em {metrics_file}: {e}")
+
+class LogFollower:
+    """
+    Acompanha um log que cresce (como `tail -F`), sobrevivendo à rotação.
+    
+    Na rotação por renomeação (novo inode no caminho), o restante do arquivo
+    antigo é lido antes de passar ao novo, desde o início; com copytruncate
+    (arquivo menor que a posição lida), a leitura recomeça do início. Se o
+    arquivo não existir, novas tentativas são feitas a cada leitura.
+    """
+    
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self._file = None
+        self._inode = None
+        self._pending = b""
+        self._open(from_start)
+    
+    def _open(self, from_start=True):
+        """Abre o caminho atual; sem from_start, posiciona no fim."""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return False
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        self._file = f
+        self._inode = os.fstat(f.fileno()).st_ino
+        self._pending = b""
+        return True
+    
+    def close(self):
+        """Fecha o arquivo acompanhado."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def read_lines(self):
+        """
+        Lê as linhas completas escritas desde a última leitura.
+        
+        Returns:
+            Lista de linhas (str); uma linha parcial fica guardada até ser concluída
+        """
+        if self._file is None and not self._open():
+            return []
+        block = self._file.read(READ_BLOCK_SIZE)
+        if not block:
+            self._check_rotation()
+            return []
+        block = self._pending + block
+        cut = block.rfind(b"\n") + 1
+        self._pending = block[cut:][-READ_BLOCK_SIZE:]
+        return block[:cut].decode("utf-8", errors="replace").splitlines()
+    
+    def _check_rotation(self):
+        """Reabre o log se ele foi rotacionado ou truncado."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return  # rotacionado e ainda não recriado
+        if stat.st_ino != self._inode:
+            self.close()
+            self._open()
+        elif stat.st_size < self._file.tell():
+            self._file.seek(0)
+            self._pending = b""
+
+def _follow_nginx_lines(lines, parse, windows, now):
+    """Registra nas janelas as requisições de um lote de linhas do log de acesso."""
+    path_index = FIELDS.index("path")
+    status_index = FIELDS.index("status")
+    fallback = NGINX_LOG_PATTERN.match
+    requests = errors = 0
+    paths = Counter()
+    for line in lines:
+        fields = parse(line)
+        if fields is None:
+            match = fallback(line.strip())
+            if match is None:
+                continue
+            fields = match.group(*FIELDS)
+        requests += 1
+        paths[fields[path_index]] += 1
+        if fields[status_index][:1] == "5":
+            errors += 1
+    if requests:
+        counters = {"requests": requests, "status_5xx": errors}
+        for window in windows:
+            window.add(now, counters, paths)
+
+def _follow_monitoring_lines(lines, windows, now):
+    """Registra nas janelas as verificações de um lote do log de monitoramento."""
+    checks = failed = 0
+    latencies = []
+    records = _decode_check_batch([line for line in lines if line.startswith(CHECK_RECORD_PREFIX)])
+    for record in records:
+        up = record.get("up")
+        if up is None:
+            continue
+        checks += 1
+        if up:
+            if record.get("latency") is not None:
+                latencies.append(record["latency"])
+        else:
+            failed += 1
+    for line in lines:
+        if line.startswith("{"):
+            continue
+        if "Site OK" in line:
+            checks += 1
+            time_match = re.search(r'Tempo: ([\d.]+)s', line)
+            if time_match:
+                latencies.append(float(time_match.group(1)))
+        elif "Site com problema" in line or "Erro ao acessar" in line:
+            checks += 1
+            failed += 1
+    if checks:
+        counters = {"checks": checks, "checks_failed": failed}
+        for window in windows:
+            window.add(now, counters, latencies=latencies)
+
+def follow_snapshot(windows, started, now=None):
+    """
+    Resume as janelas deslizantes do modo --follow.
+    
+    Args:
+        windows: Dict nome -> (SlidingWindow do log de acesso, SlidingWindow do monitoramento)
+        started: Instante (epoch) em que o acompanhamento começou
+        now: Instante do resumo (padrão: agora)
+        
+    Returns:
+        Dict com o timestamp e, para cada janela, requisições, taxa por segundo,
+        erros 5xx, páginas mais acessadas, verificações, falhas e latência
+    """
+    now = time.time() if now is None else now
+    snapshot = {"timestamp": datetime.datetime.fromtimestamp(now).isoformat(timespec="seconds"), "windows": {}}
+    for name, (access, monitoring) in windows.items():
+        counters, top, _ = access.snapshot(now)
+        checks, _, latency = monitoring.snapshot(now)
+        elapsed = max(min(access.span, now - started), 1e-9)
+        requests = counters["requests"]
+        snapshot["windows"][name] = {
+            "requests": requests,
+            "requests_per_second": requests / elapsed,
+            "status_5xx": counters["status_5xx"],
+            "error_rate": counters["status_5xx"] / requests * 100 if requests else 0.0,
+            "top_pages": top.most_common(FOLLOW_TOP),
+            "checks": checks["checks"],
+            "failed_checks": checks["checks_failed"],
+            "latency": latency.summary(LATENCY_QUANTILES)
+        }
+    return snapshot
+
+def print_follow_snapshot(snapshot, clear=False):
+    """
+    Exibe o resumo das janelas deslizantes no terminal.
+    
+    Args:
+        snapshot: Resumo gerado por follow_snapshot
+        clear: Limpa a tela antes (terminal interativo)
+    """
+    if clear:
+        print("\033[H\033[2J", end="")
+    print("="*60)
+    print(f"📡 ACOMPANHAMENTO AO VIVO - {snapshot['timestamp']}")
+    print("="*60)
+    for name, window in snapshot["windows"].items():
+        print(f"\n⏱️  Últimos {name}:")
+        print(f"   • Requisições: {window['requests']} ({window['requests_per_second']:.2f}/s)")
+        print(f"   • Erros 5xx: {window['status_5xx']} ({window['error_rate']:.2f}%)")
+        if window["top_pages"]:
+            pages = ", ".join(f"{page} ({count})" for page, count in window["top_pages"][:5])
+            print(f"   • Páginas mais acessadas: {pages}")
+        print(f"   • Verificações: {window['checks']} ({window['failed_checks']} com falha)")
+        latency = window["latency"]
+        if latency["count"]:
+            print(f"   • Latência p50/p90/p99: {latency['p50']:.3f}s / {latency['p90']:.3f}s / "
+                  f"{latency['p99']:.3f}s (máx. {latency['max']:.3f}s)")
+    print("\n(Ctrl+C para sair)", flush=True)
+
+def follow_logs(access_log=NGINX_ACCESS_LOG, monitoring_log=None, log_format=NGINX_LOG_FORMAT,
+                refresh=FOLLOW_REFRESH, as_json=False):
+    """
+    Acompanha os logs de acesso e de monitoramento (modo --follow).
+    
+    As linhas novas são contadas no instante em que são lidas, em janelas
+    deslizantes de memória fixa (FOLLOW_WINDOWS), e um resumo é exibido a
+    cada `refresh` segundos até Ctrl+C.
+    
+    Args:
+        access_log: Log de acesso do Nginx
+        monitoring_log: Log de monitoramento (padrão: default_monitoring_log())
+        log_format: Diretiva log_format do Nginx usada no log de acesso
+        refresh: Intervalo entre resumos, em segundos
+        as_json: Emite cada resumo como uma linha JSON em vez do resumo no terminal
+    """
+    if monitoring_log is None:
+        monitoring_log = default_monitoring_log()
+    parse = compile_log_format(log_format).parse
+    windows = {
+        name: (SlidingWindow(span, FOLLOW_SLOTS, FOLLOW_TOP * 10), SlidingWindow(span, FOLLOW_SLOTS, 1))
+        for name, span in FOLLOW_WINDOWS
+    }
+    access_windows = [access for access, _ in windows.values()]
+    monitoring_windows = [monitoring for _, monitoring in windows.values()]
+    access = LogFollower(access_log)
+    monitoring = LogFollower(monitoring_log)
+    clear = not as_json and os.isatty(1)
+    started = time.time()
+    next_refresh = started + refresh
+    
+    try:
+        while True:
+            access_lines = access.read_lines()
+            monitoring_lines = monitoring.read_lines()
+            now = time.time()
+            if access_lines:
+                _follow_nginx_lines(access_lines, parse, access_windows, now)
+            if monitoring_lines:
+                _follow_monitoring_lines(monitoring_lines, monitoring_windows, now)
+            if now >= next_refresh:
+                snapshot = follow_snapshot(windows, started, now)
+                if as_json:
+                    print(json.dumps(snapshot, ensure_ascii=False), flush=True)
+                else:
+                    print_follow_snapshot(snapshot, clear)
+                next_refresh = now + refresh
+            if not access_lines and not monitoring_lines:
+                time.sleep(FOLLOW_POLL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        access.close()
+        monitoring.close()
+
+def _parse_time_arg(value):
+    """
+    Converte um argumento de tempo em epoch.
+    
+    Aceita ISO 8601 ("2024-03-10 22:00", "2024-03-10T22:00:00-03:00"; sem fuso
+    é usado o horário local) ou uma duração relativa a agora ("90s", "30m", "1h", "7d").
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    match = re.fullmatch(r"(\d+)([smhd])", value.strip())
+    if match:
+        return time.time() - int(match.group(1)) * units[match.group(2)]
+    try:
+        return datetime.datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data/hora inválida: {value!r}")
+
+def parse_args(argv=None):
+    """Interpreta os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="Analisador de Logs - Projeto Linux")
+    parser.add_argument(
+        "--checkpoint", nargs="?", const=CHECKPOINT_FILE, default=None, metavar="ARQUIVO",
+        help=f"análise incremental do log de acesso usando checkpoint (padrão: {CHECKPOINT_FILE})"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="processos para o parsing do log de acesso (0 = todos os núcleos)"
+    )
+    parser.add_argument(
+        "--log-format", default=NGINX_LOG_FORMAT, metavar="FORMATO",
+        help="diretiva log_format do Nginx usada no log de acesso (padrão: combined)"
+    )
+    parser.add_argument(
+        "--bounded", action="store_true",
+        help="memória fixa: estimativas (HyperLogLog/Space-Saving) e amostra dos erros recentes"
+    )
+    parser.add_argument(
+        "--rotated", action="store_true",
+        help="inclui as gerações rotacionadas dos logs (.1, .2.gz, ...)"
+    )
+    parser.add_argument(
+        "--since", type=_parse_time_arg, metavar="INÍCIO",
+        help='início do intervalo: data/hora ("2024-03-10 22:00") ou relativo ("1h", "30m", "7d")'
+    )
+    parser.add_argument(
+        "--until", type=_parse_time_arg, metavar="FIM",
+        help="fim do intervalo (exclusivo), no mesmo formato de --since"
+    )
+    parser.add_argument(
+        "--monitoring-log", default=None, metavar="ARQUIVO",
+        help=f"log de monitoramento, estruturado ou de texto (padrão: {MONITORING_CHECKS_LOG} "
+             f"se existir, senão {MONITORING_LOG})"
+    )
+    parser.add_argument(
+        "--error-log", default=NGINX_ERROR_LOG, metavar="ARQUIVO",
+        help=f"log de erros do Nginx (padrão: {NGINX_ERROR_LOG}); com --checkpoint, usa um "
+             f"checkpoint próprio ao lado do informado"
+    )
+    parser.add_argument(
+        "--no-error-log", dest="error_log", action="store_const", const=None,
+        help="não analisa o log de erros do Nginx"
+    )
+    parser.add_argument(
+        "--store", default=ROLLUP_DB, metavar="ARQUIVO",
+        help=f"arquivo SQLite com as séries por minuto, hora e dia (padrão: {ROLLUP_DB})"
+    )
+    parser.add_argument(
+        "--no-store", dest="store", action="store_const", const=None,
+        help="não grava as séries por minuto"
+    )
+    parser.add_argument(
+        "--trend", type=int, nargs="?", const=90, default=None, metavar="DIAS",
+        help="inclui a tendência diária dos últimos DIAS (padrão: 90), lida das séries gravadas"
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="grava o relatório JSON sem indentação"
+    )
+    parser.add_argument(
+        "--gzip", action="store_true",
+        help="comprime os arquivos do relatório com gzip"
+    )
+    parser.add_argument(
+        "--single-file", dest="split", action="store_false",
+        help="grava o relatório inteiro em um único arquivo (sem separar IPs, erros e eventos)"
+    )
+    parser.add_argument(
+        "--metrics", default=METRICS_FILE, metavar="ARQUIVO",
+        help=f"arquivo .prom com as métricas de desempenho da análise (padrão: {METRICS_FILE})"
+    )
+    parser.add_argument(
+        "--no-metrics", dest="metrics", action="store_const", const=None,
+        help="não grava as métricas de desempenho"
+    )
+    parser.add_argument(
+        "--export-summary", nargs="?", const="", default=None, metavar="ARQUIVO",
+        help="grava também o resumo parcial mergeável deste servidor (padrão: "
+             "/home/ubuntu/resumo_<servidor>_<data>.json.gz), para o comando merge"
+    )
+    parser.add_argument(
+        "--follow", action="store_true",
+        help="acompanha os logs ao vivo (sobrevive à rotação), com janelas deslizantes de 1m/5m/1h"
+    )
+    parser.add_argument(
+        "--refresh", type=float, default=FOLLOW_REFRESH, metavar="SEGUNDOS",
+        help=f"intervalo entre os resumos de --follow (padrão: {FOLLOW_REFRESH}s)"
+    )
+    parser.add_argument(
+        "--json", action="store_true",
+        help="com --follow, emite cada resumo como uma linha JSON"
+    )
+    subcommands = parser.add_subparsers(dest="command", metavar="COMANDO")
+    merge = subcommands.add_parser(
+        "merge", help="combina resumos parciais de vários servidores em um relatório, sem ler os logs",
+        description="Combina resumos gravados com --export-summary. As opções --compact, --gzip e "
+                    "--single-file vêm antes de 'merge'."
+    )
+    merge.add_argument("summaries", nargs="+", metavar="RESUMO", help="arquivos de resumo (.json ou .json.gz)")
+    merge.add_argument(
+        "--output", default=None, metavar="ARQUIVO",
+        help="arquivo do relatório combinado (padrão: /home/ubuntu/relatorio_logs_<data>.json)"
+    )
+    merge.add_argument(
+        "--export-summary", dest="merged_summary", default=None, metavar="ARQUIVO",
+        help="grava também o resumo combinado, que pode ser combinado de novo"
+    )
+    args = parser.parse_args(argv)
+    if args.command == "merge":
+        return args
+    if args.follow and (args.checkpoint or args.since is not None or args.until is not None
+                        or args.export_summary is not None):
+        parser.error("--follow não pode ser combinado com --checkpoint/--since/--until/--export-summary")
+    if args.refresh <= 0:
+        parser.error("--refresh deve ser > 0")
+    if args.checkpoint and (args.since is not None or args.until is not None):
+        parser.error("--checkpoint não pode ser combinado com --since/--until")
+    if args.workers < 0:
+        parser.error("--workers deve ser >= 0")
+    if args.trend is not None and (args.trend <= 0 or not args.store):
+        parser.error("--trend exige DIAS > 0 e o armazenamento de séries (--store)")
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    if args.export_summary == "":
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        args.export_summary = f"/home/ubuntu/resumo_{socket.gethostname()}_{timestamp}.json.gz"
+    return args
+
+def main():
+    """Função principal."""
+    args = parse_args()
+    if args.command == "merge":
+        print("📋 Analisador de Logs - Projeto Linux")
+        print(f"🔗 Combinando {len(args.summaries)} resumo(s)...")
+        summary = merge_summary_files(args.summaries)
+        if summary is None:
+            raise SystemExit(1)
+        report = report_from_summary(summary)
+        print_summary_report(report)
+        save_report_json(report, args.output, compact=args.compact, compress=args.gzip, split=args.split)
+        if args.merged_summary:
+            save_node_summary(summary, args.merged_summary)
+        print("\n✅ Combinação concluída!")
+        return
+    if args.follow:
+        follow_logs(
+            NGINX_ACCESS_LOG, args.monitoring_log, log_format=args.log_format,
+            refresh=args.refresh, as_json=args.json
+        )
+        return
+    
+    print("📋 Analisador de Logs - Projeto Linux")
+    
+    # Gera o relatório
+    report = generate_report(
+        checkpoint_file=args.checkpoint, workers=args.workers, log_format=args.log_format,
+        bounded=args.bounded, include_rotated=args.rotated, since=args.since, until=args.until,
+        store_file=args.store, trend_days=args.trend, monitoring_log=args.monitoring_log,
+        error_log=args.error_log, summary_file=args.export_summary
+    )
+    
+    # Exibe o resumo
+    print_summary_report(report)
+    
+    # Salva o relatório completo
+    save_report_json(report, compact=args.compact, compress=args.gzip, split=args.split)
+    if args.metrics:
+        save_metrics(report, args.metrics)
+    
+    print("\n✅ Análise concluída!")
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,800 @@
+#!/usr/bin/env python3
+"""
+Estruturas probabilísticas de memória limitada para a análise de logs.
+Todas podem ser combinadas (merge) e serializadas em JSON, o que permite
+usá-las em checkpoints e no processamento paralelo.
+"""
+
+import copy
+import math
+import zlib
+import array
+import base64
+import hashlib
+import heapq
+from collections import Counter
+
+
+def _hash64(item):
+    """Hash estável de 64 bits (independente de PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(item.encode("utf-8", "replace"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Contagem aproximada de elementos distintos (HyperLogLog).
+
+    Usa 2^precision registradores de 1 byte; o erro padrão relativo é
+    1.04 / sqrt(2^precision) (0,81% com a precisão padrão, em 16 KB).
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision deve estar entre 4 e 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item):
+        """Adiciona um elemento (str)."""
+        h = _hash64(item)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, items):
+        """Adiciona vários elementos."""
+        for item in items:
+            self.add(item)
+
+    def merge(self, other):
+        """Combina outro HyperLogLog de mesma precisão (união dos conjuntos)."""
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLogs com precisões diferentes")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    @property
+    def relative_error(self):
+        """Erro padrão relativo da estimativa."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def estimate(self):
+        """Estimativa do número de elementos distintos."""
+        m = len(self.registers)
+        histogram = Counter(self.registers)
+        harmonic = sum(count * 2.0 ** -rank for rank, count in histogram.items())
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / harmonic
+        zeros = histogram.get(0, 0)
+        if estimate <= 2.5 * m and zeros:
+            # Correção para cardinalidades pequenas (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_state(self):
+        """Estrutura serializável em JSON."""
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(zlib.compress(bytes(self.registers))).decode("ascii")
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstrói a partir de to_state."""
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray(zlib.decompress(base64.b64decode(state["registers"])))
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Itens mais frequentes (heavy hitters) com no máximo `capacity` contadores.
+
+    Cada item monitorado guarda (contagem, erro): a contagem nunca é menor que
+    a real e contagem - erro nunca é maior que a real. Itens não monitorados
+    ocorreram no máximo `floor` vezes. O erro é limitado por total / capacity.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.items = {}  # item -> [contagem, erro]
+        self.floor = 0
+        self.total = 0
+
+    def update(self, counts):
+        """Soma contagens exatas (dict/Counter item -> ocorrências)."""
+        self._combine(((item, count, 0) for item, count in counts.items()),
+                      sum(counts.values()), 0, counts)
+
+    def merge(self, other):
+        """Combina outro SpaceSaving."""
+        self._combine(((item, c, e) for item, (c, e) in other.items.items()),
+                      other.total, other.floor, other.items)
+        return self
+
+    def _combine(self, entries, total, other_floor, other_items):
+        combined = {}
+        for item, (count, error) in self.items.items():
+            if item not in other_items:
+                # O item pode ter ocorrido até other_floor vezes no outro resumo
+                combined[item] = [count + other_floor, error + other_floor]
+            else:
+                combined[item] = [count, error]
+        for item, count, error in entries:
+            current = combined.get(item)
+            if current is None:
+                combined[item] = [count + self.floor, error + self.floor]
+            else:
+                current[0] += count
+                current[1] += error
+
+        floor = self.floor + other_floor
+        if len(combined) > self.capacity:
+            ranked = heapq.nlargest(self.capacity + 1, combined.items(), key=lambda kv: kv[1][0])
+            floor = max(floor, ranked[-1][1][0])
+            combined = dict(ranked[:-1])
+        self.items = combined
+        self.floor = floor
+        self.total += total
+
+    def most_common(self, n=None):
+        """Lista de (item, contagem estimada) em ordem decrescente."""
+        ranked = sorted(self.items.items(), key=lambda kv: kv[1][0], reverse=True)
+        return [(item, count) for item, (count, error) in ranked[:n]]
+
+    def error_bounds(self, n=None):
+        """Dict item -> [mínimo garantido, máximo] para os n mais frequentes."""
+        ranked = sorted(self.items.items(), key=lambda kv: kv[1][0], reverse=True)
+        return {item: [count - error, count] for item, (count, error) in ranked[:n]}
+
+    def to_state(self):
+        """Estrutura serializável em JSON."""
+        return {
+            "capacity": self.capacity,
+            "floor": self.floor,
+            "total": self.total,
+            "items": [[item, count, error] for item, (count, error) in self.items.items()]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstrói a partir de to_state."""
+        sketch = cls(state["capacity"])
+        sketch.floor = state["floor"]
+        sketch.total = state["total"]
+        sketch.items = {item: [count, error] for item, count, error in state["items"]}
+        return sketch
+
+
+class LatencyHistogram:
+    """
+    Histograma log-linear de latências (no estilo HdrHistogram).
+
+    Os valores são convertidos para inteiros em `unit` segundos (microssegundos
+    por padrão). Até 2^precision unidades cada valor tem seu próprio contador;
+    acima disso, cada potência de 2 é dividida em 2^(precision-1) faixas, o que
+    limita o erro relativo dos quantis a 2^-precision (0,4% com o padrão).
+    Os contadores ficam em uma lista indexada pela faixa, que cresce sob demanda.
+    """
+
+    def __init__(self, precision=8, unit=1e-6):
+        if not 2 <= precision <= 16:
+            raise ValueError("precision deve estar entre 2 e 16")
+        self.precision = precision
+        self.unit = unit
+        self.counts = []
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        """Faixa de um valor inteiro (em unidades)."""
+        shift = value.bit_length() - self.precision
+        if shift <= 0:
+            return value
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _bounds(self, index):
+        """Intervalo [início, fim) de uma faixa, em unidades."""
+        half = 1 << (self.precision - 1)
+        if index < 2 * half:
+            return index, index + 1
+        shift = index // half - 1
+        mantissa = index - shift * half
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def add(self, value, count=1):
+        """Registra uma latência (em segundos)."""
+        index = self._index(max(0, int(round(value / self.unit))))
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        """Registra uma sequência de latências (em segundos), sem o custo de add por valor."""
+        if not values:
+            return
+        unit = self.unit
+        precision = self.precision
+        half_shift = precision - 1
+        counts = self.counts
+        size = len(counts)
+        for value in values:
+            scaled = int(round(value / unit))
+            if scaled < 0:
+                scaled = 0
+            shift = scaled.bit_length() - precision
+            index = scaled if shift <= 0 else (shift << half_shift) + (scaled >> shift)
+            if index >= size:
+                counts.extend([0] * (index + 1 - size))
+                size = index + 1
+            counts[index] += 1
+        low, high = min(values), max(values)
+        self.count += len(values)
+        self.total += sum(values)
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    def merge(self, other):
+        """Combina outro histograma com a mesma precisão e unidade."""
+        if (other.precision, other.unit) != (self.precision, self.unit):
+            raise ValueError("histogramas com precisões ou unidades diferentes")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def mean(self):
+        """Média exata (ou None sem valores)."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """Valor do quantil q (0 a 1), ou None sem valores."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = self._bounds(index)
+                value = (low + (high - 1)) / 2 * self.unit
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def bucket_counts(self, bounds):
+        """
+        Quantidade de valores em cada faixa de um histograma de limites fixos.
+
+        Args:
+            bounds: Limites superiores crescentes, em segundos (o último pode ser inf)
+
+        Returns:
+            Lista com a contagem de valores <= cada limite e > o limite anterior
+        """
+        result = [0] * len(bounds)
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            low, high = self._bounds(index)
+            value = (low + (high - 1)) / 2 * self.unit
+            while position < len(bounds) - 1 and value > bounds[position]:
+                position += 1
+            result[position] += count
+        return result
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99, 0.999)):
+        """Dict com contagem, mínimo, máximo, média e quantis ("p50", "p99.9", ...)."""
+        summary = {"count": self.count, "min": self.min, "max": self.max, "mean": self.mean()}
+        for q in quantiles:
+            summary[f"p{q * 100:g}"] = self.quantile(q)
+        return summary
+
+    def to_state(self):
+        """Estrutura serializável em JSON (apenas as faixas não vazias)."""
+        return {
+            "precision": self.precision,
+            "unit": self.unit,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": [[index, count] for index, count in enumerate(self.counts) if count]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstrói a partir de to_state."""
+        histogram = cls(state["precision"], state["unit"])
+        for index, count in state["buckets"]:
+            if index >= len(histogram.counts):
+                histogram.counts.extend([0] * (index + 1 - len(histogram.counts)))
+            histogram.counts[index] = count
+        histogram.count = state["count"]
+        histogram.total = state["total"]
+        histogram.min = state["min"]
+        histogram.max = state["max"]
+        return histogram
+
+
+class SlidingWindow:
+    """
+    Agregados dos últimos `span` segundos, divididos em `slots` sub-janelas.
+
+    Cada sub-janela guarda contadores (Counter), um SpaceSaving com os itens
+    mais frequentes e um LatencyHistogram; sub-janelas vencidas são reusadas,
+    de modo que a memória é fixa, independente da taxa de eventos. A borda
+    mais antiga da janela tem resolução de span / slots segundos.
+    """
+
+    def __init__(self, span, slots=60, capacity=100):
+        self.span = span
+        self.width = span / slots
+        self.capacity = capacity
+        self._slots = [None] * slots  # [número da sub-janela, Counter, SpaceSaving, LatencyHistogram]
+
+    def add(self, now, counters=None, items=None, latencies=None):
+        """
+        Registra eventos de um instante.
+
+        Args:
+            now: Instante dos eventos (epoch)
+            counters: Dict nome -> quantidade a somar
+            items: Dict item -> ocorrências (ex.: páginas acessadas)
+            latencies: Sequência de latências em segundos
+        """
+        number = int(now // self.width)
+        index = number % len(self._slots)
+        slot = self._slots[index]
+        if slot is None or slot[0] != number:
+            slot = self._slots[index] = [number, Counter(), SpaceSaving(self.capacity), LatencyHistogram()]
+        if counters:
+            slot[1].update(counters)
+        if items:
+            slot[2].update(items)
+        if latencies:
+            slot[3].add_many(latencies)
+
+    def snapshot(self, now):
+        """
+        Combina as sub-janelas dentro do período.
+
+        Returns:
+            Tupla (Counter, SpaceSaving, LatencyHistogram) dos últimos `span` segundos
+        """
+        current = int(now // self.width)
+        counters = Counter()
+        top = SpaceSaving(self.capacity)
+        latency = LatencyHistogram()
+        for slot in self._slots:
+            if slot is not None and 0 <= current - slot[0] < len(self._slots):
+                counters.update(slot[1])
+                top.merge(slot[2])
+                latency.merge(slot[3])
+        return counters, top, latency
+
+
+class CountMinSketch:
+    """
+    Frequência aproximada de itens em `depth` linhas de `width` contadores.
+
+    A estimativa nunca é menor que a soma real e, com probabilidade
+    1 - e^-depth, excede-a em no máximo e / width do total somado. Os
+    contadores são float, o que permite somar pesos (ex.: contagens com
+    decaimento exponencial). As posições vêm de hashing duplo com CRC-32 e
+    Adler-32, estáveis entre processos e bem mais baratos que o _hash64.
+    """
+
+    def __init__(self, width=4096, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = [0.0] * (width * depth)
+
+    def _indexes(self, item):
+        data = item.encode("utf-8", "replace")
+        h1, h2 = zlib.crc32(data), zlib.adler32(data) | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        """Soma `count` ao item."""
+        table = self.table
+        for i in self._indexes(item):
+            table[i] += count
+
+    def add_many(self, counts, weight=1.0):
+        """Soma as contagens de um dict item -> contagem, multiplicadas por weight."""
+        table = self.table
+        width = self.width
+        offsets = [row * width for row in range(self.depth)]
+        crc32, adler32 = zlib.crc32, zlib.adler32
+        for item, count in counts.items():
+            data = item.encode("utf-8", "replace")
+            h1, h2 = crc32(data), adler32(data) | 1
+            value = count * weight
+            for offset in offsets:
+                table[offset + h1 % width] += value
+                h1 += h2
+
+    def estimate(self, item):
+        """Estimativa (limite superior) da soma do item."""
+        table = self.table
+        return min([table[i] for i in self._indexes(item)])
+
+    def scale(self, factor):
+        """Multiplica todos os contadores por factor."""
+        self.table = [value * factor for value in self.table]
+
+    def merge(self, other, factor=1.0):
+        """Soma os contadores de outro sketch de mesmas dimensões (multiplicados por factor)."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("sketches com dimensões diferentes")
+        self.table = [a + b * factor for a, b in zip(self.table, other.table)]
+        return self
+
+    def to_state(self):
+        """Estrutura serializável em JSON."""
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "table": base64.b64encode(zlib.compress(array.array("d", self.table).tobytes())).decode("ascii")
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstrói a partir de to_state."""
+        sketch = cls(state["width"], state["depth"])
+        sketch.table = array.array("d", zlib.decompress(base64.b64decode(state["table"]))).tolist()
+        return sketch
+
+
+class RateAnomalyDetector:
+    """
+    Chaves (IPs, páginas, ...) com taxa por minuto acima de um limite fixo ou
+    muito acima da própria linha de base.
+
+    Os minutos recentes ("abertos") guardam a lista de chaves vistas, contada
+    de forma exata ao fechar o minuto. Quando um minuto fica `slack` minutos
+    para trás, cada chave é avaliada e suas contagens vão para um bloco exato de `block` minutos, que então é somado
+    a um CountMinSketch por dimensão com decaimento exponencial de `horizon`
+    minutos: o sketch dá a linha de base (média móvel de requisições por
+    minuto) de qualquer chave em memória fixa, e o bloco reduz as
+    atualizações do sketch às chaves distintas de cada bloco. O decaimento é
+    aplicado sem percorrer o sketch: cada bloco entra com peso growth^minuto
+    e as estimativas são divididas pelo peso do minuto consultado.
+
+    Uma chave é marcada quando, em um minuto:
+        - tem `threshold` requisições ou mais ("threshold"); ou
+        - tem pelo menos `min_rate` requisições e `factor` vezes a linha de
+          base, havendo ao menos `warmup` minutos de histórico ("baseline").
+
+    Detectores de trechos consecutivos do log podem ser combinados (merge):
+    o primeiro minuto de cada detector fica aberto até a combinação, para não
+    ser avaliado pela metade, e as avaliações por linha de base das primeiras
+    3 x horizon minutos de histórico ficam pendentes até receberem o
+    histórico anterior (ou até report()). Detectores de logs diferentes do
+    mesmo período (ex.: um por servidor) são combinados por combine(), depois
+    de reduzidos às chaves marcadas por flagged().
+    """
+
+    def __init__(self, dimensions, threshold=300, factor=10.0, min_rate=60, horizon=60, warmup=10,
+                 slack=1, block=5, capacity=1000, width=4096, depth=4):
+        self.dimensions = tuple(dimensions)
+        self.threshold = threshold
+        self.factor = factor
+        self.min_rate = min_rate
+        self.horizon = horizon
+        self.warmup = warmup
+        self.slack = slack
+        self.block_minutes = block
+        self.capacity = capacity
+        self.growth = horizon / (horizon - 1)  # 1 / fator de decaimento por minuto
+        self.sketches = [CountMinSketch(width, depth) for _ in self.dimensions]
+        self.origin = None  # minuto (epoch / 60) com peso 1 nos sketches
+        self.first = None  # primeiro minuto do histórico
+        self.head = None  # primeiro minuto visto, mantido aberto até merge()/report()
+        self.newest = None
+        self.open = {}  # minuto -> [lista das chaves de cada requisição, por dimensão]
+        self.block = [Counter() for _ in self.dimensions]  # contagens ainda fora dos sketches
+        self.block_start = None
+        self.pending = []  # [dimensão, chave, minuto, requisições, soma anterior com decaimento]
+        self.offenders = [{} for _ in self.dimensions]  # chave -> [pico, minuto do pico, base, motivo, minutos, requisições]
+
+    def _params(self):
+        return (self.dimensions, self.threshold, self.factor, self.min_rate, self.horizon, self.warmup,
+                self.slack, self.block_minutes, self.capacity, self.sketches[0].width, self.sketches[0].depth)
+
+    def open_minute(self, minute):
+        """
+        Listas de chaves de um minuto, fechando os minutos que ficaram para trás.
+
+        Args:
+            minute: Epoch do início do minuto
+
+        Returns:
+            Lista com uma lista por dimensão, à qual se acrescenta a chave de
+            cada requisição
+        """
+        counts = self.open.get(minute)
+        if counts is None:
+            counts = self.open[minute] = [[] for _ in self.dimensions]
+            if self.head is None:
+                self.head = minute
+            if self.newest is None or minute > self.newest:
+                self.newest = minute
+                limit = minute - self.slack * 60
+                for old in sorted(m for m in self.open if m < limit and m != self.head):
+                    self._close(old, self.open.pop(old))
+        return counts
+
+    def _weight(self, minute):
+        """Peso de um minuto nos sketches, renormalizando-os antes de um estouro do float."""
+        index = minute // 60
+        if self.origin is None:
+            self.origin = index
+        elif (index - self.origin) * math.log(self.growth) > 500:
+            for sketch in self.sketches:
+                sketch.scale(self.growth ** (self.origin - index))
+            self.origin = index
+        return self.growth ** (index - self.origin)
+
+    def _past(self, dimension, key, minute):
+        """Soma com decaimento, no minuto, das requisições anteriores da chave neste detector."""
+        past = self.block[dimension].get(key, 0)
+        if self.origin is not None:
+            past += self.sketches[dimension].estimate(key) / self.growth ** (minute // 60 - self.origin)
+        return past
+
+    def _flush_block(self):
+        """Soma o bloco exato aos sketches, com o peso do minuto central do bloco."""
+        if self.block_start is None:
+            return
+        weight = self._weight(self.block_start + (self.block_minutes - 1) // 2 * 60)
+        for sketch, keys in zip(self.sketches, self.block):
+            sketch.add_many(keys, weight)
+        self.block = [Counter() for _ in self.dimensions]
+        self.block_start = None
+
+    def _close(self, minute, keys):
+        """Avalia as chaves de um minuto e soma suas contagens ao bloco."""
+        if self.first is None or minute < self.first:
+            self.first = minute
+        if self.block_start is not None and minute - self.block_start >= self.block_minutes * 60:
+            self._flush_block()
+        if self.block_start is None:
+            self.block_start = minute
+        min_rate = self.min_rate
+        for dimension, minute_keys in enumerate(keys):
+            counts = Counter(minute_keys)
+            for key, count in [(key, count) for key, count in counts.items() if count >= min_rate]:
+                self._judge(dimension, key, minute, count, self._past(dimension, key, minute), final=False)
+            self.block[dimension].update(minute_keys)
+
+    def _close_all(self, keep_head=True):
+        """Fecha os minutos abertos (exceto o inicial, com keep_head)."""
+        for minute in sorted(self.open):
+            if not keep_head or minute != self.head:
+                self._close(minute, self.open.pop(minute))
+        if not keep_head:
+            self.head = None
+
+    def _baseline(self, minute, past):
+        """Média móvel de requisições por minuto a partir da soma com decaimento anterior ao minuto."""
+        history = (minute - self.first) // 60
+        if history <= 0:
+            return 0.0
+        decay = 1 / self.growth
+        return past * (1 - decay) / decay / (1 - decay ** history)
+
+    def _judge(self, dimension, key, minute, count, past, final=True):
+        """Marca a chave no minuto, se anômala (ou deixa a avaliação pendente)."""
+        if count >= self.threshold:
+            reason = "threshold"
+        else:
+            history = (minute - self.first) // 60
+            if not final and history < 3 * self.horizon:
+                self.pending.append([dimension, key, minute, count, past])
+                return
+            if history < self.warmup or count < self.factor * max(self._baseline(minute, past), 1.0):
+                return
+            reason = "baseline"
+        baseline = self._baseline(minute, past)
+        offenders = self.offenders[dimension]
+        offender = offenders.get(key)
+        if offender is None:
+            offenders[key] = [count, minute, baseline, reason, 1, count]
+            if len(offenders) > 2 * self.capacity:
+                self._trim(dimension)
+            return
+        if count > offender[0]:
+            offender[:4] = [count, minute, baseline, reason]
+        offender[4] += 1
+        offender[5] += count
+
+    def _trim(self, dimension):
+        """Mantém apenas as `capacity` chaves com maior pico."""
+        ranked = heapq.nlargest(self.capacity, self.offenders[dimension].items(), key=lambda kv: kv[1][0])
+        self.offenders[dimension] = dict(ranked)
+
+    def merge(self, other):
+        """
+        Combina o detector de um trecho posterior do log.
+
+        O minuto inicial de other é somado aos minutos abertos deste detector
+        (o mesmo minuto pode ter sido dividido entre os trechos), as
+        avaliações pendentes de other recebem o histórico deste detector e os
+        sketches e as chaves marcadas são combinados.
+        """
+        if other._params() != self._params():
+            raise ValueError("detectores com parâmetros diferentes")
+        if self.newest is None and self.origin is None and not any(self.offenders):
+            # Detector vazio (ex.: acumulador recém-criado): assume o estado de other
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return self
+        if other.head is not None:
+            keys = self.open.setdefault(other.head, [[] for _ in self.dimensions])
+            for target, source in zip(keys, other.open.get(other.head, ())):
+                target.extend(source)
+        self._close_all()
+        if other.first is not None:
+            self.first = other.first if self.first is None else min(self.first, other.first)
+
+        for dimension, key, minute, count, past in other.pending:
+            self._judge(dimension, key, minute, count, past + self._past(dimension, key, minute), final=False)
+
+        self._flush_block()
+        if other.origin is not None:
+            if self.origin is None:
+                self.origin = other.origin
+            origin = max(self.origin, other.origin)
+            for sketch, other_sketch in zip(self.sketches, other.sketches):
+                sketch.scale(self.growth ** (self.origin - origin))
+                sketch.merge(other_sketch, self.growth ** (other.origin - origin))
+            self.origin = origin
+        self.block = [Counter(keys) for keys in other.block]
+        self.block_start = other.block_start
+
+        for dimension, offenders in enumerate(other.offenders):
+            mine = self.offenders[dimension]
+            for key, (peak, minute, baseline, reason, minutes, requests) in offenders.items():
+                offender = mine.get(key)
+                if offender is None:
+                    mine[key] = [peak, minute, baseline, reason, minutes, requests]
+                    continue
+                if peak > offender[0]:
+                    offender[:4] = [peak, minute, baseline, reason]
+                offender[4] += minutes
+                offender[5] += requests
+            if len(mine) > 2 * self.capacity:
+                self._trim(dimension)
+
+        for minute, keys in other.open.items():
+            if minute != other.head:
+                self.open[minute] = [list(dimension_keys) for dimension_keys in keys]
+        self.newest = max(m for m in (self.newest, other.newest) if m is not None)
+        return self
+
+    def _finish(self):
+        """Fecha todos os minutos abertos e avalia as pendências."""
+        self._close_all(keep_head=False)
+        pending, self.pending = self.pending, []
+        for dimension, key, minute, count, past in pending:
+            self._judge(dimension, key, minute, count, past)
+
+    def flagged(self):
+        """
+        Cópia apenas com as chaves marcadas, para resumos compactos.
+
+        Fecha os minutos abertos e avalia as pendências antes; a cópia não
+        leva o histórico (sketches zerados, sem minutos abertos) e só pode
+        ser combinada por combine().
+        """
+        self._finish()
+        copy_ = RateAnomalyDetector(self.dimensions, *self._params()[1:])
+        copy_.first, copy_.newest = self.first, self.newest
+        copy_.offenders = [{key: list(values) for key, values in offenders.items()} for offenders in self.offenders]
+        return copy_
+
+    def combine(self, other):
+        """
+        Combina as chaves marcadas de um detector de outro log do mesmo
+        período (ex.: outro servidor), ambos já avaliados (flagged()).
+
+        As contagens por minuto dos dois logs não são somadas: uma chave fica
+        marcada se passou dos limites em algum deles, com o maior pico e a
+        soma dos minutos e requisições marcados.
+        """
+        if other._params() != self._params():
+            raise ValueError("detectores com parâmetros diferentes")
+        for dimension, offenders in enumerate(other.offenders):
+            mine = self.offenders[dimension]
+            for key, (peak, minute, baseline, reason, minutes, requests) in offenders.items():
+                offender = mine.get(key)
+                if offender is None:
+                    mine[key] = [peak, minute, baseline, reason, minutes, requests]
+                    continue
+                if peak > offender[0]:
+                    offender[:4] = [peak, minute, baseline, reason]
+                offender[4] += minutes
+                offender[5] += requests
+            if len(mine) > self.capacity:
+                self._trim(dimension)
+        for name in ("first", "newest"):
+            values = [v for v in (getattr(self, name), getattr(other, name)) if v is not None]
+            if values:
+                setattr(self, name, min(values) if name == "first" else max(values))
+        return self
+
+    def report(self, n=None):
+        """
+        Fecha os minutos abertos, avalia as pendências e lista as chaves marcadas.
+
+        Returns:
+            Dict dimensão -> lista de dicts (key, peak, peak_minute, baseline,
+            reason, minutes, requests) em ordem decrescente de pico
+        """
+        self._finish()
+        result = {}
+        for name, offenders in zip(self.dimensions, self.offenders):
+            ranked = heapq.nlargest(n or len(offenders), offenders.items(), key=lambda kv: (kv[1][0], kv[1][5]))
+            result[name] = [
+                {"key": key, "peak": peak, "peak_minute": minute, "baseline": round(baseline, 2),
+                 "reason": reason, "minutes": minutes, "requests": requests}
+                for key, (peak, minute, baseline, reason, minutes, requests) in ranked
+            ]
+        return result
+
+    def to_state(self):
+        """Estrutura serializável em JSON."""
+        return {
+            "dimensions": list(self.dimensions),
+            "params": list(self._params()[1:]),
+            "origin": self.origin,
+            "first": self.first,
+            "head": self.head,
+            "newest": self.newest,
+            "sketches": [sketch.to_state() for sketch in self.sketches],
+            "open": [[minute, [Counter(dimension_keys) for dimension_keys in keys]]
+                     for minute, keys in self.open.items()],
+            "block": self.block,
+            "block_start": self.block_start,
+            "pending": self.pending,
+            "offenders": [[[key] + values for key, values in offenders.items()] for offenders in self.offenders]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstrói a partir de to_state."""
+        detector = cls(state["dimensions"], *state["params"])
+        detector.origin = state["origin"]
+        detector.first = state["first"]
+        detector.head = state["head"]
+        detector.newest = state["newest"]
+        detector.sketches = [CountMinSketch.from_state(sketch) for sketch in state["sketches"]]
+        detector.open = {
+            minute: [list(Counter(counts).elements()) for counts in keys] for minute, keys in state["open"]
+        }
+        detector.block = [Counter(counts) for counts in state["block"]]
+        detector.block_start = state["block_start"]
+        detector.pending = state["pending"]
+        detector.offenders = [{entry[0]: entry[1:] for entry in offenders} for offenders in state["offenders"]]
+        return detector
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Métricas do projeto no formato de exposição de texto do Prometheus.
+As métricas ficam em memória e o texto de exposição é gerado apenas quando
+algo mudou (e no máximo uma vez por CACHE_TTL), de modo que uma coleta
+frequente apenas devolve bytes já prontos. Arquivos .prom gravados por
+outros processos (ex.: log_analyzer.py) são anexados à exposição.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+
+METRICS_ADDRESS = "127.0.0.1"
+METRICS_PORT = 9464
+CACHE_TTL = 1.0  # segundos em que o texto gerado é reutilizado sem nenhuma verificação
+MAX_REQUEST_BYTES = 8 * 1024
+REQUEST_TIMEOUT = 10  # segundos aguardando uma requisição em uma conexão aberta
+
+# Limites (s) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+def _format_value(value):
+    """Número no formato da exposição."""
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    """Valor de rótulo com as barras, aspas e quebras de linha escapadas."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    """Texto {nome="valor",...} dos rótulos (vazio se não houver)."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    """
+    Uma família de métricas (counter, gauge ou histogram) com rótulos fixos.
+
+    Os valores são guardados por tupla de valores dos rótulos; cada alteração
+    incrementa a versão do registro, que invalida o texto em cache.
+    """
+
+    def __init__(self, registry, name, kind, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (float("inf"),) if kind == "histogram" else ()
+        self._values = {}
+
+    def _key(self, labels):
+        try:
+            return tuple(str(labels[name]) for name in self.labels)
+        except KeyError as e:
+            raise ValueError(f"rótulo ausente em {self.name}: {e}")
+
+    def inc(self, amount=1, **labels):
+        """Soma `amount` a um counter ou gauge."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+        self.registry.version += 1
+
+    def set(self, value, **labels):
+        """Define o valor de um gauge."""
+        self._values[self._key(labels)] = value
+        self.registry.version += 1
+
+    def observe(self, value, **labels):
+        """Registra uma observação em um histogram."""
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]  # contagens, soma, total
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+        self.registry.version += 1
+
+    def render(self):
+        """Linhas da família no formato de exposição."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key in sorted(self._values):
+            value = self._values[key]
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_labels(self.labels, key)} {_format_value(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas com o texto de exposição em cache.
+
+    Um registro é usado por um único loop/thread; as métricas são criadas
+    por counter(), gauge() e histogram() e atualizadas diretamente.
+    """
+
+    def __init__(self, cache_ttl=CACHE_TTL):
+        self.cache_ttl = cache_ttl
+        self.version = 0
+        self._metrics = {}
+        self._textfiles = []
+        self._cache = None  # (versão, mtimes dos arquivos, bytes)
+        self._checked_at = 0
+
+    def _register(self, name, kind, help_text, labels, buckets=LATENCY_BUCKETS):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Metric(self, name, kind, help_text, labels, buckets)
+        elif metric.kind != kind or metric.labels != tuple(labels):
+            raise ValueError(f"métrica {name} já registrada com outro tipo ou rótulos")
+        return metric
+
+    def __getitem__(self, name):
+        """Métrica já registrada com esse nome."""
+        return self._metrics[name]
+
+    def counter(self, name, help_text, labels=()):
+        """Registra (ou devolve) um counter; o nome deve terminar em _total."""
+        if not name.endswith("_total"):
+            raise ValueError(f"counter {name} deve terminar em _total")
+        return self._register(name, "counter", help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        """Registra (ou devolve) um gauge."""
+        return self._register(name, "gauge", help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        """Registra (ou devolve) um histogram com os limites `buckets` (sem +Inf)."""
+        return self._register(name, "histogram", help_text, labels, buckets)
+
+    def add_textfile(self, path):
+        """Anexa à exposição o conteúdo de um arquivo .prom (se existir)."""
+        self._textfiles.append(path)
+
+    def _textfile_mtimes(self):
+        mtimes = []
+        for path in self._textfiles:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def render(self, use_ttl=True):
+        """
+        Texto de exposição de todas as métricas.
+
+        Args:
+            use_ttl: Reaproveita o texto gerado há menos de cache_ttl sem
+                     verificar se algo mudou
+
+        Returns:
+            Bytes em UTF-8, reaproveitados enquanto nada mudar
+        """
+        now = time.monotonic()
+        cached = self._cache
+        if use_ttl and cached is not None and now - self._checked_at < self.cache_ttl:
+            return cached[2]
+        self._checked_at = now
+        mtimes = self._textfile_mtimes()
+        if cached is not None and cached[0] == self.version and cached[1] == mtimes:
+            return cached[2]
+
+        version = self.version
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for path, mtime in zip(self._textfiles, mtimes):
+            if mtime is None:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines.extend(line.rstrip("\n") for line in f if line.strip())
+            except OSError as e:
+                logger.warning(f"Erro ao ler métricas de {path}: {e}")
+        text = ("\n".join(lines) + "\n").encode("utf-8")
+        self._cache = (version, mtimes, text)
+        return text
+
+    def write_textfile(self, path):
+        """
+        Grava a exposição em um arquivo .prom de forma atômica (arquivo
+        temporário + rename), para ser anexada por outro processo.
+
+        Raises:
+            OSError: Falha ao gravar o arquivo
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.render(use_ttl=False))
+        os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """
+    Listener HTTP mínimo que serve /metrics no loop asyncio atual.
+
+    As respostas vêm de registry.render(); conexões keep-alive são mantidas
+    entre coletas.
+    """
+
+    def __init__(self, registry, host=METRICS_ADDRESS, port=METRICS_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """
+        Começa a aceitar conexões.
+
+        Raises:
+            OSError: Endereço em uso ou sem permissão
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Métricas disponíveis em http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        """Para de aceitar conexões."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        """Atende as requisições de uma conexão até o cliente fechá-la."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+                if len(head) > MAX_REQUEST_BYTES:
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                parts = request_line.split()
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = len(parts) == 3 and parts[2] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                if len(parts) != 3 or parts[0] not in ("GET", "HEAD"):
+                    status, content_type, body = "405 Method Not Allowed", "text/plain; charset=utf-8", b""
+                elif parts[1].split("?", 1)[0] != "/metrics":
+                    status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"use /metrics\n"
+                else:
+                    status, content_type, body = "200 OK", CONTENT_TYPE, self.registry.render()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + (body if parts[:1] != ["HEAD"] else b"")
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,243 +1,1025 @@
-#!/usr/bin/env python3
-"""
-Script de Monitoramento de Site
-Verifica a disponibilidade do site a cada execução e envia alertas se necessário.
-"""
-
-import requests
-import datetime
-import json
-import os
-import sys
-import logging
-from typing import Dict, Any
-
-# Configurações
-SITE_URL = "http://localhost"
-LOG_FILE = "/var/log/monitoramento.log"
-STATUS_FILE = "/tmp/site_status.json"
-TIMEOUT = 10  # segundos
-
-# Configuração de webhook (Discord)
-# Para Discord: Use um webhook URL do Discord
-WEBHOOK_CONFIG = {
-    "type": "discord",  # "discord"
-    "url": "https://discord.com/api/webhooks/XXXXXXXXXXXXXXXXXXXXX",  # Cole aqui o webhook URL do Discord
-}
-
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-logger = logging.getLogger(__name__)
-
-def check_site_status() -> Dict[str, Any]:
-    """
-    Verifica o status do site e retorna informações sobre a verificação.
-    
-    Returns:
-        Dict contendo status, código de resposta, tempo de resposta e timestamp
-    """
-    try:
-        start_time = datetime.datetime.now()
-        response = requests.get(SITE_URL, timeout=TIMEOUT)
-        end_time = datetime.datetime.now()
-        
-        response_time = (end_time - start_time).total_seconds()
-        
-        status_info = {
-            "timestamp": start_time.isoformat(),
-            "url": SITE_URL,
-            "status_code": response.status_code,
-            "response_time": response_time,
-            "is_up": response.status_code == 200,
-            "error": None
-        }
-        
-        if response.status_code == 200:
-            logger.info(f"Site OK - Status: {response.status_code}, Tempo: {response_time:.2f}s")
-        else:
-            logger.warning(f"Site com problema - Status: {response.status_code}, Tempo: {response_time:.2f}s")
-            
-        return status_info
-        
-    except requests.exceptions.RequestException as e:
-        error_msg = str(e)
-        status_info = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "url": SITE_URL,
-            "status_code": None,
-            "response_time": None,
-            "is_up": False,
-            "error": error_msg
-        }
-        
-        logger.error(f"Erro ao acessar o site: {error_msg}")
-        return status_info
-
-def load_previous_status() -> Dict[str, Any]:
-    """
-    Carrega o status anterior do arquivo de status.
-    
-    Returns:
-        Dict com o status anterior ou None se não existir
-    """
-    try:
-        if os.path.exists(STATUS_FILE):
-            with open(STATUS_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.warning(f"Erro ao carregar status anterior: {e}")
-    
-    return {"is_up": True}  # Assume que estava funcionando se não há histórico
-
-def save_current_status(status_info: Dict[str, Any]) -> None:
-    """
-    Salva o status atual no arquivo de status.
-    
-    Args:
-        status_info: Informações do status atual
-    """
-    try:
-        with open(STATUS_FILE, 'w') as f:
-            json.dump(status_info, f, indent=2)
-    except Exception as e:
-        logger.error(f"Erro ao salvar status: {e}")
-
-def send_discord_alert(message: str) -> bool:
-    """
-    Envia alerta via Discord webhook.
-    
-    Args:
-        message: Mensagem a ser enviada
-        
-    Returns:
-        True se enviado com sucesso, False caso contrário
-    """
-    if not WEBHOOK_CONFIG.get("url"):
-        logger.warning("URL do webhook Discord não configurada")
-        return False
-        
-    try:
-        payload = {
-            "content": message,
-            "username": "Monitor do Site",
-            "avatar_url": "https://cdn-icons-png.flaticon.com/512/2919/2919906.png"
-        }
-        
-        response = requests.post(WEBHOOK_CONFIG["url"], json=payload, timeout=10)
-        response.raise_for_status()
-        
-        logger.info("Alerta enviado via Discord com sucesso")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Erro ao enviar alerta via Discord: {e}")
-        return False
-
-def send_alert(message: str) -> bool:
-    """
-    Envia alerta usando o método configurado.
-    
-    Args:
-        message: Mensagem a ser enviada
-        
-    Returns:
-        True se enviado com sucesso, False caso contrário
-    """
-    webhook_type = WEBHOOK_CONFIG.get("type", "").lower()
-    
-    if webhook_type == "discord":
-        return send_discord_alert(message)
-    else:
-        logger.warning(f"Tipo de webhook não suportado: {webhook_type}")
-        return False
-
-def format_alert_message(status_info: Dict[str, Any], is_down_alert: bool) -> str:
-    """
-    Formata a mensagem de alerta.
-    
-    Args:
-        status_info: Informações do status
-        is_down_alert: True se é um alerta de site fora do ar
-        
-    Returns:
-        Mensagem formatada
-    """
-    timestamp = datetime.datetime.fromisoformat(status_info["timestamp"]).strftime("%d/%m/%Y %H:%M:%S")
-    
-    if is_down_alert:
-        if status_info["error"]:
-            return f"""🚨 **ALERTA: Site Fora do Ar** 🚨
-
-**URL:** {status_info['url']}
-**Timestamp:** {timestamp}
-**Erro:** {status_info['error']}
-
-O site não está respondendo. Verifique o servidor imediatamente!"""
-        else:
-            return f"""🚨 **ALERTA: Site com Problema** 🚨
-
-**URL:** {status_info['url']}
-**Timestamp:** {timestamp}
-**Status Code:** {status_info['status_code']}
-**Tempo de Resposta:** {status_info['response_time']:.2f}s
-
-O site retornou um código de erro. Verifique o servidor!"""
-    else:
-        return f"""✅ **Site Restaurado** ✅
-
-**URL:** {status_info['url']}
-**Timestamp:** {timestamp}
-**Status Code:** {status_info['status_code']}
-**Tempo de Resposta:** {status_info['response_time']:.2f}s
-
-O site voltou a funcionar normalmente."""
-
-def main():
-    """
-    Função principal do script de monitoramento.
-    """
-    logger.info("Iniciando verificação do site...")
-    
-    # Carrega status anterior
-    previous_status = load_previous_status()
-    
-    # Verifica status atual
-    current_status = check_site_status()
-    
-    # Salva status atual
-    save_current_status(current_status)
-    
-    # Verifica se houve mudança de status
-    was_up = previous_status.get("is_up", True)
-    is_up = current_status["is_up"]
-    
-    # Envia alertas apenas quando há mudança de status
-    if was_up and not is_up:
-        # Site saiu do ar
-        message = format_alert_message(current_status, True)
-        if send_alert(message):
-            logger.info("Alerta de site fora do ar enviado")
-        else:
-            logger.error("Falha ao enviar alerta de site fora do ar")
-            
-    elif not was_up and is_up:
-        # Site voltou ao ar
-        message = format_alert_message(current_status, False)
-        if send_alert(message):
-            logger.info("Alerta de site restaurado enviado")
-        else:
-            logger.error("Falha ao enviar alerta de site restaurado")
-    
-    logger.info("Verificação concluída")
-
-if __name__ == "__main__":
-    main()
-
+#!/usr/bin/env python3
+"""
+Script de Monitoramento de Site
+Verifica a disponibilidade do site a cada execução e envia alertas se necessário.
+Com --daemon, permanece em execução e verifica o site em uma cadência
+adaptativa: espaçada enquanto ele está no ar, rápida após uma falha.
+"""
+
+import requests
+import datetime
+import json
+import os
+import sys
+import random
+import signal
+import asyncio
+import argparse
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from async_http import ConnectionPool, HTTPClientError, PHASES
+from alert_outbox import AlertOutbox
+from check_history import CheckHistory, ERROR_DESCRIPTIONS
+from metrics_exporter import MetricsRegistry, MetricsServer, METRICS_ADDRESS, METRICS_PORT
+
+# Configurações
+SITE_URL = "http://localhost"
+LOG_FILE = "/var/log/monitoramento.log"
+CHECKS_LOG = "/var/log/monitoramento.jsonl"  # uma linha JSON por verificação, lida pelo log_analyzer.py
+STATUS_FILE = "/tmp/site_status.json"
+TIMEOUT = 10  # segundos
+
+# Vários alvos (opcional): arquivo JSON com a lista de alvos; sem ele, apenas SITE_URL é verificado
+TARGETS_FILE = "/home/ubuntu/monitor_targets.json"
+DEFAULT_TARGET = "site"  # nome do alvo criado a partir de SITE_URL
+SCHEDULE_KEYS = ("interval", "probe_interval", "budget")  # ajustes opcionais da cadência por alvo
+MAX_CONCURRENT_CHECKS = 20  # verificações simultâneas
+MAX_CONNECTIONS_PER_HOST = 4  # conexões keep-alive simultâneas por host
+
+# Modo daemon (--daemon): cadência adaptativa por alvo
+DAEMON_INTERVAL = 30  # segundos entre verificações enquanto o alvo está no ar
+PROBE_INTERVAL = 2  # segundos entre as verificações de confirmação após uma falha
+PROBE_BACKOFF = 2  # fator de aumento do intervalo enquanto a queda persiste (até DAEMON_INTERVAL)
+TARGET_BUDGET = 12  # máximo de verificações por minuto de cada alvo
+DAEMON_JITTER = 0.1  # fração do intervalo sorteada a cada verificação
+STATUS_FLUSH_INTERVAL = 30  # segundos entre gravações do status em STATUS_FILE
+
+# Histórico de verificações (anel em arquivo mapeado em memória por alvo)
+HISTORY_DIR = "/var/lib/monitoramento/historico"
+HISTORY_LIMIT = 20  # verificações exibidas por alvo em --history
+# Alerta de queda quando ALERT_FAILURES das últimas ALERT_WINDOW verificações falharam
+ALERT_FAILURES = 1
+ALERT_WINDOW = 1
+
+# Configuração de webhook (Discord)
+# Para Discord: Use um webhook URL do Discord
+WEBHOOK_CONFIG = {
+    "type": "discord",  # "discord"
+    "url": "https://discord.com/api/webhooks/XXXXXXXXXXXXXXXXXXXXX",  # Cole aqui o webhook URL do Discord
+}
+
+# Identidade usada nas mensagens do Discord
+DISCORD_PROFILE = {
+    "username": "Monitor do Site",
+    "avatar_url": "https://cdn-icons-png.flaticon.com/512/2919/2919906.png"
+}
+
+# Fila de alertas: os alertas são gravados em disco e entregues em segundo plano
+ALERT_SPOOL_DIR = "/var/spool/monitoramento/alertas"
+ALERT_COALESCE_WINDOW = 5  # segundos aguardando outros alertas para enviá-los juntos
+ALERT_DRAIN_TIMEOUT = 20  # segundos de entrega ao fim de uma execução única
+
+# Métricas do modo daemon (formato Prometheus), servidas em http://METRICS_ADDRESS:METRICS_PORT/metrics
+ANALYZER_METRICS_FILE = "/home/ubuntu/.log_analyzer/metrics.prom"  # gravado pelo log_analyzer.py
+
+# Configuração de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_FILE, delay=True),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Log estruturado: apenas a linha JSON, sem o prefixo do log de texto
+check_logger = logging.getLogger(f"{__name__}.checks")
+check_logger.setLevel(logging.INFO)
+check_logger.propagate = False
+_checks_handler = logging.FileHandler(CHECKS_LOG, delay=True)
+_checks_handler.setFormatter(logging.Formatter("%(message)s"))
+check_logger.addHandler(_checks_handler)
+
+def default_target() -> Dict[str, Any]:
+    """
+    Alvo padrão, formado pelas configurações SITE_URL e TIMEOUT.
+    
+    Returns:
+        Dict com name, url, method, expected_status e timeout
+    """
+    return {
+        "name": DEFAULT_TARGET,
+        "url": SITE_URL,
+        "method": "GET",
+        "expected_status": [200],
+        "timeout": TIMEOUT
+    }
+
+def load_targets(path: Optional[str] = TARGETS_FILE) -> List[Dict[str, Any]]:
+    """
+    Carrega a lista de alvos do arquivo JSON.
+    
+    Cada alvo é um objeto com "url" e, opcionalmente, "name" (padrão: a url),
+    "method" (padrão: GET), "expected_status" (código ou lista, padrão: 200)
+    e "timeout" em segundos (padrão: TIMEOUT). No modo daemon, "interval",
+    "probe_interval" (segundos) e "budget" (verificações por minuto)
+    substituem, para o alvo, os valores gerais de TargetSchedule.
+    
+    Args:
+        path: Arquivo de alvos; se não existir, o único alvo é default_target()
+        
+    Returns:
+        Lista de alvos no formato de default_target
+        
+    Raises:
+        ValueError: Arquivo inválido, alvo sem url ou nomes repetidos
+    """
+    if not path or not os.path.exists(path):
+        return [default_target()]
+    
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} deve conter uma lista de alvos")
+    
+    targets = []
+    names = set()
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("url"):
+            raise ValueError(f"Alvo sem url em {path}: {entry!r}")
+        expected = entry.get("expected_status", 200)
+        target = {
+            "name": str(entry.get("name") or entry["url"]),
+            "url": entry["url"],
+            "method": str(entry.get("method", "GET")).upper(),
+            "expected_status": [int(expected)] if isinstance(expected, (int, str)) else [int(code) for code in expected],
+            "timeout": float(entry.get("timeout", TIMEOUT))
+        }
+        for key in SCHEDULE_KEYS:
+            if entry.get(key) is not None:
+                target[key] = float(entry[key])
+                if target[key] <= 0:
+                    raise ValueError(f"{key} deve ser > 0 no alvo {target['name']} em {path}")
+        if target["name"] in names:
+            raise ValueError(f"Nome de alvo repetido em {path}: {target['name']}")
+        names.add(target["name"])
+        targets.append(target)
+    return targets
+
+def build_status(timestamp: datetime.datetime, status_code: Optional[int],
+                 response_time: Optional[float], error: Optional[str],
+                 target: Optional[Dict[str, Any]] = None,
+                 timings: Optional[Dict[str, Any]] = None,
+                 error_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Monta o registro de uma verificação.
+    
+    Args:
+        timestamp: Início da verificação
+        status_code: Código HTTP recebido (None em caso de erro)
+        response_time: Tempo de resposta em segundos (None em caso de erro)
+        error: Mensagem de erro (None se houve resposta)
+        target: Alvo verificado (padrão: default_target())
+        timings: Fases medidas pelo cliente HTTP, em nanossegundos (opcional)
+        error_type: Tipo da falha (HTTPClientError.kind)
+        
+    Returns:
+        Dict contendo status, código de resposta, tempo de resposta e timestamp
+        (e o nome do alvo, exceto para o alvo padrão). Em falhas, inclui
+        error_type ("status" para um código HTTP inesperado). Com timings, inclui
+        phases_ms (DNS, conexão, TLS, TTFB e transferência em milissegundos),
+        connection_reused, body_bytes e throughput (bytes/s durante a transferência)
+    """
+    target = target or default_target()
+    status_info = {"name": target["name"]} if target["name"] != DEFAULT_TARGET else {}
+    status_info.update({
+        "timestamp": timestamp.isoformat(),
+        "url": target["url"],
+        "status_code": status_code,
+        "response_time": response_time,
+        "is_up": status_code in target["expected_status"],
+        "error": error
+    })
+    if not status_info["is_up"]:
+        status_info["error_type"] = error_type or ("status" if error is None else "protocol")
+    if timings is not None:
+        transfer = timings["transfer"]
+        status_info.update({
+            "phases_ms": {phase: round(timings[phase] / 1e6, 3) for phase in PHASES},
+            "connection_reused": timings["reused"],
+            "body_bytes": timings["body_bytes"],
+            "throughput": timings["body_bytes"] / (transfer / 1e9) if transfer and timings["body_bytes"] else None
+        })
+    return status_info
+
+def format_phases(status_info: Dict[str, Any]) -> str:
+    """
+    Resume as fases da verificação para a linha de log.
+    
+    Args:
+        status_info: Registro criado por build_status
+        
+    Returns:
+        Texto iniciado por " - Fases: " ou "" se as fases não foram medidas
+    """
+    phases = status_info.get("phases_ms")
+    if not phases:
+        return ""
+    if status_info["connection_reused"]:
+        parts = ["conexão reutilizada"]
+    else:
+        parts = [f"DNS {phases['dns']:.1f}ms", f"conexão {phases['connect']:.1f}ms"]
+        if status_info["url"].startswith("https"):
+            parts.append(f"TLS {phases['tls']:.1f}ms")
+    parts.append(f"TTFB {phases['ttfb']:.1f}ms")
+    parts.append(f"transferência {phases['transfer']:.1f}ms")
+    text = " - Fases: " + ", ".join(parts)
+    if status_info["body_bytes"]:
+        text += f" - Corpo: {status_info['body_bytes']} bytes"
+        if status_info["throughput"]:
+            text += f" ({status_info['throughput'] / 1e6:.2f} MB/s)"
+    return text
+
+def log_status(status_info: Dict[str, Any]) -> None:
+    """
+    Registra o resultado de uma verificação no log.
+    
+    Args:
+        status_info: Registro criado por build_status
+    """
+    suffix = format_phases(status_info)
+    if "name" in status_info:
+        suffix += f" - Alvo: {status_info['name']}"
+    if status_info["error"]:
+        logger.error(f"Erro ao acessar o site: {status_info['error']}{suffix}")
+    elif status_info["is_up"]:
+        logger.info(f"Site OK - Status: {status_info['status_code']}, Tempo: {status_info['response_time']:.2f}s{suffix}")
+    else:
+        logger.warning(f"Site com problema - Status: {status_info['status_code']}, Tempo: {status_info['response_time']:.2f}s{suffix}")
+
+def log_check_record(status_info: Dict[str, Any]) -> None:
+    """
+    Registra a verificação no log estruturado (CHECKS_LOG).
+    
+    Cada linha é um objeto JSON compacto, sempre iniciado pelo timestamp:
+    {"ts": ..., "target": ..., "status": ..., "latency": ..., "up": ..., "error": ...}
+    
+    Args:
+        status_info: Registro criado por build_status
+    """
+    response_time = status_info["response_time"]
+    record = {
+        "ts": status_info["timestamp"][:23],
+        "target": status_info.get("name", DEFAULT_TARGET),
+        "status": status_info["status_code"],
+        "latency": round(response_time, 6) if response_time is not None else None,
+        "up": status_info["is_up"],
+        "error": status_info.get("error_type")
+    }
+    check_logger.info(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+
+def log_alert_record(status_info: Dict[str, Any], is_down_alert: bool) -> None:
+    """Registra no log estruturado um alerta enfileirado."""
+    record = {
+        "ts": datetime.datetime.now().isoformat(timespec="milliseconds"),
+        "target": status_info.get("name", DEFAULT_TARGET),
+        "alert": "down" if is_down_alert else "up"
+    }
+    check_logger.info(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+
+def check_site_status() -> Dict[str, Any]:
+    """
+    Verifica o status do site e retorna informações sobre a verificação.
+    
+    Returns:
+        Dict contendo status, código de resposta, tempo de resposta, fases e timestamp
+    """
+    # O cliente assíncrono mede cada fase da requisição, o que requests não permite
+    return asyncio.run(check_all_targets([default_target()]))[DEFAULT_TARGET]
+
+async def check_target_async(pool: ConnectionPool, target: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Verifica um alvo reutilizando as conexões keep-alive do pool.
+    
+    Args:
+        pool: Pool de conexões compartilhado entre as verificações
+        target: Alvo no formato de default_target
+        
+    Returns:
+        Dict no mesmo formato de check_site_status
+    """
+    start_time = datetime.datetime.now()
+    try:
+        response = await pool.request(target["method"], target["url"], timeout=target["timeout"])
+    except HTTPClientError as e:
+        status_info = build_status(start_time, None, None, str(e), target, e.timings, e.kind)
+    else:
+        status_info = build_status(start_time, response.status, response.elapsed, None, target,
+                                   response.timings)
+    
+    log_status(status_info)
+    log_check_record(status_info)
+    return status_info
+
+async def check_all_targets(targets: List[Dict[str, Any]],
+                            concurrency: int = MAX_CONCURRENT_CHECKS) -> Dict[str, Dict[str, Any]]:
+    """
+    Verifica todos os alvos simultaneamente, com no máximo `concurrency` em andamento.
+    
+    Returns:
+        Dict nome do alvo -> status da verificação
+    """
+    pool = ConnectionPool(max_per_host=MAX_CONNECTIONS_PER_HOST)
+    limit = asyncio.Semaphore(concurrency)
+    
+    async def check(target):
+        async with limit:
+            return await check_target_async(pool, target)
+    
+    try:
+        results = await asyncio.gather(*(check(target) for target in targets))
+    finally:
+        await pool.close()
+    return {target["name"]: status for target, status in zip(targets, results)}
+
+def load_previous_status() -> Dict[str, Any]:
+    """
+    Carrega o status anterior do arquivo de status.
+    
+    Returns:
+        Dict com o status anterior ou None se não existir
+    """
+    try:
+        if os.path.exists(STATUS_FILE):
+            with open(STATUS_FILE, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        logger.warning(f"Erro ao carregar status anterior: {e}")
+    
+    return {"is_up": True}  # Assume que estava funcionando se não há histórico
+
+def save_current_status(status_info: Dict[str, Any]) -> None:
+    """
+    Salva o status atual no arquivo de status.
+    
+    Args:
+        status_info: Informações do status atual
+    """
+    try:
+        # Arquivo temporário + rename: quem lê nunca encontra o status pela metade
+        temp_file = f"{STATUS_FILE}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(status_info, f, indent=2)
+        os.replace(temp_file, STATUS_FILE)
+    except Exception as e:
+        logger.error(f"Erro ao salvar status: {e}")
+
+def load_previous_statuses(targets: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Carrega o status anterior de cada alvo.
+    
+    Aceita o formato de save_statuses e o de um único alvo (save_current_status).
+    
+    Returns:
+        Dict nome do alvo -> status anterior
+    """
+    previous = load_previous_status()
+    statuses = previous.get("targets")
+    if not isinstance(statuses, dict):
+        statuses = {DEFAULT_TARGET: previous}
+    return {target["name"]: statuses.get(target["name"], {"is_up": True}) for target in targets}
+
+def save_statuses(statuses: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Salva o status atual de todos os alvos.
+    
+    Apenas com o alvo padrão, o arquivo mantém o formato de save_current_status.
+    
+    Args:
+        statuses: Dict nome do alvo -> status atual
+    """
+    if list(statuses) == [DEFAULT_TARGET]:
+        save_current_status(statuses[DEFAULT_TARGET])
+    else:
+        save_current_status({"targets": statuses})
+
+def send_discord_alert(message: str) -> bool:
+    """
+    Envia alerta via Discord webhook.
+    
+    Args:
+        message: Mensagem a ser enviada
+        
+    Returns:
+        True se enviado com sucesso, False caso contrário
+    """
+    if not WEBHOOK_CONFIG.get("url"):
+        logger.warning("URL do webhook Discord não configurada")
+        return False
+        
+    try:
+        payload = dict(DISCORD_PROFILE, content=message)
+        
+        response = requests.post(WEBHOOK_CONFIG["url"], json=payload, timeout=10)
+        response.raise_for_status()
+        
+        logger.info("Alerta enviado via Discord com sucesso")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Erro ao enviar alerta via Discord: {e}")
+        return False
+
+def send_alert(message: str) -> bool:
+    """
+    Envia alerta usando o método configurado, aguardando a resposta do webhook.
+    
+    As verificações usam queue_alert, que não espera pela entrega.
+    
+    Args:
+        message: Mensagem a ser enviada
+        
+    Returns:
+        True se enviado com sucesso, False caso contrário
+    """
+    webhook_type = WEBHOOK_CONFIG.get("type", "").lower()
+    
+    if webhook_type == "discord":
+        return send_discord_alert(message)
+    else:
+        logger.warning(f"Tipo de webhook não suportado: {webhook_type}")
+        return False
+
+def create_outbox(metrics: Optional[MetricsRegistry] = None) -> AlertOutbox:
+    """Cria a fila de alertas persistente (ALERT_SPOOL_DIR)."""
+    return AlertOutbox(ALERT_SPOOL_DIR, profile=DISCORD_PROFILE, coalesce_window=ALERT_COALESCE_WINDOW,
+                       metrics=metrics)
+
+def queue_alert(outbox: AlertOutbox, message: str) -> bool:
+    """
+    Enfileira um alerta para entrega em segundo plano.
+    
+    Args:
+        outbox: Fila de alertas
+        message: Mensagem a ser enviada
+        
+    Returns:
+        True se o alerta foi gravado na fila, False caso contrário
+    """
+    webhook_type = WEBHOOK_CONFIG.get("type", "").lower()
+    if webhook_type != "discord":
+        logger.warning(f"Tipo de webhook não suportado: {webhook_type}")
+        return False
+    if not WEBHOOK_CONFIG.get("url"):
+        logger.warning("URL do webhook Discord não configurada")
+        return False
+    
+    try:
+        outbox.submit(WEBHOOK_CONFIG["url"], message)
+        return True
+    except OSError as e:
+        logger.error(f"Erro ao gravar alerta na fila: {e}")
+        return False
+
+def format_alert_message(status_info: Dict[str, Any], is_down_alert: bool) -> str:
+    """
+    Formata a mensagem de alerta.
+    
+    Args:
+        status_info: Informações do status
+        is_down_alert: True se é um alerta de site fora do ar
+        
+    Returns:
+        Mensagem formatada
+    """
+    timestamp = datetime.datetime.fromisoformat(status_info["timestamp"]).strftime("%d/%m/%Y %H:%M:%S")
+    
+    if is_down_alert:
+        if status_info["error"]:
+            return f"""🚨 **ALERTA: Site Fora do Ar** 🚨
+
+**URL:** {status_info['url']}
+**Timestamp:** {timestamp}
+**Erro:** {status_info['error']}
+
+O site não está respondendo. Verifique o servidor imediatamente!"""
+        else:
+            return f"""🚨 **ALERTA: Site com Problema** 🚨
+
+**URL:** {status_info['url']}
+**Timestamp:** {timestamp}
+**Status Code:** {status_info['status_code']}
+**Tempo de Resposta:** {status_info['response_time']:.2f}s
+
+O site retornou um código de erro. Verifique o servidor!"""
+    else:
+        return f"""✅ **Site Restaurado** ✅
+
+**URL:** {status_info['url']}
+**Timestamp:** {timestamp}
+**Status Code:** {status_info['status_code']}
+**Tempo de Resposta:** {status_info['response_time']:.2f}s
+
+O site voltou a funcionar normalmente."""
+
+def record_check(history: Optional[CheckHistory], previous_status: Dict[str, Any],
+                 current_status: Dict[str, Any], failures: int = ALERT_FAILURES,
+                 window: int = ALERT_WINDOW) -> Tuple[bool, bool]:
+    """
+    Grava a verificação no histórico e calcula o estado de alerta do alvo.
+    
+    O alvo é considerado fora do ar quando `failures` das últimas `window`
+    verificações falharam. Sem histórico (ou se ele não puder ser gravado),
+    vale apenas a comparação com a verificação anterior.
+    
+    Args:
+        history: Histórico de verificações (None para não usar)
+        previous_status: Status da verificação anterior
+        current_status: Status da verificação atual
+        failures: Falhas necessárias para o alerta de queda
+        window: Verificações consideradas
+        
+    Returns:
+        Tupla (no ar antes da verificação, no ar depois dela)
+    """
+    fallback = (previous_status.get("is_up", True), current_status["is_up"])
+    if history is None:
+        return fallback
+    try:
+        ring = history.target(current_status.get("name", DEFAULT_TARGET))
+        # Histórico vazio (primeira execução): parte do status anterior
+        was_up = ring.is_up(failures, window) if len(ring) else fallback[0]
+        ring.append(current_status)
+        return was_up, ring.is_up(failures, window)
+    except (OSError, ValueError) as e:
+        logger.error(f"Erro ao gravar histórico de verificações: {e}")
+        return fallback
+
+def handle_status_change(was_up: bool, is_up: bool, current_status: Dict[str, Any],
+                         outbox: AlertOutbox) -> None:
+    """
+    Enfileira alertas quando o site muda de estado.
+    
+    Args:
+        was_up: Estado de alerta antes da verificação atual
+        is_up: Estado de alerta depois da verificação atual
+        current_status: Status da verificação atual
+        outbox: Fila de alertas
+    """
+    # Envia alertas apenas quando há mudança de status
+    if was_up and not is_up:
+        # Site saiu do ar
+        message = format_alert_message(current_status, True)
+        if queue_alert(outbox, message):
+            log_alert_record(current_status, True)
+            logger.info("Alerta de site fora do ar enfileirado")
+        else:
+            logger.error("Falha ao enfileirar alerta de site fora do ar")
+            
+    elif not was_up and is_up:
+        # Site voltou ao ar
+        message = format_alert_message(current_status, False)
+        if queue_alert(outbox, message):
+            log_alert_record(current_status, False)
+            logger.info("Alerta de site restaurado enfileirado")
+        else:
+            logger.error("Falha ao enfileirar alerta de site restaurado")
+
+def create_metrics() -> MetricsRegistry:
+    """
+    Cria o registro de métricas do monitoramento.
+    
+    Além das métricas das verificações e dos alertas, a exposição inclui as
+    métricas gravadas pelo log_analyzer.py em ANALYZER_METRICS_FILE.
+    """
+    metrics = MetricsRegistry()
+    metrics.counter("projeto_linux_checks_total", "Verificações por alvo e resultado (ok ou tipo da falha)",
+                    ("target", "result"))
+    metrics.histogram("projeto_linux_check_duration_seconds", "Tempo de resposta das verificações bem-sucedidas",
+                      ("target",))
+    metrics.histogram("projeto_linux_check_phase_seconds", "Duração de cada fase da requisição",
+                      ("target", "phase"))
+    metrics.gauge("projeto_linux_target_up", "1 se a última verificação do alvo teve sucesso", ("target",))
+    metrics.gauge("projeto_linux_last_check_timestamp_seconds", "Horário (epoch) da última verificação",
+                  ("target",))
+    metrics.gauge("projeto_linux_check_interval_seconds", "Intervalo atual entre verificações do alvo (modo daemon)",
+                  ("target",))
+    metrics.counter("projeto_linux_checks_deferred_total", "Verificações adiadas por esgotarem o orçamento do alvo",
+                    ("target",))
+    metrics.add_textfile(ANALYZER_METRICS_FILE)
+    return metrics
+
+def observe_check(metrics: MetricsRegistry, status_info: Dict[str, Any]) -> None:
+    """
+    Registra uma verificação nas métricas.
+    
+    Args:
+        metrics: Registro criado por create_metrics
+        status_info: Registro criado por build_status
+    """
+    target = status_info.get("name", DEFAULT_TARGET)
+    result = "ok" if status_info["is_up"] else status_info.get("error_type", "protocol")
+    metrics["projeto_linux_checks_total"].inc(target=target, result=result)
+    if status_info["is_up"] and status_info["response_time"] is not None:
+        metrics["projeto_linux_check_duration_seconds"].observe(status_info["response_time"], target=target)
+    for phase, milliseconds in (status_info.get("phases_ms") or {}).items():
+        metrics["projeto_linux_check_phase_seconds"].observe(milliseconds / 1000, target=target, phase=phase)
+    metrics["projeto_linux_target_up"].set(1 if status_info["is_up"] else 0, target=target)
+    timestamp = datetime.datetime.fromisoformat(status_info["timestamp"]).timestamp()
+    metrics["projeto_linux_last_check_timestamp_seconds"].set(round(timestamp, 3), target=target)
+
+def run_once(targets: Optional[List[Dict[str, Any]]] = None, concurrency: int = MAX_CONCURRENT_CHECKS,
+             failures: int = ALERT_FAILURES, window: int = ALERT_WINDOW):
+    """
+    Executa uma única verificação (modo usado pelo monitor-site.timer).
+    
+    Os alertas são entregues depois das verificações, por no máximo
+    ALERT_DRAIN_TIMEOUT segundos; os pendentes ficam para a próxima execução.
+    
+    Args:
+        targets: Alvos a verificar (padrão: apenas default_target())
+        concurrency: Verificações simultâneas quando há vários alvos
+        failures / window: Regra de alerta (ver record_check)
+    """
+    logger.info("Iniciando verificação do site...")
+    outbox = create_outbox()
+    history = CheckHistory(HISTORY_DIR)
+    
+    if not targets or targets == [default_target()]:
+        # Carrega status anterior
+        previous_status = load_previous_status()
+        
+        # Verifica status atual
+        current_status = check_site_status()
+        
+        # Salva status atual
+        save_current_status(current_status)
+        
+        was_up, is_up = record_check(history, previous_status, current_status, failures, window)
+        handle_status_change(was_up, is_up, current_status, outbox)
+    else:
+        previous_statuses = load_previous_statuses(targets)
+        current_statuses = asyncio.run(check_all_targets(targets, concurrency))
+        save_statuses(current_statuses)
+        
+        # Transições de cada alvo são tratadas de forma independente
+        for target in targets:
+            current_status = current_statuses[target["name"]]
+            was_up, is_up = record_check(history, previous_statuses[target["name"]], current_status,
+                                         failures, window)
+            handle_status_change(was_up, is_up, current_status, outbox)
+    history.close()
+    
+    pending = asyncio.run(outbox.drain(ALERT_DRAIN_TIMEOUT))
+    if pending:
+        logger.warning(f"{pending} alerta(s) pendente(s) na fila para a próxima execução")
+    logger.info("Verificação concluída")
+
+class TargetSchedule:
+    """
+    Cadência adaptativa de um alvo no modo daemon.
+    
+    Com o alvo no ar, as verificações ocorrem a cada `interval`. Uma falha
+    passa o alvo para verificações de confirmação a cada `probe_interval`,
+    que decidem rapidamente a regra de alerta (e, depois, a restauração).
+    Confirmada a queda, o intervalo cresce por PROBE_BACKOFF a cada nova
+    falha até voltar a `interval`, de modo que uma queda longa não custa
+    mais que o alvo saudável. Um balde de fichas limita o alvo a `budget`
+    verificações por minuto, mesmo que ele oscile sem parar.
+    """
+    
+    def __init__(self, interval: float = DAEMON_INTERVAL, probe_interval: float = PROBE_INTERVAL,
+                 budget: float = TARGET_BUDGET):
+        self.interval = interval
+        self.probe_interval = min(probe_interval, interval)
+        self.budget = budget
+        self.delay = interval
+        self._outage = False  # queda confirmada: o intervalo só cresce até voltar a `interval`
+        self._tokens = budget
+        self._refilled = None
+    
+    @property
+    def probing(self) -> bool:
+        """True enquanto o alvo está fora da cadência normal."""
+        return self.delay < self.interval
+    
+    def next_delay(self, check_up: bool, alert_up: bool) -> float:
+        """
+        Intervalo até a próxima verificação.
+        
+        Args:
+            check_up: Resultado da verificação atual
+            alert_up: Estado de alerta depois dela (ver record_check)
+            
+        Returns:
+            Segundos até a próxima verificação (sem jitter)
+        """
+        if check_up != alert_up:
+            # Queda ou restauração ainda não confirmada pela regra de alerta
+            self.delay = self.probe_interval
+            self._outage = False
+        elif check_up:
+            self.delay = self.interval
+            self._outage = False
+        else:
+            # Queda confirmada: recua até a cadência normal e permanece nela
+            self.delay = min(self.interval, self.delay * PROBE_BACKOFF) if self._outage else self.probe_interval
+            self._outage = True
+        return self.delay
+    
+    def reserve(self, now: float) -> float:
+        """
+        Reserva uma verificação no orçamento do alvo.
+        
+        Args:
+            now: Horário atual (relógio do loop)
+            
+        Returns:
+            Segundos a aguardar antes da verificação (0 se há saldo)
+        """
+        rate = self.budget / 60
+        if self._refilled is not None:
+            self._tokens = min(self.budget, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        self._tokens -= 1
+        return -self._tokens / rate if self._tokens < 0 else 0.0
+
+class MonitorDaemon:
+    """
+    Monitoramento contínuo em um único loop asyncio.
+    
+    Cada alvo é verificado em sua própria cadência adaptativa
+    (TargetSchedule), com no máximo `concurrency` verificações em andamento
+    e conexões keep-alive por host.
+    O status de cada alvo fica em memória e é gravado em STATUS_FILE
+    periodicamente, a cada mudança de estado e ao encerrar (SIGTERM/SIGINT).
+    Os alertas vão para a fila persistente, entregue por uma tarefa própria,
+    sem atrasar as verificações seguintes. Com metrics_port, as métricas
+    (create_metrics) são servidas em http://metrics_address:metrics_port/metrics.
+    """
+    
+    def __init__(self, targets: Optional[List[Dict[str, Any]]] = None, interval: float = DAEMON_INTERVAL,
+                 jitter: float = DAEMON_JITTER, flush_interval: float = STATUS_FLUSH_INTERVAL,
+                 concurrency: int = MAX_CONCURRENT_CHECKS, failures: int = ALERT_FAILURES,
+                 window: int = ALERT_WINDOW, metrics_address: str = METRICS_ADDRESS,
+                 metrics_port: Optional[int] = METRICS_PORT, probe_interval: float = PROBE_INTERVAL,
+                 budget: float = TARGET_BUDGET):
+        self.targets = targets or [default_target()]
+        self.interval = interval
+        self.probe_interval = probe_interval
+        self.budget = budget
+        self.jitter = jitter
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.failures = failures
+        self.window = window
+        self.statuses = load_previous_statuses(self.targets)
+        self.metrics = create_metrics()
+        self.metrics_address = metrics_address
+        self.metrics_port = metrics_port
+        self.outbox = create_outbox(self.metrics)
+        self.history = CheckHistory(HISTORY_DIR)
+        self._changed = None
+    
+    async def _watch(self, target: Dict[str, Any], pool: ConnectionPool,
+                     limit: asyncio.Semaphore, stop: asyncio.Event) -> None:
+        """Verifica um alvo em cadência adaptativa até stop."""
+        loop = asyncio.get_running_loop()
+        name = target["name"]
+        schedule = TargetSchedule(target.get("interval", self.interval),
+                                  target.get("probe_interval", self.probe_interval),
+                                  target.get("budget", self.budget))
+        self.metrics["projeto_linux_check_interval_seconds"].set(schedule.delay, target=name)
+        # Com vários alvos, as primeiras verificações se espalham pelo intervalo
+        next_check = loop.time() + (random.uniform(0, schedule.interval) if len(self.targets) > 1 else 0)
+        while True:
+            # O jitter desloca cada verificação sem acumular atraso
+            delay = next_check - loop.time() + random.uniform(-self.jitter, self.jitter) * schedule.delay
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, delay))
+                return
+            except asyncio.TimeoutError:
+                pass
+            
+            wait = schedule.reserve(loop.time())
+            if wait:
+                # Orçamento do alvo esgotado: adia a verificação até haver saldo
+                self.metrics["projeto_linux_checks_deferred_total"].inc(target=name)
+                try:
+                    await asyncio.wait_for(stop.wait(), wait)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+            
+            async with limit:
+                status = await check_target_async(pool, target)
+            observe_check(self.metrics, status)
+            previous_status = self.statuses[name]
+            self.statuses[name] = status
+            was_up, is_up = record_check(self.history, previous_status, status, self.failures, self.window)
+            if was_up != is_up:
+                handle_status_change(was_up, is_up, status, self.outbox)
+            if previous_status.get("is_up", True) != status["is_up"]:
+                self._changed.set()  # grava a mudança de estado imediatamente
+            
+            probing = schedule.probing
+            interval = schedule.next_delay(status["is_up"], is_up)
+            if schedule.probing != probing:
+                if probing:
+                    logger.info(f"Cadência normal retomada ({interval:g}s) - Alvo: {name}")
+                else:
+                    logger.info(f"Verificações de confirmação a cada {interval:g}s - Alvo: {name}")
+            self.metrics["projeto_linux_check_interval_seconds"].set(interval, target=name)
+            next_check = max(next_check + interval, loop.time())
+    
+    async def _flush_periodically(self) -> None:
+        """Grava os status a cada flush_interval ou quando algum alvo muda de estado."""
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            save_statuses(self.statuses)
+    
+    async def run(self) -> None:
+        """Executa as verificações até receber SIGTERM ou SIGINT."""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        
+        logger.info(f"Monitor em modo daemon: {len(self.targets)} alvo(s), verificação a cada "
+                    f"{self.interval:g}s (jitter de ±{self.jitter:.0%}), confirmação de falhas a cada "
+                    f"{min(self.probe_interval, self.interval):g}s, até {self.budget:g} verificações/min por alvo")
+        pool = ConnectionPool(max_per_host=MAX_CONNECTIONS_PER_HOST)
+        limit = asyncio.Semaphore(self.concurrency)
+        self._changed = asyncio.Event()
+        server = None
+        if self.metrics_port:
+            server = MetricsServer(self.metrics, self.metrics_address, self.metrics_port)
+            try:
+                await server.start()
+            except OSError as e:
+                logger.error(f"Erro ao abrir o endpoint de métricas em {self.metrics_address}:{self.metrics_port}: {e}")
+                server = None
+        flusher = asyncio.ensure_future(self._flush_periodically())
+        sender = asyncio.ensure_future(self.outbox.run(stop))
+        try:
+            await asyncio.gather(*(self._watch(target, pool, limit, stop) for target in self.targets))
+        finally:
+            flusher.cancel()
+            if server is not None:
+                await server.close()
+            save_statuses(self.statuses)
+            self.history.close()
+            await pool.close()
+            stop.set()
+            await sender
+            logger.info("Monitor em modo daemon encerrado")
+
+def print_history(targets: List[Dict[str, Any]], limit: int = HISTORY_LIMIT,
+                  failures: int = ALERT_FAILURES, window: int = ALERT_WINDOW) -> None:
+    """
+    Exibe as últimas verificações de cada alvo, lidas do histórico.
+    
+    Alvos que têm histórico mas não estão mais na lista (removidos do
+    arquivo de alvos) são exibidos em seguida.
+    
+    Args:
+        targets: Alvos a exibir
+        limit: Verificações exibidas por alvo
+        failures / window: Regra de alerta usada no estado exibido
+    """
+    history = CheckHistory(HISTORY_DIR, readonly=True)
+    entries = [(target["name"], target["url"]) for target in targets]
+    configured = {name for name, _ in entries}
+    try:
+        entries.extend((name, "alvo removido") for name in history.names() if name not in configured)
+    except OSError as e:
+        print(f"Erro ao listar o histórico em {HISTORY_DIR}: {e}")
+    for name, description in entries:
+        print(f"\n=== {name} ({description}) ===")
+        try:
+            ring = history.target(name)
+        except FileNotFoundError:
+            print("Sem histórico de verificações")
+            continue
+        except (OSError, ValueError) as e:
+            print(f"Erro ao ler o histórico: {e}")
+            continue
+        
+        stored = ring.records()
+        if not stored:
+            print("Sem histórico de verificações")
+            continue
+        for record in stored[-limit:]:
+            latency = f"{record['response_time'] * 1000:9.1f}ms" if record["response_time"] is not None else " " * 11
+            detail = ERROR_DESCRIPTIONS.get(record["error_type"], "") if not record["is_up"] else ""
+            print(f"{record['timestamp']:%Y-%m-%d %H:%M:%S}  {'OK   ' if record['is_up'] else 'FALHA'}  "
+                  f"{record['status_code'] or '---':>3}  {latency}  {detail}".rstrip())
+        
+        up = sum(record["is_up"] for record in stored)
+        changes = sum(a["is_up"] != b["is_up"] for a, b in zip(stored, stored[1:]))
+        state = "no ar" if ring.is_up(failures, window) else "fora do ar"
+        print(f"{len(stored)} verificações desde {stored[0]['timestamp']:%Y-%m-%d %H:%M:%S} - "
+              f"Disponibilidade: {up / len(stored) * 100:.2f}% - Mudanças de estado: {changes} - "
+              f"Estado para alertas: {state} ({failures} de {window})")
+    history.close()
+
+def parse_alert_rule(value: str) -> Tuple[int, int]:
+    """Interpreta a regra de alerta "N/M" (ou "N", equivalente a "N/N")."""
+    failures, _, window = value.partition("/")
+    try:
+        rule = (int(failures), int(window or failures))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"regra inválida: {value!r} (use N/M, ex.: 3/5)")
+    if not 1 <= rule[0] <= rule[1]:
+        raise argparse.ArgumentTypeError(f"regra inválida: {value!r} (é preciso 1 <= N <= M)")
+    return rule
+
+def parse_args(argv=None):
+    """Interpreta os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="Monitoramento de Site - Projeto Linux")
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="permanece em execução, verificando o site continuamente"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=DAEMON_INTERVAL, metavar="SEGUNDOS",
+        help=f"intervalo entre verificações no modo daemon enquanto o alvo está no ar (padrão: {DAEMON_INTERVAL}s)"
+    )
+    parser.add_argument(
+        "--probe-interval", type=float, default=PROBE_INTERVAL, metavar="SEGUNDOS",
+        help=f"intervalo das verificações de confirmação após uma falha (padrão: {PROBE_INTERVAL}s)"
+    )
+    parser.add_argument(
+        "--budget", type=float, default=TARGET_BUDGET, metavar="N",
+        help=f"máximo de verificações por minuto de cada alvo no modo daemon (padrão: {TARGET_BUDGET})"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=DAEMON_JITTER, metavar="FRAÇÃO",
+        help=f"variação aleatória do intervalo, como fração dele (padrão: {DAEMON_JITTER})"
+    )
+    parser.add_argument(
+        "--targets", default=TARGETS_FILE, metavar="ARQUIVO",
+        help=f"arquivo JSON com a lista de alvos (padrão: {TARGETS_FILE}; sem ele, apenas {SITE_URL})"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=MAX_CONCURRENT_CHECKS, metavar="N",
+        help=f"verificações simultâneas (padrão: {MAX_CONCURRENT_CHECKS})"
+    )
+    parser.add_argument(
+        "--flush-interval", type=float, default=STATUS_FLUSH_INTERVAL, metavar="SEGUNDOS",
+        help=f"intervalo entre gravações de {STATUS_FILE} no modo daemon (padrão: {STATUS_FLUSH_INTERVAL}s)"
+    )
+    parser.add_argument(
+        "--alert-after", type=parse_alert_rule, default=(ALERT_FAILURES, ALERT_WINDOW), metavar="N/M",
+        help=f"alerta de queda quando N das últimas M verificações falharem (padrão: {ALERT_FAILURES}/{ALERT_WINDOW})"
+    )
+    parser.add_argument(
+        "--history", type=int, nargs="?", const=HISTORY_LIMIT, metavar="N",
+        help=f"exibe as últimas N verificações de cada alvo (padrão: {HISTORY_LIMIT}) e sai"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, default=METRICS_PORT, metavar="PORTA",
+        help=f"porta do endpoint de métricas Prometheus no modo daemon (padrão: {METRICS_PORT}; 0 desativa)"
+    )
+    parser.add_argument(
+        "--metrics-address", default=METRICS_ADDRESS, metavar="ENDEREÇO",
+        help=f"endereço do endpoint de métricas (padrão: {METRICS_ADDRESS})"
+    )
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval deve ser > 0")
+    if args.probe_interval <= 0:
+        parser.error("--probe-interval deve ser > 0")
+    if args.budget <= 0:
+        parser.error("--budget deve ser > 0")
+    if not 0 <= args.jitter < 1:
+        parser.error("--jitter deve estar entre 0 e 1")
+    if args.concurrency < 1:
+        parser.error("--concurrency deve ser >= 1")
+    if args.history is not None and args.history < 1:
+        parser.error("--history deve ser >= 1")
+    if not 0 <= args.metrics_port <= 65535:
+        parser.error("--metrics-port deve estar entre 0 e 65535")
+    return args
+
+def main():
+    """
+    Função principal do script de monitoramento.
+    """
+    args = parse_args()
+    try:
+        targets = load_targets(args.targets)
+    except (OSError, ValueError) as e:
+        logger.error(f"Erro ao carregar alvos de {args.targets}: {e}")
+        sys.exit(1)
+    
+    failures, window = args.alert_after
+    if args.history is not None:
+        print_history(targets, args.history, failures, window)
+    elif args.daemon:
+        asyncio.run(MonitorDaemon(targets, args.interval, args.jitter, args.flush_interval,
+                                  args.concurrency, failures, window, args.metrics_address,
+                                  args.metrics_port, args.probe_interval, args.budget).run())
+    else:
+        run_once(targets, args.concurrency, failures, window)
+
+if __name__ == "__main__":
+    main()
+
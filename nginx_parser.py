@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Parser rápido para logs de acesso do Nginx.
+Compila uma diretiva `log_format` do Nginx em um parser posicional e decodifica
+os timestamps sem strptime, com cache por segundo e por minuto.
+Também interpreta o log de erros do Nginx, agrupando as linhas de continuação
+e reduzindo as mensagens a modelos (templates) para contagem.
+"""
+
+import re
+import time
+import calendar
+import datetime
+from functools import lru_cache
+from operator import itemgetter
+
+# Formato "combined" padrão do Nginx
+COMBINED_LOG_FORMAT = (
+    '$remote_addr - $remote_user [$time_local] "$request" '
+    '$status $body_bytes_sent "$http_referer" "$http_user_agent"'
+)
+
+# Campos devolvidos pelo parser, nesta ordem
+FIELDS = ("ip", "datetime", "method", "path", "protocol", "status", "size", "referer", "user_agent")
+
+# Variáveis do Nginx que alimentam cada campo (o restante é apenas reconhecido)
+VARIABLE_FIELDS = {
+    "remote_addr": "ip",
+    "time_local": "datetime",
+    "time_iso8601": "datetime",
+    "request_method": "method",
+    "request_uri": "path",
+    "uri": "path",
+    "server_protocol": "protocol",
+    "status": "status",
+    "body_bytes_sent": "size",
+    "bytes_sent": "size",
+    "http_referer": "referer",
+    "http_user_agent": "user_agent",
+}
+
+NUMERIC_VARIABLES = {"status", "body_bytes_sent", "bytes_sent", "request_length", "pipe"}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+CACHE_LIMIT = 4096  # entradas por cache de timestamps antes de ser descartado
+
+_VARIABLE = re.compile(r'\$(\w+)|\$\{(\w+)\}')
+
+# Log de erros: "2025/01/15 10:30:00 [error] 1234#1234: *56 mensagem"
+ERROR_LEVELS = ("debug", "info", "notice", "warn", "error", "crit", "alert", "emerg")
+ERROR_LINE_PATTERN = re.compile(r"(\d{4}/\d{2}/\d{2} \d{2}:\d{2}):(\d{2}) \[(\w+)\] (\d+)#\d+: (?:\*(\d+) )?(.*)")
+ERROR_CONTEXT_SEPARATOR = ", client: "  # início do contexto que o Nginx acrescenta à mensagem
+ERROR_CONTEXT_PATTERN = re.compile(r'(?:^|, )(\w+): ("(?:[^"\\]|\\.)*"|[^,]*)')
+MAX_ENTRY_CHARS = 8192  # limite de uma entrada com linhas de continuação
+TEMPLATE_CACHE_SIZE = 4096
+
+# Partes variáveis mascaradas nos modelos de mensagem, aplicadas em ordem e
+# apenas se a mensagem contiver o trecho indicativo (evita substituições inúteis)
+_TEMPLATE_MASKS = (
+    (".", re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<ip>"),
+    ("[", re.compile(r"\[[0-9a-fA-F]*:[0-9a-fA-F:]+\](?::\d+)?"), "<ip>"),
+    ("://", re.compile(r"\b\w+://[^\s\"',]+"), "<url>"),
+    ("/", re.compile(r"(?<![\w.<>])/[^\s\"',;()]*"), "<path>"),
+    ("0x", re.compile(r"\b0x[0-9a-fA-F]+\b"), "<hex>"),
+    ("", re.compile(r"(?<![(\w<])\d+(?:\.\d+)?(?![\w>])"), "<n>")  # preserva o errno em "(111: ..."
+)
+
+
+class TimeLocalDecoder:
+    """
+    Decodifica `$time_local` ("10/Oct/2000:13:55:36 -0700").
+
+    O resultado é a tupla (hora, dia, epoch, iso), onde hora e dia são
+    inteiros AAAAMMDDHH e AAAAMMDD no fuso do próprio log, epoch é o instante
+    em segundos UTC e iso é o timestamp em ISO 8601 (igual a datetime.isoformat).
+    Valores inválidos levantam ValueError, como strptime.
+    """
+
+    def __init__(self):
+        self._seconds = {}
+        self._minutes = {}
+
+    def __call__(self, value):
+        try:
+            return self._seconds[value]
+        except KeyError:
+            pass
+
+        if len(self._seconds) >= CACHE_LIMIT:
+            self._seconds.clear()
+
+        if (len(value) == 26 and value[2] == "/" and value[6] == "/" and value[11] == ":"
+                and value[17] == ":" and value[20] == " " and value[19].isdigit()
+                and value[18].isdigit()):
+            minute = self._minute(value[:17], value[21:])
+            second = int(value[18:20])
+            if second > 59:
+                raise ValueError(f"segundo inválido: {value!r}")
+            decoded = (minute[0], minute[1], minute[2] + second,
+                       f"{minute[3]}:{value[18:20]}{minute[4]}")
+        else:
+            decoded = self._slow(value)
+
+        self._seconds[value] = decoded
+        return decoded
+
+    def _minute(self, prefix, zone):
+        """Decodifica e memoriza "dd/Mon/aaaa:HH:MM" + fuso."""
+        key = (prefix, zone)
+        cached = self._minutes.get(key)
+        if cached is not None:
+            return cached
+        if len(self._minutes) >= CACHE_LIMIT:
+            self._minutes.clear()
+
+        month = MONTHS.get(prefix[3:6].lower())
+        if month is None or len(zone) != 5 or zone[0] not in "+-" or not zone[1:].isdigit():
+            raise ValueError(f"timestamp inválido: {prefix} {zone}")
+        fields = (prefix[0:2], prefix[7:11], prefix[12:14], prefix[15:17])
+        if not all(f.isdigit() for f in fields):
+            raise ValueError(f"timestamp inválido: {prefix} {zone}")
+        day, year, hour, minute = (int(f) for f in fields)
+        offset = (int(zone[1:3]) * 3600 + int(zone[3:5]) * 60) * (-1 if zone[0] == "-" else 1)
+        # Valida a data (dia 31/02, hora 25, etc.)
+        datetime.datetime(year, month, day, hour, minute)
+
+        epoch = calendar.timegm((year, month, day, hour, minute, 0)) - offset
+        iso_zone = f"{zone[0]}{zone[1:3]}:{zone[3:5]}"
+        if zone[3:5] == "00" and zone[1:3] == "00":
+            iso_zone = "+00:00"
+        cached = (
+            year * 1000000 + month * 10000 + day * 100 + hour,
+            year * 10000 + month * 100 + day,
+            epoch,
+            f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}",
+            iso_zone
+        )
+        self._minutes[key] = cached
+        return cached
+
+    @staticmethod
+    def _slow(value):
+        """Caminho genérico para timestamps fora do layout fixo."""
+        return _decode_datetime(datetime.datetime.strptime(value, "%d/%b/%Y:%H:%M:%S %z"))
+
+
+class TimeIsoDecoder:
+    """Decodifica `$time_iso8601`, com o mesmo resultado de TimeLocalDecoder."""
+
+    def __init__(self):
+        self._seconds = {}
+
+    def __call__(self, value):
+        try:
+            return self._seconds[value]
+        except KeyError:
+            pass
+        if len(self._seconds) >= CACHE_LIMIT:
+            self._seconds.clear()
+        try:
+            dt = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            # Linhas no formato combined tratadas pelo caminho alternativo
+            return TimeLocalDecoder._slow(value)
+        if dt.tzinfo is None:
+            raise ValueError(f"timestamp sem fuso horário: {value!r}")
+        decoded = _decode_datetime(dt)
+        self._seconds[value] = decoded
+        return decoded
+
+
+def _decode_datetime(dt):
+    """Converte um datetime com fuso na tupla (hora, dia, epoch, iso)."""
+    day = dt.year * 10000 + dt.month * 100 + dt.day
+    return (day * 100 + dt.hour, day, int(dt.timestamp()), dt.isoformat())
+
+
+class LogFormatParser:
+    """
+    Parser compilado a partir de uma diretiva `log_format`.
+
+    `parse(line)` devolve uma tupla com os campos de FIELDS (campos ausentes
+    no formato vêm como "") ou None se a linha não corresponder ao formato.
+    `decode_time(valor)` decodifica o campo datetime.
+    """
+
+    def __init__(self, log_format):
+        self.log_format = log_format
+        pattern, groups, time_variable = _compile_pattern(log_format)
+        self.regex = re.compile(pattern)
+        self.decode_time = TimeIsoDecoder() if time_variable == "time_iso8601" else TimeLocalDecoder()
+
+        if groups == list(range(1, len(FIELDS) + 1)):
+            # Grupos já estão na ordem de FIELDS (ex.: combined)
+            extract = re.Match.groups
+        else:
+            extract = itemgetter(*groups)
+        match = self.regex.match
+
+        def parse(line):
+            m = match(line)
+            if m is None:
+                return None
+            return extract(m)
+
+        self.parse = parse
+
+
+def _compile_pattern(log_format):
+    """
+    Traduz um log_format em uma expressão regular com grupos posicionais.
+
+    Returns:
+        Tupla (padrão, índice do grupo de cada campo de FIELDS, variável de tempo)
+    """
+    parts = []
+    tokens = []
+    position = 0
+    for m in _VARIABLE.finditer(log_format):
+        tokens.append(("literal", log_format[position:m.start()]))
+        tokens.append(("variable", m.group(1) or m.group(2)))
+        position = m.end()
+    tokens.append(("literal", log_format[position:]))
+
+    field_groups = {}
+    group = 0
+    time_variable = None
+    for index, (kind, value) in enumerate(tokens):
+        if kind == "literal":
+            parts.append(re.escape(value))
+            continue
+
+        # Delimitador: primeiro caractere do literal seguinte
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else ""
+        stop = re.escape(following[0]) if following else ""
+        any_value = f"[^{stop}]*" if stop else ".*"
+
+        if value == "request":
+            token = ' '.join(f'([^ {stop}]*)' for _ in range(3))
+            for name in ("method", "path", "protocol"):
+                group += 1
+                field_groups.setdefault(name, group)
+            parts.append(token)
+            continue
+
+        field = VARIABLE_FIELDS.get(value)
+        sub_pattern = r"\d+" if value in NUMERIC_VARIABLES else any_value
+        if field and field not in field_groups:
+            group += 1
+            field_groups[field] = group
+            parts.append(f"({sub_pattern})")
+            if field == "datetime":
+                time_variable = value
+        else:
+            parts.append(f"(?:{sub_pattern})")
+
+    missing = [name for name in FIELDS if name not in field_groups]
+    if "datetime" in missing or "status" in missing:
+        raise ValueError("log_format precisa conter $time_local/$time_iso8601 e $status")
+    if missing:
+        # Grupo vazio no final para os campos ausentes
+        group += 1
+        parts.append("()")
+    return "".join(parts), [field_groups.get(name, group) for name in FIELDS], time_variable
+
+
+@lru_cache(maxsize=16)
+def compile_log_format(log_format=COMBINED_LOG_FORMAT):
+    """
+    Compila (e memoriza) um parser para o log_format informado.
+
+    Args:
+        log_format: Texto da diretiva log_format do Nginx
+
+    Returns:
+        LogFormatParser
+    """
+    return LogFormatParser(log_format)
+
+
+class ErrorLogParser:
+    """
+    Interpreta as linhas do log de erros do Nginx.
+
+    `parse(line)` devolve a tupla (hora, dia, epoch, iso, nível, pid, conexão,
+    mensagem) ou None se a linha não começar com o cabeçalho de data e nível
+    (linha de continuação). O horário do log de erros não tem fuso: é o
+    horário local do servidor; hora e dia são inteiros AAAAMMDDHH e AAAAMMDD
+    e conexão é o número após "*" (ou None).
+    """
+
+    def __init__(self):
+        self._minutes = {}
+        self.match = ERROR_LINE_PATTERN.match
+
+    def _minute(self, prefix):
+        """Decodifica e memoriza "AAAA/MM/DD HH:MM"."""
+        cached = self._minutes.get(prefix)
+        if cached is not None:
+            return cached
+        if len(self._minutes) >= CACHE_LIMIT:
+            self._minutes.clear()
+        year, month, day = int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10])
+        hour, minute = int(prefix[11:13]), int(prefix[14:16])
+        # Valida a data (dia 31/02, hora 25, etc.)
+        datetime.datetime(year, month, day, hour, minute)
+        cached = (
+            year * 1000000 + month * 10000 + day * 100 + hour,
+            year * 10000 + month * 100 + day,
+            int(time.mktime((year, month, day, hour, minute, 0, 0, 0, -1))),
+            f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}"
+        )
+        self._minutes[prefix] = cached
+        return cached
+
+    def parse(self, line):
+        m = self.match(line)
+        if m is None:
+            return None
+        prefix, second, level, pid, connection, message = m.groups()
+        try:
+            hour_key, day_key, epoch, iso = self._minute(prefix)
+        except ValueError:
+            return None
+        return (hour_key, day_key, epoch + int(second), f"{iso}:{second}", level, int(pid),
+                int(connection) if connection else None, message.rstrip("\r\n"))
+
+
+def iter_error_entries(lines, parser=None):
+    """
+    Agrupa as linhas do log de erros em entradas.
+
+    Linhas sem cabeçalho são continuações da entrada anterior (ex.: corpo
+    de resposta de um upstream ou trace de módulo) e são acrescentadas à
+    mensagem dela, até MAX_ENTRY_CHARS caracteres.
+
+    Args:
+        lines: Iterável de linhas (str)
+        parser: ErrorLogParser (opcional)
+
+    Yields:
+        Tuplas (campos, mensagem, linhas), onde campos é o resultado de
+        ErrorLogParser.parse sem a mensagem e linhas é a quantidade de linhas
+        da entrada; continuações no início do trecho, sem entrada anterior,
+        vêm com campos None
+    """
+    parse = (parser or ErrorLogParser()).parse
+    current = None
+    message = None
+    count = 0
+    for line in lines:
+        fields = parse(line)
+        if fields is None:
+            if current is None and count == 0:
+                yield None, line.rstrip("\r\n"), 1
+                continue
+            if len(message) < MAX_ENTRY_CHARS:
+                message = (message + "\n" + line.rstrip("\r\n"))[:MAX_ENTRY_CHARS]
+            count += 1
+            continue
+        if count:
+            yield current, message, count
+        current, message, count = fields[:7], fields[7], 1
+    if count:
+        yield current, message, count
+
+
+def split_error_message(message):
+    """
+    Separa a mensagem do contexto acrescentado pelo Nginx.
+
+    Returns:
+        Tupla (mensagem, dict com client, server, request, upstream, host, ...)
+    """
+    position = message.find(ERROR_CONTEXT_SEPARATOR)
+    if position == -1:
+        return message, {}
+    context = {}
+    for name, value in ERROR_CONTEXT_PATTERN.findall(message[position + 2:]):
+        context[name] = value[1:-1] if value.startswith('"') and value.endswith('"') and len(value) > 1 else value
+    return message[:position], context
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def error_template(message):
+    """
+    Modelo de uma mensagem de erro: IPs, URLs, caminhos, números e valores
+    hexadecimais são substituídos por <ip>, <url>, <path>, <n> e <hex>.
+
+    Mensagens repetidas (como em uma enxurrada de erros) vêm do cache.
+    """
+    for hint, pattern, replacement in _TEMPLATE_MASKS:
+        if hint in message:
+            message = pattern.sub(replacement, message)
+    return message
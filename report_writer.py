@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Gravação e leitura dos relatórios do analisador de logs.
+O relatório é gravado em streaming: as seções volumosas (lista de IPs,
+erros HTTP, eventos de indisponibilidade) vão para arquivos JSON Lines
+separados, um item por linha, e o arquivo principal fica como um índice
+pequeno com o resumo e a referência de cada seção. Ler o resumo não exige
+carregar os dados volumosos, que podem ser percorridos item a item.
+Os resumos parciais (agregados mergeáveis de um servidor, combinados pelo
+comando `merge` do analisador) são gravados e lidos aqui também.
+"""
+
+import os
+import json
+import gzip
+
+# Seções gravadas em arquivos separados (caminho dentro do relatório)
+BULK_SECTIONS = (
+    ("nginx", "unique_ips"),
+    ("nginx", "errors"),
+    ("nginx_error_log", "entries"),
+    ("monitoring", "errors"),
+    ("monitoring", "downtime_events")
+)
+SECTION_REF = "$file"  # chave que marca uma seção gravada em outro arquivo
+WRITE_BATCH_ITEMS = 10000  # itens serializados por escrita
+GZIP_LEVEL = 6
+
+
+def _open_write(path, compress):
+    """Abre um arquivo para gravação em texto, com gzip opcional."""
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=GZIP_LEVEL)
+    return open(path, 'w', encoding='utf-8')
+
+
+def _open_read(path):
+    """Abre um arquivo para leitura em texto, reconhecendo o gzip pela extensão."""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _write_atomic(path, compress, write):
+    """Grava path por meio de um arquivo temporário renomeado ao final."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with _open_write(tmp_path, compress) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _write_items(f, items, encode):
+    """Grava os itens, um JSON por linha, em lotes."""
+    count = 0
+    batch = []
+    for item in items:
+        batch.append(encode(item))
+        if len(batch) >= WRITE_BATCH_ITEMS:
+            f.write("\n".join(batch) + "\n")
+            count += len(batch)
+            batch = []
+    if batch:
+        f.write("\n".join(batch) + "\n")
+        count += len(batch)
+    return count
+
+
+def report_paths(filename, compress=False):
+    """
+    Nomes dos arquivos de um relatório.
+
+    Args:
+        filename: Arquivo principal (ex.: relatorio_logs_20250115_103000.json)
+        compress: Usa gzip (acrescenta .gz aos nomes)
+
+    Returns:
+        Tupla (índice, dict (seção, campo) -> arquivo da seção)
+    """
+    suffix = ".gz" if compress else ""
+    base = filename[:-len(".gz")] if filename.endswith(".gz") else filename
+    base = base[:-len(".json")] if base.endswith(".json") else base
+    sections = {path: f"{base}.{'.'.join(path)}.jsonl{suffix}" for path in BULK_SECTIONS}
+    return f"{base}.json{suffix}", sections
+
+
+def write_report(report, filename, compact=False, compress=False, split=True):
+    """
+    Grava o relatório em streaming.
+
+    As seções de BULK_SECTIONS são gravadas primeiro, cada uma em seu
+    arquivo; o índice é gravado por último, de modo que só aparece quando
+    todas as seções que ele referencia estão completas. O dict do relatório
+    não é copiado: as listas são percorridas diretamente.
+
+    Args:
+        report: Relatório gerado por generate_report
+        filename: Arquivo principal
+        compact: JSON sem indentação nem espaços
+        compress: Comprime os arquivos com gzip
+        split: Grava as seções volumosas em arquivos separados (False grava
+               tudo no arquivo principal)
+
+    Returns:
+        Lista dos arquivos gravados, com o índice primeiro
+
+    Raises:
+        OSError: Falha ao gravar algum arquivo
+    """
+    index_path, section_paths = report_paths(filename, compress)
+    separators = (",", ":") if compact else None
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str).encode
+    written = []
+
+    references = {}
+    if split:
+        for (group, field), path in section_paths.items():
+            items = report.get(group, {}).get(field)
+            if items is None:
+                continue
+            count = []
+            _write_atomic(path, compress, lambda f: count.append(_write_items(f, items, encode)))
+            references[(group, field)] = {SECTION_REF: os.path.basename(path), "count": count[0]}
+            written.append(path)
+
+    # Índice: cópia rasa apenas dos grupos que tiveram seções substituídas pela referência
+    index = dict(report)
+    for (group, field), reference in references.items():
+        if index[group] is report[group]:
+            index[group] = dict(report[group])
+        index[group][field] = reference
+    encoder = json.JSONEncoder(indent=None if compact else 2, separators=separators,
+                               ensure_ascii=False, default=str)
+
+    def write_index(f):
+        for chunk in encoder.iterencode(index):
+            f.write(chunk)
+        f.write("\n")
+
+    _write_atomic(index_path, compress, write_index)
+    return [index_path] + written
+
+
+def load_report_summary(filename):
+    """
+    Lê apenas o índice de um relatório.
+
+    As seções gravadas em arquivos separados aparecem como
+    {"$file": nome do arquivo, "count": itens}; use iter_report_section
+    para percorrê-las.
+
+    Args:
+        filename: Arquivo principal (.json ou .json.gz)
+
+    Returns:
+        Dict do relatório sem as seções volumosas
+    """
+    with _open_read(filename) as f:
+        return json.load(f)
+
+
+def iter_report_section(filename, group, field):
+    """
+    Percorre os itens de uma seção do relatório, sem carregá-la inteira.
+
+    Funciona também com relatórios gravados em um único arquivo (split=False
+    ou formato anterior), caso em que a seção vem do próprio índice.
+
+    Args:
+        filename: Arquivo principal
+        group / field: Seção (ex.: "nginx", "errors")
+
+    Yields:
+        Itens da seção
+    """
+    summary = load_report_summary(filename)
+    section = summary.get(group, {}).get(field)
+    if not isinstance(section, dict) or SECTION_REF not in section:
+        yield from section or ()
+        return
+    path = os.path.join(os.path.dirname(filename), section[SECTION_REF])
+    with _open_read(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_summary(summary, filename):
+    """
+    Grava um resumo parcial em JSON compacto, com gzip se o nome terminar em .gz.
+
+    Args:
+        summary: Resumo gerado pelo analisador
+        filename: Arquivo de destino
+
+    Raises:
+        OSError: Falha ao gravar o arquivo
+    """
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def write(f):
+        for chunk in encoder.iterencode(summary):
+            f.write(chunk)
+        f.write("\n")
+
+    _write_atomic(filename, filename.endswith(".gz"), write)
+
+
+def load_summary(filename):
+    """
+    Lê um resumo parcial gravado por write_summary.
+
+    Raises:
+        OSError: Arquivo inexistente ou ilegível
+        ValueError: Conteúdo não é JSON válido
+    """
+    with _open_read(filename) as f:
+        return json.load(f)
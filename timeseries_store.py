@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Armazenamento de séries temporais pré-agregadas do Projeto Linux.
+Guarda, em SQLite, agregados por minuto das requisições do Nginx e das
+verificações do monitoramento, com redução para hora e dia e retenção
+por resolução, para consultas de tendência sem reler os logs.
+"""
+
+import os
+import time
+import sqlite3
+import datetime
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+# Colunas de cada bucket, agrupadas pela origem dos dados
+REQUEST_COLUMNS = ("requests", "status_2xx", "status_3xx", "status_4xx", "status_5xx", "bytes")
+CHECK_COLUMNS = ("checks_ok", "checks_failed", "latency_count", "latency_sum", "latency_max")
+COLUMNS = REQUEST_COLUMNS + CHECK_COLUMNS
+
+# Retenção padrão de cada resolução, em dias
+RETENTION_DAYS = {MINUTE: 14, HOUR: 400, DAY: 3650}
+
+# Uma linha por (resolução em segundos, início do bucket em epoch)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    status_2xx INTEGER NOT NULL DEFAULT 0,
+    status_3xx INTEGER NOT NULL DEFAULT 0,
+    status_4xx INTEGER NOT NULL DEFAULT 0,
+    status_5xx INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    checks_ok INTEGER NOT NULL DEFAULT 0,
+    checks_failed INTEGER NOT NULL DEFAULT 0,
+    latency_count INTEGER NOT NULL DEFAULT 0,
+    latency_sum REAL NOT NULL DEFAULT 0,
+    latency_max REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (resolution, bucket)
+) WITHOUT ROWID
+"""
+
+
+def _local_day_start(epoch):
+    """Início (epoch) do dia local que contém epoch."""
+    day = datetime.datetime.fromtimestamp(epoch).date()
+    return int(time.mktime(day.timetuple()))
+
+
+class RollupStore:
+    """
+    Séries por minuto, hora e dia em um único arquivo SQLite.
+
+    Os minutos são gravados por write_requests/write_checks; as horas são
+    recalculadas a partir dos minutos e os dias (no fuso local) a partir
+    das horas, apenas para os buckets afetados pela gravação.
+    """
+
+    def __init__(self, path, retention_days=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.retention = dict(RETENTION_DAYS)
+        self.retention.update(retention_days or {})
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(SCHEMA)
+
+    def close(self):
+        """Fecha a conexão."""
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_requests(self, minutes, mode="merge"):
+        """
+        Grava agregados por minuto do log de acesso.
+
+        Args:
+            minutes: Dict epoch do minuto -> [requisições, 2xx, 3xx, 4xx, 5xx, bytes]
+            mode: "add" soma aos valores existentes (dados novos de uma análise
+                  incremental); "merge" mantém o maior valor, o que torna a
+                  regravação dos mesmos dados idempotente
+        """
+        self._write(REQUEST_COLUMNS, minutes, mode)
+
+    def write_checks(self, minutes, mode="merge"):
+        """
+        Grava agregados por minuto do monitoramento.
+
+        Args:
+            minutes: Dict epoch do minuto -> [ok, falhas, nº de latências, soma, máximo]
+            mode: "add" ou "merge" (ver write_requests)
+        """
+        self._write(CHECK_COLUMNS, minutes, mode)
+
+    def _write(self, columns, minutes, mode):
+        if not minutes:
+            return
+        if mode == "add":
+            updates = [f"{c} = {c} + excluded.{c}" for c in columns if c != "latency_max"]
+        else:
+            updates = [f"{c} = MAX({c}, excluded.{c})" for c in columns if c != "latency_max"]
+        if "latency_max" in columns:
+            updates.append("latency_max = MAX(latency_max, excluded.latency_max)")
+        sql = (
+            f"INSERT INTO rollups (resolution, bucket, {', '.join(columns)}) "
+            f"VALUES (?, ?, {', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT (resolution, bucket) DO UPDATE SET {', '.join(updates)}"
+        )
+        with self.db:
+            self.db.executemany(sql, ((MINUTE, int(bucket), *values) for bucket, values in minutes.items()))
+            self._downsample(min(minutes), max(minutes))
+            self._prune()
+
+    def _downsample(self, first, last):
+        """Recalcula as horas e os dias que contêm o intervalo [first, last]."""
+        now = time.time()
+        hour_first, hour_last = first - first % HOUR, last - last % HOUR
+        self._rebuild(
+            HOUR, MINUTE, hour_first, hour_last + HOUR,
+            lambda bucket: bucket - bucket % HOUR,
+            now - self.retention[MINUTE] * DAY
+        )
+        day_first, day_last = _local_day_start(first), _local_day_start(last)
+        self._rebuild(
+            DAY, HOUR, day_first, day_last + 2 * DAY,
+            _local_day_start,
+            now - self.retention[HOUR] * DAY
+        )
+
+    def _rebuild(self, resolution, source, start, end, bucket_of, complete_since):
+        """
+        Agrega os buckets de `source` em [start, end) para `resolution`.
+
+        Buckets iniciados antes de complete_since podem ter perdido parte dos
+        dados de origem para a retenção: nesses o valor existente só cresce.
+        """
+        totals = {}
+        rows = self.db.execute(
+            f"SELECT bucket, {', '.join(COLUMNS)} FROM rollups "
+            "WHERE resolution = ? AND bucket >= ? AND bucket < ?",
+            (source, start, end)
+        )
+        for bucket, *values in rows:
+            target = bucket_of(bucket)
+            current = totals.get(target)
+            if current is None:
+                totals[target] = list(values)
+                continue
+            for i, value in enumerate(values):
+                current[i] = max(current[i], value) if COLUMNS[i] == "latency_max" else current[i] + value
+
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        replace = (f"INSERT OR REPLACE INTO rollups (resolution, bucket, {', '.join(COLUMNS)}) "
+                   f"VALUES (?, ?, {placeholders})")
+        grow = (f"INSERT INTO rollups (resolution, bucket, {', '.join(COLUMNS)}) VALUES (?, ?, {placeholders}) "
+                f"ON CONFLICT (resolution, bucket) DO UPDATE SET "
+                + ", ".join(f"{c} = MAX({c}, excluded.{c})" for c in COLUMNS))
+        for bucket, values in totals.items():
+            self.db.execute(replace if bucket >= complete_since else grow, (resolution, bucket, *values))
+
+    def _prune(self):
+        """Remove buckets mais antigos que a retenção de cada resolução."""
+        now = time.time()
+        for resolution, days in self.retention.items():
+            self.db.execute(
+                "DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                (resolution, int(now - days * DAY))
+            )
+
+    def query(self, resolution, since=None, until=None):
+        """
+        Lê os buckets de uma resolução.
+
+        Args:
+            resolution: MINUTE, HOUR ou DAY
+            since / until: Intervalo [since, until) em epoch (opcional)
+
+        Returns:
+            Lista de dicts com "bucket" e as colunas de COLUMNS, em ordem
+        """
+        rows = self.db.execute(
+            f"SELECT bucket, {', '.join(COLUMNS)} FROM rollups "
+            "WHERE resolution = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (resolution, int(since or 0), int(until or 2 ** 62))
+        )
+        return [dict(zip(("bucket",) + COLUMNS, row)) for row in rows]
+
+    def trend(self, days=90):
+        """
+        Tendência diária dos últimos `days` dias.
+
+        Returns:
+            Lista de dicts por dia local com requisições, erros, uptime e latência média
+        """
+        since = _local_day_start(time.time()) - (days - 1) * DAY
+        trend = []
+        for row in self.query(DAY, since):
+            checks = row["checks_ok"] + row["checks_failed"]
+            trend.append({
+                "date": datetime.datetime.fromtimestamp(row["bucket"]).strftime("%Y-%m-%d"),
+                "requests": row["requests"],
+                "status_4xx": row["status_4xx"],
+                "status_5xx": row["status_5xx"],
+                "bytes": row["bytes"],
+                "checks": checks,
+                "uptime_percentage": (row["checks_ok"] / checks) * 100 if checks else None,
+                "average_response_time": (row["latency_sum"] / row["latency_count"]
+                                          if row["latency_count"] else None)
+            })
+        return trend